@@ -8,27 +8,54 @@ using Jupyter notebooks via papermill for content processing.
 Main functions:
 - generate_report: Create a complete report with navigation and multiple pages
 - generate_simple_report: Create a standalone single-page report
+- update_report: Re-render only the changed part of a report generated earlier
+- generate_reports_batch: Generate many reports sharing one worker pool and their assets
+- generate_report_async, generate_simple_report_async: The same from an asyncio event loop
+- serve_report: Serve a report over HTTP, rendering each page when it is first requested
 """
 
 from .core import (
     # Main report generation functions
     generate_report,
     generate_simple_report,
+    update_report,
+    generate_reports_batch,
     
     # Content processing function
     process_report_content,
     
+    # Build results and shared execution resources
+    BuildSummary,
+    RenderSession,
+    
     # Constants
     DEFAULT_DEPTH,
     REPORT_TEMPLATE_PATH,
     NOTEBOOK_TEMPLATE_PATH,
     ICON_MAPPING_PATH
 )
+from .aio import generate_report_async, generate_simple_report_async
+from .cache import RenderCache
+from .lazy import LazyLeaf
+from .manifest import REMOVE
+from .server import serve_report
+from .source import DirectoryReportSource
 
 __all__ = [
     'generate_report',
     'generate_simple_report',
+    'update_report',
+    'generate_reports_batch',
+    'REMOVE',
+    'generate_report_async',
+    'generate_simple_report_async',
+    'serve_report',
     'process_report_content',
+    'BuildSummary',
+    'RenderSession',
+    'RenderCache',
+    'LazyLeaf',
+    'DirectoryReportSource',
     'DEFAULT_DEPTH',
     'REPORT_TEMPLATE_PATH',
     'NOTEBOOK_TEMPLATE_PATH',
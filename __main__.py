@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""
+Command Line Interface
+
+Commands:
+    python -m qreporting worker <spool_dir>   Render jobs from a spool directory (see spool.py)
+    python -m qreporting serve <module:name>  Serve a report, rendering pages on request (see server.py)
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import argparse
+import importlib
+import sys
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional
+
+if __package__:
+    from .plan import DEFAULT_DEPTH
+    from .server import DEFAULT_HOST, DEFAULT_MEMORY_PAGES, DEFAULT_PORT, DEFAULT_PREFETCH, DEFAULT_REQUEST_TIMEOUT, serve_report
+    from .spool import DEFAULT_POLL_INTERVAL, run_worker
+else:  # Run as a plain script
+    from plan import DEFAULT_DEPTH
+    from server import DEFAULT_HOST, DEFAULT_MEMORY_PAGES, DEFAULT_PORT, DEFAULT_PREFETCH, DEFAULT_REQUEST_TIMEOUT, serve_report
+    from spool import DEFAULT_POLL_INTERVAL, run_worker
+
+#------------------------------------------------------------------------------
+# COMMANDS
+#------------------------------------------------------------------------------
+
+def worker_command(args: argparse.Namespace) -> int:
+    """Run a spool worker until it is idle for too long, has rendered enough jobs or is interrupted."""
+    engine_options = {
+        name: getattr(args, name)
+        for name in ('max_reports', 'max_memory_mb')
+        if getattr(args, name) is not None
+    }
+    try:
+        jobs_done = run_worker(
+            args.spool_dir,
+            engine=args.engine,
+            engine_options=engine_options,
+            idle_timeout=args.idle_timeout,
+            max_jobs=args.max_jobs,
+            poll_interval=args.poll_interval
+        )
+    except KeyboardInterrupt:
+        return 130
+    print(f"Worker finished after {jobs_done} job(s)")
+    return 0
+
+def load_report_dict(reference: str) -> Dict[str, Any]:
+    """
+    Import the report dictionary named by "module:name".
+
+    Args:
+        reference (str): Module and attribute, e.g. "reports.sales:report". The attribute may
+                         also be a function without arguments returning the dictionary, or
+                         a DirectoryReportSource.
+
+    Returns:
+        Dict[str, Any]: The report dictionary
+
+    Raises:
+        ValueError: If the reference is malformed or does not name a dictionary
+    """
+    module_name, _, attribute = reference.partition(':')
+    if not module_name or not attribute:
+        raise ValueError(f"Expected module:name, got {reference!r}")
+    # Like python -m, find modules in the current directory
+    if '' not in sys.path:
+        sys.path.insert(0, '')
+    value = getattr(importlib.import_module(module_name), attribute)
+    if callable(value) and not isinstance(value, Mapping):
+        value = value()
+    if not isinstance(value, Mapping):
+        raise ValueError(f"{reference} is a {type(value).__name__}, not a report dictionary")
+    return value
+
+def serve_command(args: argparse.Namespace) -> int:
+    """Serve a report until interrupted."""
+    try:
+        data_dict = load_report_dict(args.report)
+    except (ImportError, AttributeError, ValueError) as e:
+        print(f"Error: Could not load {args.report}: {e}")
+        return 1
+    engine_options = {
+        name: getattr(args, name)
+        for name in ('max_reports', 'max_memory_mb')
+        if getattr(args, name) is not None
+    }
+    serve_report(
+        data_dict,
+        host=args.host,
+        port=args.port,
+        output_dir=args.output_dir,
+        report_title=args.title,
+        depth=args.depth,
+        workers=args.workers,
+        engine=args.engine,
+        engine_options=engine_options,
+        renderer=args.renderer,
+        cache=args.cache_dir,
+        large_table_rows=args.large_table_rows,
+        memory_pages=args.memory_pages,
+        prefetch=args.prefetch,
+        request_timeout=args.request_timeout
+    )
+    return 0
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run a qreporting command."""
+    parser = argparse.ArgumentParser(prog="qreporting", description="Report generation tools")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    worker = commands.add_parser('worker', help="Render jobs from a spool directory")
+    worker.add_argument('spool_dir', help="Spool directory shared with generate_report(spool=...)")
+    worker.add_argument('--engine', choices=("papermill", "kernel"), default="papermill",
+                        help="Notebook execution engine")
+    worker.add_argument('--max-reports', type=int, help="Pages per warm kernel before it is restarted")
+    worker.add_argument('--max-memory-mb', type=float, help="Restart the warm kernel above this memory")
+    worker.add_argument('--idle-timeout', type=float, help="Exit after this many seconds without a job")
+    worker.add_argument('--max-jobs', type=int, help="Exit after rendering this many jobs")
+    worker.add_argument('--poll-interval', type=float, default=DEFAULT_POLL_INTERVAL,
+                        help="Seconds between checks for new jobs")
+    worker.set_defaults(handler=worker_command)
+
+    serve = commands.add_parser('serve', help="Serve a report, rendering pages when first requested")
+    serve.add_argument('report', help="Report dictionary as module:name, or a function returning it")
+    serve.add_argument('--host', default=DEFAULT_HOST, help="Address to listen on")
+    serve.add_argument('--port', type=int, default=DEFAULT_PORT, help="Port to listen on")
+    serve.add_argument('--output-dir', help="Directory for rendered pages, a temporary one by default")
+    serve.add_argument('--title', default="Report", help="Title of the report")
+    serve.add_argument('--depth', type=int, default=DEFAULT_DEPTH, help="Maximum depth of nested menus")
+    serve.add_argument('--workers', type=int, help="Worker processes rendering pages")
+    serve.add_argument('--engine', choices=("papermill", "kernel"), default="papermill",
+                       help="Notebook execution engine")
+    serve.add_argument('--max-reports', type=int, help="Pages per warm kernel before it is restarted")
+    serve.add_argument('--max-memory-mb', type=float, help="Restart the warm kernel above this memory")
+    serve.add_argument('--renderer', choices=("notebook", "native"), default="notebook",
+                       help="Page renderer")
+    serve.add_argument('--cache-dir', help="Render cache directory, keeping pages across runs")
+    serve.add_argument('--large-table-rows', type=int,
+                       help="Show tables with more rows as virtual-scrolling tables")
+    serve.add_argument('--memory-pages', type=int, default=DEFAULT_MEMORY_PAGES,
+                       help="Rendered pages kept in memory")
+    serve.add_argument('--prefetch', type=int, default=DEFAULT_PREFETCH,
+                       help="Siblings of a requested page rendered in the background")
+    serve.add_argument('--request-timeout', type=float, default=DEFAULT_REQUEST_TIMEOUT,
+                       help="Seconds a request waits for its page before a 504 response")
+    serve.set_defaults(handler=serve_command)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,491 @@
+#!/usr/bin/env python
+"""
+Asyncio API
+
+This module generates reports from a running asyncio event loop, e.g. inside a web service.
+Notebooks run on kernels started with nbclient's asynchronous client, so waiting for a
+kernel never blocks the loop, and the CPU-bound steps (serialization, native rendering,
+HTML export, cache access and writing pages) run in worker threads. A semaphore bounds how
+many pages are rendered at once; sharing one semaphore between calls bounds the whole
+process. Cancelling a build stops its kernels and removes its temporary files.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import asyncio
+import copy
+import functools
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Union
+
+if TYPE_CHECKING:
+    import nbformat
+
+if __package__:
+    from .cache import CACHE_STATS, RenderCache
+    from .core import (
+        NOTEBOOK_TEMPLATE_PATH, RENDERERS, BuildSummary, add_page_scripts, build_settings, error_html, finish_build,
+        lookup_cached_page, plan_page_jobs, prepare_page_content, store_cached_page, write_page
+    )
+    from .exporter import export_notebook_html
+    from .handoff import HANDOFF_FORMATS, FrameStore, dump_content, dump_file_reference, is_arrow_file
+    from .lazy import is_lazy, leaf_file, resolve_leaf
+    from .plan import DEFAULT_DEPTH, TABLE_OF_CONTENTS_NAME, ReportPlan, slugify
+    from .renderer import build_native_notebook, is_native_supported
+    from .search import SearchIndex
+    from .tables import replace_large_tables
+    from .tracing import TraceEvent, Tracer, trace_span
+else:  # Imported as a plain module, e.g. by example.py
+    from cache import CACHE_STATS, RenderCache
+    from core import (
+        NOTEBOOK_TEMPLATE_PATH, RENDERERS, BuildSummary, add_page_scripts, build_settings, error_html, finish_build,
+        lookup_cached_page, plan_page_jobs, prepare_page_content, store_cached_page, write_page
+    )
+    from exporter import export_notebook_html
+    from handoff import HANDOFF_FORMATS, FrameStore, dump_content, dump_file_reference, is_arrow_file
+    from lazy import is_lazy, leaf_file, resolve_leaf
+    from plan import DEFAULT_DEPTH, TABLE_OF_CONTENTS_NAME, ReportPlan, slugify
+    from renderer import build_native_notebook, is_native_supported
+    from search import SearchIndex
+    from tables import replace_large_tables
+    from tracing import TraceEvent, Tracer, trace_span
+
+# Pages rendered at once when no semaphore is given
+DEFAULT_CONCURRENCY = 4
+
+# The nbconvert exporter is shared by the whole process and not thread-safe
+_export_lock = threading.Lock()
+
+#------------------------------------------------------------------------------
+# HELPER FUNCTIONS
+#------------------------------------------------------------------------------
+
+@functools.lru_cache(maxsize=None)
+def _read_notebook_template(notebook_template: str) -> 'nbformat.NotebookNode':
+    """Read a notebook template with papermill's metadata, once per process. Callers work on a copy."""
+    from papermill.iorw import load_notebook_node
+
+    return load_notebook_node(notebook_template)
+
+def _export_page(notebook: 'nbformat.NotebookNode', filename: str) -> str:
+    """Export a notebook to HTML on a worker thread."""
+    with _export_lock:
+        return export_notebook_html(notebook, filename)
+
+def _get_semaphore(concurrency: Union[int, asyncio.Semaphore]) -> asyncio.Semaphore:
+    """Get the semaphore bounding the number of pages rendered at once."""
+    if isinstance(concurrency, asyncio.Semaphore):
+        return concurrency
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be at least 1, got {concurrency}")
+    return asyncio.Semaphore(concurrency)
+
+async def _cancel_all(tasks: List['asyncio.Task']) -> None:
+    """Cancel tasks and wait until they have released their kernels."""
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+#------------------------------------------------------------------------------
+# CONTENT PROCESSING FUNCTIONS
+#------------------------------------------------------------------------------
+
+async def execute_notebook_async(
+    notebook_template: str,
+    parameters: Dict[str, Any],
+    timeout: Optional[int] = None
+) -> 'nbformat.NotebookNode':
+    """
+    Execute a notebook template on a new kernel without blocking the event loop.
+
+    Parameters are injected after the cell tagged "parameters" like papermill does.
+
+    Args:
+        notebook_template (str): Path to the notebook template
+        parameters (Dict[str, Any]): Parameters of the notebook
+        timeout (int, optional): Seconds each cell may run, unlimited if None
+
+    Returns:
+        nbformat.NotebookNode: The executed notebook
+
+    Raises:
+        nbclient.exceptions.CellExecutionError: If a cell raises
+    """
+    from nbclient import NotebookClient
+    from papermill.parameterize import parameterize_notebook
+
+    notebook = copy.deepcopy(_read_notebook_template(notebook_template))
+    notebook = parameterize_notebook(notebook, parameters)
+
+    client = NotebookClient(notebook, timeout=timeout, record_timing=True)
+    try:
+        await client.async_execute()
+    finally:
+        # nbclient stops the kernel when the notebook finishes or fails; a build cancelled
+        # while the kernel was still starting leaves it to us
+        kernel_manager = client.km
+        if kernel_manager is not None and kernel_manager.has_kernel:
+            await kernel_manager.shutdown_kernel(now=True)
+    return notebook
+
+async def process_report_content_async(
+    content: Any,
+    report_name: str,
+    temp_dir: str,
+    notebook_template: str = NOTEBOOK_TEMPLATE_PATH,
+    renderer: str = "notebook",
+    frame_store: Optional[FrameStore] = None,
+    tracer: Optional[Tracer] = None,
+    timeout: Optional[int] = None,
+    serialize_lock: Optional[asyncio.Lock] = None
+) -> str:
+    """
+    Process report content through a Jupyter notebook template without blocking the event loop.
+
+    Unlike process_report_content, errors are raised rather than returned as an error block.
+
+    Args:
+        content (Any): The report content to process; lazy leaves are resolved on a worker thread
+        report_name (str): Name of the report
+        temp_dir (str): Directory for temporary files
+        notebook_template (str): Path to the notebook template
+        renderer (str): "notebook" or "native" (see process_report_content)
+        frame_store (FrameStore, optional): Store for handing DataFrames and Series to the kernel
+                                            as Arrow files. If None, the content is a plain dill pickle.
+                                            A lazy leaf uses a store of its own in temp_dir.
+        tracer (Tracer, optional): Records the time of each stage and of each notebook cell
+        timeout (int, optional): Seconds each notebook cell may run, unlimited if None
+        serialize_lock (asyncio.Lock, optional): Lock held while writing content to the frame
+                                                 store, which pages of one build share
+
+    Returns:
+        str: HTML content generated from the notebook
+    """
+    filename = slugify(report_name)
+    pickle_path = os.path.join(temp_dir, f"{filename}.pkl")
+    referenced = renderer == "notebook" and is_arrow_file(leaf_file(content))
+
+    if is_lazy(content) and not referenced:
+        with trace_span(tracer, 'resolve', report_name):
+            content = await asyncio.to_thread(resolve_leaf, content)
+        if frame_store is not None:
+            # Not shared with other pages, so the frames are released with this page
+            frame_store = FrameStore(os.path.join(temp_dir, 'frames'))
+            serialize_lock = None
+
+    if renderer == "native" and is_native_supported(content):
+        # Build the executed notebook directly, without a kernel
+        with trace_span(tracer, 'native_render', report_name):
+            executed_notebook = await asyncio.to_thread(build_native_notebook, content, report_name)
+    else:
+        with trace_span(tracer, 'serialize', report_name, reference=referenced) as details:
+            if referenced:
+                # The kernel memory-maps the file itself (see process_report_content)
+                dump_file_reference(leaf_file(content), pickle_path)
+            elif serialize_lock is not None:
+                async with serialize_lock:
+                    await asyncio.to_thread(dump_content, content, pickle_path, frame_store)
+            else:
+                await asyncio.to_thread(dump_content, content, pickle_path, frame_store)
+            details['bytes'] = os.path.getsize(pickle_path)
+
+        with trace_span(tracer, 'execute', report_name, engine='async'):
+            executed_notebook = await execute_notebook_async(
+                notebook_template,
+                {
+                    'report_path': pickle_path,
+                    'title': report_name,
+                    'paths': sys.path
+                },
+                timeout
+            )
+        if tracer is not None:
+            tracer.add_cell_events(executed_notebook, report_name)
+
+    with trace_span(tracer, 'export', report_name) as details:
+        html_content = await asyncio.to_thread(_export_page, executed_notebook, filename)
+        details['bytes'] = len(html_content)
+
+    return add_page_scripts(html_content, report_name)
+
+#------------------------------------------------------------------------------
+# REPORT GENERATION FUNCTIONS
+#------------------------------------------------------------------------------
+
+async def generate_report_async(
+    data_dict: Dict[str, Any],
+    output_dir: str,
+    report_title: str = "Report",
+    depth: Union[int, Dict[str, int]] = DEFAULT_DEPTH,
+    notebook_template: str = NOTEBOOK_TEMPLATE_PATH,
+    active_report: Optional[str] = None,
+    concurrency: Union[int, asyncio.Semaphore] = DEFAULT_CONCURRENCY,
+    renderer: str = "notebook",
+    cache: Optional[Union[str, RenderCache]] = None,
+    shared_assets: bool = True,
+    image_assets: bool = False,
+    assets_dir: Optional[str] = None,
+    handoff: str = "dill",
+    large_table_rows: Optional[int] = None,
+    template_cache_dir: Optional[str] = None,
+    lazy_menu: bool = False,
+    search_index: bool = False,
+    trace_hooks: Optional[List[Callable[[TraceEvent], None]]] = None,
+    profile: bool = False,
+    timeout: Optional[int] = None
+) -> BuildSummary:
+    """
+    Generate an HTML report from a nested dictionary without blocking the event loop.
+
+    Produces the same output as generate_report. Each page is executed on its own kernel,
+    like the "papermill" engine, and written as soon as it is done. If the build is
+    cancelled, its kernels are stopped and its temporary files removed before the
+    cancellation propagates; pages already written are left in place.
+
+    Args:
+        data_dict (Dict[str, Any]): The nested dictionary with report data, or a
+                                    DirectoryReportSource
+        output_dir (str): Directory to save the generated report
+        report_title (str): Title of the report
+        depth (Union[int, Dict[str, int]]): Maximum depth for nested menus (see generate_report)
+        notebook_template (str): Path to the Jupyter notebook template
+        active_report (str, optional): The initial active report to display
+        concurrency (Union[int, asyncio.Semaphore]): Number of pages rendered at once, or a
+                                                     semaphore shared with other builds to
+                                                     bound the number of kernels of the process
+        renderer (str): "notebook" or "native" (see generate_report)
+        cache (Union[str, RenderCache], optional): Render cache, or a directory for one
+        shared_assets (bool): Move the common styles and scripts to shared files under
+                              output_dir/assets/
+        image_assets (bool): Write embedded images to content-hashed files under
+                             output_dir/assets/, loaded lazily (see generate_report)
+        assets_dir (str, optional): Directory for the shared styles, scripts and images, e.g.
+                                    one shared by builds running on the same semaphore
+        handoff (str): How content is handed to the notebook kernel - "dill" or "arrow"
+        large_table_rows (int, optional): Show DataFrames and Series with more rows as
+                                          virtual-scrolling tables (see generate_report)
+        template_cache_dir (str, optional): Directory for Jinja's compiled template bytecode
+        lazy_menu (bool): Create the sidebar entries from a menu script as submenus are
+                          opened (see generate_report)
+        search_index (bool): Index the pages and add a search box to the sidebar (see
+                             generate_report)
+        trace_hooks (List[Callable[[TraceEvent], None]], optional): Functions called with a
+                                            TraceEvent for each stage of each report
+        profile (bool): Save the trace events as output_dir/profile.json
+        timeout (int, optional): Seconds each notebook cell may run, unlimited if None
+
+    Returns:
+        BuildSummary: The pages written, the reports that failed to render and cache statistics
+    """
+    if renderer not in RENDERERS:
+        raise ValueError(f"Unknown renderer {renderer!r}, expected one of {RENDERERS}")
+    if handoff not in HANDOFF_FORMATS:
+        raise ValueError(f"Unknown handoff format {handoff!r}, expected one of {HANDOFF_FORMATS}")
+    semaphore = _get_semaphore(concurrency)
+
+    summary = BuildSummary()
+    tracer = Tracer(trace_hooks) if trace_hooks or profile else None
+    build_start = time.perf_counter()
+
+    # Compile the menu tree first, so conflicting report names fail before anything is written
+    with trace_span(tracer, 'plan'):
+        plan = ReportPlan.build(data_dict, depth)
+    summary.timings['plan'] = time.perf_counter() - build_start
+    settings = build_settings(
+        report_title, depth, notebook_template, active_report, renderer, shared_assets, image_assets, assets_dir,
+        handoff, large_table_rows, template_cache_dir, lazy_menu, search_index
+    )
+
+    if isinstance(cache, str):
+        cache = RenderCache(cache)
+    if cache is not None:
+        summary.cache_stats = dict.fromkeys(CACHE_STATS, 0)
+
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Builds running concurrently on the same output directory each get their own temporary directory
+    temp_dir = tempfile.mkdtemp(prefix='temp_', dir=output_dir)
+    frame_store = FrameStore(os.path.join(temp_dir, 'frames')) if handoff == "arrow" else None
+    serialize_lock = asyncio.Lock()
+
+    # Only the page shown initially in index.html is kept in memory
+    active_name = active_report or TABLE_OF_CONTENTS_NAME
+    active_page: Dict[str, str] = {}
+    hashes: Dict[str, Optional[str]] = {}
+    search = SearchIndex() if search_index else None
+
+    async def render_page(index: int, report_name: str, content: Any) -> None:
+        """Render one page and write it, recording a failure instead of raising."""
+        async with semaphore:
+            job_dir = os.path.join(temp_dir, f"report_{index:05d}")
+            os.makedirs(job_dir, exist_ok=True)
+            cache_key = None
+            try:
+                # Pages are hashed for the manifest only when the cache key can reuse the hash
+                content = await asyncio.to_thread(
+                    prepare_page_content, report_name, content, output_dir, large_table_rows,
+                    hashes if cache is not None else None, assets_dir
+                )
+
+                html_content = None
+                if cache is not None:
+                    # The manifest hash is that of the content rendered, unless tables are replaced
+                    content_digest = hashes.get(report_name) if large_table_rows is None else None
+                    html_content, cache_key = await asyncio.to_thread(
+                        lookup_cached_page, cache, content, report_name, notebook_template, renderer, handoff,
+                        content_digest, summary.cache_stats, tracer
+                    )
+
+                if html_content is None:
+                    try:
+                        html_content = await process_report_content_async(
+                            content, report_name, job_dir, notebook_template, renderer, frame_store,
+                            tracer, timeout, serialize_lock
+                        )
+                    except Exception as e:
+                        print(f"Error processing content for {report_name}: {e}")
+                        summary.failures[report_name] = str(e)
+                        html_content = error_html(e)
+                    else:
+                        if cache_key:
+                            await asyncio.to_thread(
+                                store_cached_page, cache, cache_key, report_name, html_content, tracer
+                            )
+            finally:
+                shutil.rmtree(job_dir, ignore_errors=True)
+
+        with trace_span(tracer, 'write', report_name) as details:
+            html_content = await asyncio.to_thread(
+                write_page, report_name, html_content, output_dir, shared_assets, image_assets,
+                assets_dir
+            )
+            details['bytes'] = len(html_content)
+            if search is not None and report_name != TABLE_OF_CONTENTS_NAME:
+                await asyncio.to_thread(
+                    search.add_page, report_name, f"{slugify(report_name)}.html", html_content
+                )
+        summary.pages.append(report_name)
+        if report_name == active_name:
+            active_page[report_name] = html_content
+
+    try:
+        stage_start = time.perf_counter()
+        with trace_span(tracer, 'table_of_contents'):
+            toc_content = plan.table_of_contents()
+        summary.timings['table_of_contents'] = time.perf_counter() - stage_start
+
+        stage_start = time.perf_counter()
+        tasks = [
+            asyncio.create_task(render_page(index, report_name, content))
+            for index, (report_name, content) in enumerate(plan_page_jobs(plan, toc_content, output_dir))
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            # Includes cancellation of this build; stop the pages still running
+            await _cancel_all(tasks)
+            raise
+        summary.timings['render'] = time.perf_counter() - stage_start
+
+        if cache is not None:
+            await asyncio.to_thread(cache.evict, summary.cache_stats)
+        await asyncio.to_thread(
+            finish_build, plan, output_dir, settings, summary, hashes, active_page.get(active_name), search,
+            tracer, profile
+        )
+        summary.timings['total'] = time.perf_counter() - build_start
+
+        if summary.failures:
+            print(f"Warning: {len(summary.failures)} report(s) failed to render: {', '.join(summary.failures)}")
+
+        return summary
+    finally:
+        # Clean up temporary directory
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+async def generate_simple_report_async(
+    content: Any,
+    report_name: str,
+    output_dir: str,
+    notebook_template: str = NOTEBOOK_TEMPLATE_PATH,
+    concurrency: Union[int, asyncio.Semaphore] = 1,
+    renderer: str = "notebook",
+    shared_assets: bool = False,
+    image_assets: bool = False,
+    handoff: str = "dill",
+    large_table_rows: Optional[int] = None,
+    timeout: Optional[int] = None
+) -> str:
+    """
+    Generate a standalone HTML report file without blocking the event loop.
+
+    The asynchronous counterpart of generate_simple_report.
+
+    Args:
+        content (Any): The content to process
+        report_name (str): Name of the report (will be used in the title and filename)
+        output_dir (str): Directory where the HTML file will be saved
+        notebook_template (str): Path to the Jupyter notebook template for processing
+        concurrency (Union[int, asyncio.Semaphore]): A semaphore shared with other builds to
+                                                     bound the number of kernels of the process
+        renderer (str): "notebook" or "native" (see generate_report)
+        shared_assets (bool): Link the page to shared style and script files under
+                              output_dir/assets/ instead of inlining them
+        image_assets (bool): Write embedded images to files under output_dir/assets/
+        handoff (str): How content is handed to the notebook kernel - "dill" or "arrow"
+        large_table_rows (int, optional): Show DataFrames and Series with more rows as
+                                          virtual-scrolling tables (see generate_report)
+        timeout (int, optional): Seconds each notebook cell may run, unlimited if None
+
+    Returns:
+        str: Path to the generated HTML file
+    """
+    if renderer not in RENDERERS:
+        raise ValueError(f"Unknown renderer {renderer!r}, expected one of {RENDERERS}")
+    if handoff not in HANDOFF_FORMATS:
+        raise ValueError(f"Unknown handoff format {handoff!r}, expected one of {HANDOFF_FORMATS}")
+    semaphore = _get_semaphore(concurrency)
+
+    os.makedirs(output_dir, exist_ok=True)
+    temp_dir = tempfile.mkdtemp(prefix='temp_', dir=output_dir)
+
+    try:
+        filename = slugify(report_name)
+
+        if large_table_rows is not None:
+            content = await asyncio.to_thread(
+                replace_large_tables, content, output_dir, filename, large_table_rows
+            )
+
+        frame_store = FrameStore(os.path.join(temp_dir, 'frames')) if handoff == "arrow" else None
+        async with semaphore:
+            try:
+                html_content = await process_report_content_async(
+                    content, report_name, temp_dir, notebook_template, renderer, frame_store, timeout=timeout
+                )
+            except Exception as e:
+                # Written as an error page, like generate_simple_report does
+                print(f"Error processing content for {report_name}: {e}")
+                html_content = error_html(e)
+
+        await asyncio.to_thread(
+            write_page, report_name, html_content, output_dir, shared_assets, image_assets
+        )
+        report_path = os.path.join(output_dir, f"{filename}.html")
+
+        print(f"Report created successfully: {report_path}")
+        return report_path
+
+    except Exception as e:
+        print(f"Error creating simple report: {e}")
+        raise
+    finally:
+        # Clean up temporary directory
+        shutil.rmtree(temp_dir, ignore_errors=True)
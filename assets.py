@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+"""
+Shared Assets
+
+This module moves the style sheets and scripts that nbconvert inlines into the head of every
+page into shared, content-hashed files under `<output_dir>/assets/`. Every page links to
+the same files, so the theme CSS is stored once and cached by the browser across pages.
+Figures embedded as base64 data can be moved the same way, so that an image shown on
+several pages is stored once and loaded only when it scrolls into view.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import base64
+import binascii
+import hashlib
+import os
+import re
+from typing import List, Optional, Union
+
+if __package__:
+    from .files import SERVED_FILE_MODE, write_atomic
+else:  # Imported as a plain module, e.g. by example.py
+    from files import SERVED_FILE_MODE, write_atomic
+
+# Directory, relative to the output directory, holding the shared assets
+ASSETS_DIR = "assets"
+ASSET_HASH_LENGTH = 16
+
+# Inline blocks in the page head. Blocks with other attributes (media queries, module or
+# non-JavaScript scripts, ...) are left in place: module scripts cannot be loaded from
+# file:// URLs, and MathJax reads its configuration from inline text/x-mathjax-config blocks.
+HEAD_STYLE_RE = re.compile(r'<style(?:\s+type="text/css")?\s*>(.*?)</style>\s*', re.S | re.I)
+HEAD_SCRIPT_RE = re.compile(r'<script(?:\s+type="text/javascript")?\s*>(.*?)</script>\s*', re.S | re.I)
+
+# Images embedded as data URIs, as nbconvert writes PNG, JPEG, GIF and SVG outputs
+DATA_IMAGE_RE = re.compile(
+    r'<img\b([^>]*?)\bsrc=(["\'])data:image/([\w.+-]+);base64,([A-Za-z0-9+/=\s]*)\2([^>]*)>',
+    re.I
+)
+IMAGE_EXTENSIONS = {
+    'png': 'png',
+    'jpeg': 'jpg',
+    'gif': 'gif',
+    'webp': 'webp',
+    'svg+xml': 'svg'
+}
+
+#------------------------------------------------------------------------------
+# HELPER FUNCTIONS
+#------------------------------------------------------------------------------
+
+def write_asset(
+    output_dir: str,
+    content: Union[str, bytes],
+    extension: str,
+    prefix: str = "nb",
+    assets_dir: Optional[str] = None
+) -> str:
+    """
+    Write a content-hashed asset file, unless it already exists.
+
+    Args:
+        output_dir (str): Report output directory
+        content (Union[str, bytes]): The asset content, text or binary
+        extension (str): File extension, e.g. "css"
+        prefix (str): Start of the file name, e.g. "img" for images
+        assets_dir (str, optional): Directory to write the asset to instead of
+                                    output_dir/assets/, e.g. one shared by several reports
+
+    Returns:
+        str: Path of the asset relative to the output directory, using forward slashes
+    """
+    data = content.encode('utf-8') if isinstance(content, str) else content
+    digest = hashlib.sha256(data).hexdigest()[:ASSET_HASH_LENGTH]
+    filename = f"{prefix}-{digest}.{extension}"
+    if assets_dir is None:
+        relative_path = f"{ASSETS_DIR}/{filename}"
+        path = os.path.join(output_dir, ASSETS_DIR, filename)
+    else:
+        path = os.path.join(assets_dir, filename)
+        relative_path = os.path.relpath(path, output_dir).replace(os.sep, '/')
+
+    if not os.path.exists(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Concurrent writers never expose a partial asset
+        write_atomic(path, data, SERVED_FILE_MODE)
+
+    return relative_path
+
+def _extract_blocks(head: str, pattern: re.Pattern) -> List[str]:
+    """Get the bodies of all blocks in head matching pattern."""
+    return [match.group(1) for match in pattern.finditer(head)]
+
+#------------------------------------------------------------------------------
+# PAGE PROCESSING FUNCTIONS
+#------------------------------------------------------------------------------
+
+def extract_shared_assets(html_content: str, output_dir: str, assets_dir: Optional[str] = None) -> str:
+    """
+    Move the inline head styles and scripts of a page into shared asset files.
+
+    All plain `<style>` blocks of the head are concatenated in order into one style sheet,
+    linked where the first block was. Plain inline scripts are handled the same way. The
+    body, including the scoped styles of DataFrame tables, is left untouched.
+
+    Args:
+        html_content (str): The page HTML
+        output_dir (str): Report output directory the page is written to
+        assets_dir (str, optional): Directory for the asset files, output_dir/assets/ if None
+
+    Returns:
+        str: The page HTML linking to the shared assets
+    """
+    head_end = html_content.find('</head>')
+    if head_end < 0:
+        return html_content
+    head, rest = html_content[:head_end], html_content[head_end:]
+
+    for pattern, extension, tag in (
+        (HEAD_STYLE_RE, 'css', '<link rel="stylesheet" href="{}">\n'),
+        (HEAD_SCRIPT_RE, 'js', '<script src="{}"></script>\n')
+    ):
+        blocks = _extract_blocks(head, pattern)
+        if not blocks:
+            continue
+        asset_path = write_asset(output_dir, '\n'.join(blocks), extension, assets_dir=assets_dir)
+
+        # Replace the first block with the link and drop the others
+        replaced = []
+        def replace_block(match: re.Match) -> str:
+            if replaced:
+                return ''
+            replaced.append(match)
+            return tag.format(asset_path)
+        head = pattern.sub(replace_block, head)
+
+    return head + rest
+
+def extract_image_assets(html_content: str, output_dir: str, assets_dir: Optional[str] = None) -> str:
+    """
+    Move the base64-embedded images of a page into shared image files.
+
+    Every image is written once per distinct content as `assets/img-<hash>.<ext>` and its
+    tag is pointed at the file and loaded lazily, so the browser fetches and caches it only
+    when it scrolls into view.
+
+    Args:
+        html_content (str): The page HTML
+        output_dir (str): Report output directory the page is written to
+        assets_dir (str, optional): Directory for the image files, output_dir/assets/ if None
+
+    Returns:
+        str: The page HTML referencing the image files
+    """
+    def replace_image(match: re.Match) -> str:
+        before, quote, subtype, data, after = match.groups()
+        extension = IMAGE_EXTENSIONS.get(subtype.lower())
+        if extension is None:
+            return match.group(0)
+        try:
+            image = base64.b64decode(''.join(data.split()), validate=True)
+        except (binascii.Error, ValueError):
+            return match.group(0)
+        image_path = write_asset(output_dir, image, extension, prefix='img', assets_dir=assets_dir)
+        loading = '' if 'loading=' in (before + after).lower() else ' loading="lazy"'
+        return f'<img{before}src={quote}{image_path}{quote}{loading}{after}>'
+
+    return DATA_IMAGE_RE.sub(replace_image, html_content)
@@ -0,0 +1,439 @@
+#!/usr/bin/env python
+"""
+Benchmarks
+
+This module measures how generate_report scales with the shape of the report tree and the
+size of its content. Each scenario builds a synthetic data_dict, renders it into a temporary
+directory in a fresh process and records the stage timings of the build, the pages per
+second, the peak resident memory and the size of the output. Results are saved as JSON so
+that runs on different commits can be compared. Everything runs locally, without network
+access.
+
+Usage:
+    python -m qreporting.benchmark --output results.json
+    python -m qreporting.benchmark --scenario wide-small --repeat 3
+    python -m qreporting.benchmark --breadth 10 --levels 3 --leaf large --rows 50000
+    python -m qreporting.benchmark --compare baseline.json --output results.json
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Union
+
+if __package__:
+    from .core import generate_report
+else:  # Run as a plain script, e.g. python benchmark.py
+    from core import generate_report
+
+# Kinds of leaf content; "mixed" cycles through the others
+LEAF_KINDS = ("small", "large", "string", "nested", "mixed")
+MIXED_LEAF_KINDS = ("small", "string", "nested", "large")
+SMALL_FRAME_SHAPE = (10, 5)
+DEFAULT_LARGE_ROWS = 10000
+
+# Packages whose versions are recorded with the results
+RECORDED_PACKAGES = ("pandas", "nbconvert", "papermill", "jinja2", "dill", "pyarrow")
+
+#------------------------------------------------------------------------------
+# SCENARIOS
+#------------------------------------------------------------------------------
+
+@dataclass
+class Scenario:
+    """
+    Shape and settings of one benchmark run.
+
+    Attributes:
+        name (str): Name of the scenario in the results
+        breadth (int): Number of keys on every level of the data
+        levels (int): Number of nested dictionary levels above the leaves
+        depth (Union[int, Dict[str, int]]): Menu depth passed to generate_report; top-level
+                                            keys are named "Section 0", "Section 1", ...
+        leaf (str): Leaf content - "small" or "large" DataFrames, Markdown "string"s,
+                    "nested" dicts of strings and DataFrames, or "mixed"
+        rows (int): Rows of the "large" DataFrames
+        renderer (str): Renderer passed to generate_report
+        engine (str): Engine passed to generate_report
+        workers (int, optional): Worker processes passed to generate_report
+        options (Dict[str, Any]): Further keyword arguments for generate_report
+    """
+    name: str
+    breadth: int = 3
+    levels: int = 2
+    depth: Union[int, Dict[str, int]] = 2
+    leaf: str = "small"
+    rows: int = DEFAULT_LARGE_ROWS
+    renderer: str = "native"
+    engine: str = "papermill"
+    workers: Optional[int] = None
+    options: Dict[str, Any] = field(default_factory=dict)
+
+DEFAULT_SCENARIOS = [
+    Scenario("wide-small", breadth=25, levels=2, leaf="small"),
+    Scenario("deep-mixed", breadth=3, levels=5, depth=3, leaf="mixed", rows=2000),
+    Scenario(
+        "variable-depth",
+        breadth=4,
+        levels=4,
+        depth={"Section 0": 4, "Section 1": 1, "default": 2},
+        leaf="mixed",
+        rows=2000
+    ),
+    Scenario("nested-leaves", breadth=6, levels=2, depth=1, leaf="nested"),
+    Scenario("large-frames", breadth=3, levels=2, leaf="large", rows=200000),
+    Scenario("large-tables", breadth=3, levels=2, leaf="large", rows=200000, options={"large_table_rows": 1000}),
+    Scenario("kernel-engine", breadth=3, levels=2, leaf="mixed", renderer="notebook", engine="kernel", rows=2000),
+]
+
+#------------------------------------------------------------------------------
+# SYNTHETIC DATA
+#------------------------------------------------------------------------------
+
+def make_leaf(kind: str, index: int, rows: int, rng: Any) -> Any:
+    """
+    Build the content of one leaf.
+
+    Args:
+        kind (str): One of LEAF_KINDS
+        index (int): Position of the leaf, used to pick the kind of "mixed" leaves
+        rows (int): Rows of "large" DataFrames
+        rng (numpy.random.Generator): Random number generator
+
+    Returns:
+        Any: The leaf content
+    """
+    import numpy as np
+    import pandas as pd
+
+    if kind == "mixed":
+        kind = MIXED_LEAF_KINDS[index % len(MIXED_LEAF_KINDS)]
+
+    if kind == "small":
+        rows, columns = SMALL_FRAME_SHAPE
+        return pd.DataFrame(rng.standard_normal((rows, columns)), columns=[f"col_{i}" for i in range(columns)])
+    elif kind == "large":
+        return pd.DataFrame({
+            'date': pd.date_range('2020-01-01', periods=rows, freq='min'),
+            'category': rng.choice(['alpha', 'beta', 'gamma', 'delta'], rows),
+            'count': rng.integers(0, 1000, rows),
+            'value': rng.standard_normal(rows),
+            'share': rng.random(rows),
+            'flag': rng.random(rows) > 0.5,
+            'label': np.char.add('item_', rng.integers(0, 10000, rows).astype(str)),
+            'total': rng.standard_normal(rows).cumsum()
+        })
+    elif kind == "string":
+        return (
+            f"Leaf {index} summarises **{int(rng.integers(100, 1000))}** records.\n\n"
+            "- first point\n- second point\n- third point"
+        )
+    elif kind == "nested":
+        return {
+            'Summary': make_leaf("string", index, rows, rng),
+            'Table': make_leaf("small", index, rows, rng),
+            'Details': {
+                'Notes': make_leaf("string", index + 1, rows, rng),
+                'Data': make_leaf("small", index + 1, rows, rng)
+            }
+        }
+    raise ValueError(f"Unknown leaf kind: {kind}; expected one of {', '.join(LEAF_KINDS)}")
+
+def build_data_dict(scenario: Scenario, seed: int = 0) -> Dict[str, Any]:
+    """
+    Build the synthetic report data of a scenario.
+
+    Args:
+        scenario (Scenario): The scenario
+        seed (int): Random seed, so every run renders the same data
+
+    Returns:
+        Dict[str, Any]: Nested dictionary with scenario.breadth keys per level
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    leaves = [0]
+
+    def build_level(level: int) -> Dict[str, Any]:
+        data = {}
+        for i in range(scenario.breadth):
+            key = f"Section {i}" if level == 1 else f"Item {level}.{i}"
+            if level < scenario.levels:
+                data[key] = build_level(level + 1)
+            else:
+                data[key] = make_leaf(scenario.leaf, leaves[0], scenario.rows, rng)
+                leaves[0] += 1
+        return data
+
+    return build_level(1)
+
+#------------------------------------------------------------------------------
+# MEASUREMENT FUNCTIONS
+#------------------------------------------------------------------------------
+
+def directory_size(path: str) -> int:
+    """
+    Get the total size of the files under a directory.
+
+    Args:
+        path (str): The directory
+
+    Returns:
+        int: Size in bytes
+    """
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+def run_scenario(scenario: Scenario, seed: int = 0) -> Dict[str, Any]:
+    """
+    Build a scenario's data and render it, measuring the build.
+
+    Meant to run in a fresh process, so that the peak memory belongs to this scenario.
+
+    Args:
+        scenario (Scenario): The scenario
+        seed (int): Random seed for the data
+
+    Returns:
+        Dict[str, Any]: Pages, failures, stage timings in seconds, pages per second, peak
+                        resident memory of this process and of its children (workers and
+                        kernels) in megabytes, and output size in bytes
+    """
+    data_start = time.perf_counter()
+    data_dict = build_data_dict(scenario, seed)
+    data_seconds = time.perf_counter() - data_start
+
+    output_dir = tempfile.mkdtemp(prefix='qreporting-benchmark-')
+    try:
+        summary = generate_report(
+            data_dict,
+            output_dir,
+            report_title=scenario.name,
+            depth=scenario.depth,
+            workers=scenario.workers,
+            engine=scenario.engine,
+            renderer=scenario.renderer,
+            **scenario.options
+        )
+        output_bytes = directory_size(output_dir)
+    finally:
+        shutil.rmtree(output_dir, ignore_errors=True)
+
+    # ru_maxrss is in kilobytes on Linux
+    total = summary.timings['total']
+    return {
+        'pages': len(summary.pages),
+        'failures': len(summary.failures),
+        'data_seconds': data_seconds,
+        'timings': summary.timings,
+        'pages_per_second': len(summary.pages) / total if total else None,
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'children_peak_rss_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+        'output_bytes': output_bytes
+    }
+
+def run_isolated(scenario: Scenario, seed: int = 0) -> Dict[str, Any]:
+    """
+    Run a scenario in a new, freshly started Python process.
+
+    Args:
+        scenario (Scenario): The scenario
+        seed (int): Random seed for the data
+
+    Returns:
+        Dict[str, Any]: The measurements of run_scenario
+    """
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_scenario, scenario, seed).result()
+
+def environment_info() -> Dict[str, Any]:
+    """
+    Describe the machine and code a benchmark ran on.
+
+    Returns:
+        Dict[str, Any]: Time, git commit, Python and package versions, platform and CPU count
+    """
+    from importlib import metadata
+
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    packages = {}
+    for name in RECORDED_PACKAGES:
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+
+    return {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': packages
+    }
+
+def run_benchmarks(scenarios: List[Scenario], repeat: int = 1, seed: int = 0) -> Dict[str, Any]:
+    """
+    Run scenarios, each repeated in fresh processes.
+
+    The reported measurements of a scenario are those of its run with the median total time.
+
+    Args:
+        scenarios (List[Scenario]): Scenarios to run
+        repeat (int): Runs per scenario
+        seed (int): Random seed for the data
+
+    Returns:
+        Dict[str, Any]: Environment info and one result per scenario
+    """
+    results = []
+    for scenario in scenarios:
+        runs = [run_isolated(scenario, seed) for _ in range(repeat)]
+        runs.sort(key=lambda run: run['timings']['total'])
+        result = {'scenario': asdict(scenario), **runs[(len(runs) - 1) // 2]}
+        result['total_seconds'] = [run['timings']['total'] for run in runs]
+        results.append(result)
+        print(format_result(result))
+    return {'environment': environment_info(), 'results': results}
+
+#------------------------------------------------------------------------------
+# REPORTING FUNCTIONS
+#------------------------------------------------------------------------------
+
+def format_result(result: Dict[str, Any]) -> str:
+    """
+    Format one scenario result as a line of text.
+
+    Args:
+        result (Dict[str, Any]): A result of run_benchmarks
+
+    Returns:
+        str: Name, pages, total time, throughput, peak memory, output size and stage timings
+    """
+    stages = ', '.join(
+        f"{stage} {seconds:.2f}s" for stage, seconds in result['timings'].items() if stage != 'total'
+    )
+    return (
+        f"{result['scenario']['name']:<16} {result['pages']:>5} pages  "
+        f"{result['timings']['total']:>8.2f}s  {result['pages_per_second']:>8.1f} pages/s  "
+        f"peak {result['peak_rss_mb']:>7.1f} MB (children {result['children_peak_rss_mb']:.1f} MB)  "
+        f"output {result['output_bytes'] / (1024 * 1024):>8.2f} MB  [{stages}]"
+    )
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any]) -> List[str]:
+    """
+    Compare two benchmark runs scenario by scenario.
+
+    Args:
+        baseline (Dict[str, Any]): Results loaded from an earlier run
+        current (Dict[str, Any]): Results of this run
+
+    Returns:
+        List[str]: One line per scenario present in both runs
+    """
+    baseline_results = {result['scenario']['name']: result for result in baseline['results']}
+    lines = [f"Compared with {baseline['environment'].get('commit') or 'baseline'}:"]
+    for result in current['results']:
+        name = result['scenario']['name']
+        if name not in baseline_results:
+            continue
+        before = baseline_results[name]
+        lines.append(
+            f"{name:<16} time x{result['timings']['total'] / before['timings']['total']:.2f}  "
+            f"peak {result['peak_rss_mb'] - before['peak_rss_mb']:+.1f} MB  "
+            f"output {(result['output_bytes'] - before['output_bytes']) / (1024 * 1024):+.2f} MB"
+        )
+    return lines
+
+#------------------------------------------------------------------------------
+# COMMAND LINE INTERFACE
+#------------------------------------------------------------------------------
+
+def parse_depth(value: str) -> Union[int, Dict[str, int]]:
+    """Parse --depth, either an int or a JSON object mapping top-level keys to depths."""
+    try:
+        return int(value)
+    except ValueError:
+        return json.loads(value)
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Run the benchmarks from the command line."""
+    parser = argparse.ArgumentParser(description="Benchmark report generation")
+    parser.add_argument('--scenario', action='append', help="Run only this scenario (repeatable)")
+    parser.add_argument('--list', action='store_true', help="List the scenarios and exit")
+    parser.add_argument('--breadth', type=int, help="Run a custom scenario with this many keys per level")
+    parser.add_argument('--levels', type=int, help="Levels of the custom scenario")
+    parser.add_argument('--depth', type=parse_depth, help="Menu depth of the custom scenario, int or JSON")
+    parser.add_argument('--leaf', choices=LEAF_KINDS, help="Leaf content of the custom scenario")
+    parser.add_argument('--rows', type=int, help="Rows of large DataFrames in the custom scenario")
+    parser.add_argument('--renderer', help="Renderer of the custom scenario")
+    parser.add_argument('--engine', help="Engine of the custom scenario")
+    parser.add_argument('--workers', type=int, help="Worker processes of the custom scenario")
+    parser.add_argument('--repeat', type=int, default=1, help="Runs per scenario")
+    parser.add_argument('--seed', type=int, default=0, help="Random seed for the synthetic data")
+    parser.add_argument('--output', help="Save the results to this JSON file")
+    parser.add_argument('--compare', help="Compare with results saved by an earlier run")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for scenario in DEFAULT_SCENARIOS:
+            print(scenario)
+        return
+
+    custom = {
+        name: getattr(args, name)
+        for name in ('breadth', 'levels', 'depth', 'leaf', 'rows', 'renderer', 'engine', 'workers')
+        if getattr(args, name) is not None
+    }
+    if custom:
+        scenarios = [Scenario("custom", **custom)]
+    elif args.scenario:
+        by_name = {scenario.name: scenario for scenario in DEFAULT_SCENARIOS}
+        unknown = [name for name in args.scenario if name not in by_name]
+        if unknown:
+            parser.error(f"Unknown scenario(s): {', '.join(unknown)}")
+        scenarios = [by_name[name] for name in args.scenario]
+    else:
+        scenarios = DEFAULT_SCENARIOS
+
+    results = run_benchmarks(scenarios, args.repeat, args.seed)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            print('\n'.join(compare_results(json.load(f), results)))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"Results saved to {args.output}")
+
+if __name__ == '__main__':
+    sys.exit(main())
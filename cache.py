@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+"""
+Render Cache
+
+This module provides a persistent, content-addressed cache of rendered report pages.
+A page is keyed by a hash of its serialized content, its title, the notebook template,
+the renderer, the handoff format, the pandas version and the exporter configuration, so
+a page whose inputs did not change is reused without starting a kernel.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+if __package__:
+    from .exporter import exporter_fingerprint
+    from .files import write_atomic
+    from .lazy import is_lazy, lazy_digest
+else:  # Imported as a plain module, e.g. by example.py
+    from exporter import exporter_fingerprint
+    from files import write_atomic
+    from lazy import is_lazy, lazy_digest
+
+# Bump when the page layout changes in a way the other key parts do not capture
+CACHE_FORMAT_VERSION = 2
+CACHE_FILE_SUFFIX = '.html'
+# Statistics of a cache, and of each build using it
+CACHE_STATS = ('hits', 'misses', 'evictions')
+
+#------------------------------------------------------------------------------
+# HELPER FUNCTIONS
+#------------------------------------------------------------------------------
+
+class _HashWriter:
+    """File-like object that feeds everything written to it into a hash."""
+
+    def __init__(self, digest: Any):
+        self.digest = digest
+
+    def write(self, data: bytes) -> int:
+        self.digest.update(data)
+        return len(data)
+
+def hash_file(path: str) -> str:
+    """
+    Get the SHA-256 hex digest of a file.
+
+    Args:
+        path (str): Path to the file
+
+    Returns:
+        str: Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def hash_content(content: Any) -> str:
+    """
+    Get a stable SHA-256 hex digest of report content.
+
+    The content is dill-serialized straight into the hash, so large objects are never
+    held in memory as a second, serialized copy.
+
+    Args:
+        content (Any): The report content
+
+    Returns:
+        str: Hex digest of the serialized content
+    """
+    import dill
+
+    digest = hashlib.sha256()
+    dill.dump(content, _HashWriter(digest))
+    return digest.hexdigest()
+
+#------------------------------------------------------------------------------
+# RENDER CACHE
+#------------------------------------------------------------------------------
+
+class RenderCache:
+    """
+    On-disk cache of rendered report pages.
+
+    Entries are stored as `<cache_dir>/<key[:2]>/<key>.html`. Reading an entry refreshes its
+    modification time, so eviction removes the least recently used pages first.
+
+    Args:
+        cache_dir (str): Directory holding the cache
+        max_size_mb (float, optional): Evict least recently used entries above this total size
+        max_age_days (float, optional): Evict entries not used for this many days
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_size_mb: Optional[float] = None,
+        max_age_days: Optional[float] = None
+    ):
+        self.cache_dir = cache_dir
+        self.max_size_mb = max_size_mb
+        self.max_age_days = max_age_days
+        os.makedirs(cache_dir, exist_ok=True)
+
+        # Statistics, cumulative over the lifetime of the instance. Builds sharing the cache
+        # update them from several threads, and count their own in the dictionary they pass.
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._stats_lock = threading.Lock()
+
+        # Template digests by (path, mtime), so templates are hashed once per build
+        self._template_digests: Dict[Tuple[str, float], str] = {}
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the cache statistics.
+
+        Returns:
+            Dict[str, int]: Counts of hits, misses and evictions
+        """
+        with self._stats_lock:
+            return {name: getattr(self, name) for name in CACHE_STATS}
+
+    def _count(self, name: str, count: int, build_stats: Optional[Dict[str, int]]) -> None:
+        """Add to a statistic of the cache and of the build it was counted for."""
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + count)
+            if build_stats is not None:
+                build_stats[name] = build_stats.get(name, 0) + count
+
+    def _template_digest(self, notebook_template: str) -> str:
+        """Get the digest of a notebook template, hashing it at most once per version."""
+        version = (os.path.abspath(notebook_template), os.path.getmtime(notebook_template))
+        if version not in self._template_digests:
+            self._template_digests[version] = hash_file(notebook_template)
+        return self._template_digests[version]
+
+    def key(
+        self,
+        content: Any,
+        report_name: str,
+        notebook_template: str,
+        renderer: str = "notebook",
+        content_digest: Optional[str] = None,
+        handoff: str = "dill"
+    ) -> Optional[str]:
+        """
+        Compute the cache key of a page.
+
+        Lazy leaves are identified by their key rather than by their content. The pandas
+        version is part of the key, since the kernel renders DataFrames with pandas, and so
+        is the handoff format, since the Arrow round-trip may change dtypes and indexes.
+
+        Args:
+            content (Any): The report content
+            report_name (str): Name of the report, which is also the page title
+            notebook_template (str): Path to the notebook template
+            renderer (str): Renderer name
+            content_digest (str, optional): Digest of the content from hash_content, or
+                                            lazy_digest for a lazy leaf, if already computed
+            handoff (str): Handoff format the content is given to the kernel in
+
+        Returns:
+            Optional[str]: Hex digest identifying the rendered page, None for a lazy leaf
+                           without a key, which is not cached
+        """
+        if content_digest is None:
+            content_digest = lazy_digest(content) if is_lazy(content) else hash_content(content)
+        if content_digest is None:
+            return None
+        import pandas
+
+        parts = {
+            'version': CACHE_FORMAT_VERSION,
+            'content': content_digest,
+            'report_name': report_name,
+            'template': self._template_digest(notebook_template),
+            'renderer': renderer,
+            'handoff': handoff,
+            'pandas': pandas.__version__,
+            'exporter': exporter_fingerprint()
+        }
+        return hashlib.sha256(json.dumps(parts, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + CACHE_FILE_SUFFIX)
+
+    def get(self, key: str, build_stats: Optional[Dict[str, int]] = None) -> Optional[str]:
+        """
+        Look up a rendered page.
+
+        Args:
+            key (str): Cache key from key()
+            build_stats (Dict[str, int], optional): Statistics of the build, also counting the lookup
+
+        Returns:
+            Optional[str]: The cached HTML, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                html_content = f.read()
+        except OSError:
+            self._count('misses', 1, build_stats)
+            return None
+
+        # Mark as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self._count('hits', 1, build_stats)
+        return html_content
+
+    def put(self, key: str, html_content: str) -> None:
+        """
+        Store a rendered page.
+
+        The entry is written to a temporary file and moved into place, so concurrent
+        builds sharing the cache never read a partial entry.
+
+        Args:
+            key (str): Cache key from key()
+            html_content (str): The rendered HTML
+        """
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, html_content)
+
+    def _entries(self) -> List[Tuple[float, int, str]]:
+        """List cache entries as (last used time, size, path)."""
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if not name.endswith(CACHE_FILE_SUFFIX):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def evict(self, build_stats: Optional[Dict[str, int]] = None) -> int:
+        """
+        Remove entries older than max_age_days, then the least recently used entries
+        until the cache is below max_size_mb.
+
+        Args:
+            build_stats (Dict[str, int], optional): Statistics of the build, also counting
+                                                    the evictions
+
+        Returns:
+            int: Number of entries removed
+        """
+        if self.max_age_days is None and self.max_size_mb is None:
+            return 0
+
+        entries = sorted(self._entries())
+        removed = []
+        if self.max_age_days is not None:
+            cutoff = time.time() - self.max_age_days * 24 * 3600
+            removed = [entry for entry in entries if entry[0] < cutoff]
+            entries = [entry for entry in entries if entry[0] >= cutoff]
+        if self.max_size_mb is not None:
+            total = sum(size for _, size, _ in entries)
+            limit = self.max_size_mb * 1024 * 1024
+            while entries and total > limit:
+                entry = entries.pop(0)
+                total -= entry[1]
+                removed.append(entry)
+
+        for _, _, path in removed:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._count('evictions', len(removed), build_stats)
+        return len(removed)
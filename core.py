@@ -13,42 +13,171 @@ and integrates with Jupyter notebooks via papermill for content processing.
 import os
 import sys
 import shutil
-import subprocess
+import tempfile
+import time
 import argparse
-import dill
-from typing import Dict, Any, Optional, Union, List
-import jinja2
-import papermill as pm
-import pandas as pd
+import contextlib
+import functools
+import heapq
+import math
+import threading
+import multiprocessing.util
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from itertools import chain
+from typing import TYPE_CHECKING, Dict, Any, Optional, Union, List, Tuple, Iterable, Iterator, Callable
 import json
 
+# papermill and jinja2 are imported on first use, so that importing the package stays fast
+if TYPE_CHECKING:
+    import jinja2
+
+if __package__:
+    from .engine import KernelEngine
+    from .exporter import export_notebook_html
+    from .renderer import build_native_notebook, is_native_supported
+    from .cache import CACHE_STATS, RenderCache
+    from .assets import ASSETS_DIR, extract_image_assets, extract_shared_assets, write_asset
+    from .handoff import HANDOFF_FORMATS, FrameStore, dump_content, dump_file_reference, is_arrow_file, load_content
+    from .tables import remove_page_tables, replace_large_tables
+    from .lazy import is_lazy, leaf_file, resolve_leaf
+    from .publish import copy_release, is_published, publish_release
+    from .limits import (
+        MAX_LOST_RESUBMITS, SLOW_LEAVES_REPORTED, TIMEOUT_MARKER, LeafTimeoutError, LeafWatchdog, pool_timed_out,
+        set_memory_limit
+    )
+    from .search import SearchIndex
+    from .spool import CONTENT_FILE, Spool
+    from .plan import DEFAULT_DEPTH, TABLE_OF_CONTENTS_NAME, PlanNode, ReportPlan, get_depth_for_key, slugify
+    from .manifest import StoredPage, content_hash, load_manifest, menu_outline, merge_report, stored_report, write_manifest
+    from .tracing import TraceEvent, Tracer, trace_span
+else:  # Imported as a plain module, e.g. by example.py
+    from engine import KernelEngine
+    from exporter import export_notebook_html
+    from renderer import build_native_notebook, is_native_supported
+    from cache import CACHE_STATS, RenderCache
+    from assets import ASSETS_DIR, extract_image_assets, extract_shared_assets, write_asset
+    from handoff import HANDOFF_FORMATS, FrameStore, dump_content, dump_file_reference, is_arrow_file, load_content
+    from tables import remove_page_tables, replace_large_tables
+    from lazy import is_lazy, leaf_file, resolve_leaf
+    from publish import copy_release, is_published, publish_release
+    from limits import (
+        MAX_LOST_RESUBMITS, SLOW_LEAVES_REPORTED, TIMEOUT_MARKER, LeafTimeoutError, LeafWatchdog, pool_timed_out,
+        set_memory_limit
+    )
+    from search import SearchIndex
+    from spool import CONTENT_FILE, Spool
+    from plan import DEFAULT_DEPTH, TABLE_OF_CONTENTS_NAME, PlanNode, ReportPlan, get_depth_for_key, slugify
+    from manifest import StoredPage, content_hash, load_manifest, menu_outline, merge_report, stored_report, write_manifest
+    from tracing import TraceEvent, Tracer, trace_span
+
 # Constants
-DEFAULT_DEPTH = 2
-REPORT_TEMPLATE_PATH = "templates/report_template.html"
-ICON_MAPPING_PATH = "templates/report_template_icons.json"
-NOTEBOOK_TEMPLATE_PATH = "templates/generic_report_template.ipynb"  # Should be provided by user
+TEMPLATES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+REPORT_TEMPLATE_PATH = os.path.join(TEMPLATES_DIR, "report_template.html")
+ICON_MAPPING_PATH = os.path.join(TEMPLATES_DIR, "report_template_icons.json")
+NOTEBOOK_TEMPLATE_PATH = os.path.join(TEMPLATES_DIR, "generic_report_template.ipynb")  # Should be provided by user
+DEFAULT_ICON_MAPPINGS = {
+    "Dashboard": "home",
+    "Reports": "chart-bar",
+    "Settings": "cog",
+    "Table of Contents": "sitemap"
+}
+ENGINES = ("papermill", "kernel")
+RENDERERS = ("notebook", "native")
+MAX_JOBS_IN_FLIGHT_PER_WORKER = 2
+# Reports generate_reports_batch builds at once on a pool, so that the pool keeps rendering
+# the pages of one report while another writes its Table of Contents and index.html
+DEFAULT_CONCURRENT_REPORTS = 2
 
 #------------------------------------------------------------------------------
 # HELPER FUNCTIONS
 #------------------------------------------------------------------------------
 
-def get_depth_for_key(depth_dict: Dict[str, int], key: str) -> int:
+@functools.lru_cache(maxsize=None)
+def load_icon_mappings(icon_mapping_path: str = ICON_MAPPING_PATH) -> Dict[str, str]:
+    """
+    Load the menu icon mappings, once per process.
+    
+    Args:
+        icon_mapping_path (str): Path to the JSON file mapping menu keys to icon names
+        
+    Returns:
+        Dict[str, str]: The icon mappings, or a default set if the file cannot be loaded
+    """
+    try:
+        with open(icon_mapping_path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError) as e:
+        print(f"Warning: Could not load icon mappings: {e}")
+        # Use default fallback if file cannot be loaded
+        return dict(DEFAULT_ICON_MAPPINGS)
+
+@functools.lru_cache(maxsize=None)
+def get_report_template(
+    template_path: str = REPORT_TEMPLATE_PATH,
+    bytecode_cache_dir: Optional[str] = None
+) -> 'jinja2.Template':
     """
-    Get the depth value for a specific key from the depth dictionary.
+    Get the compiled report shell template, once per process.
     
     Args:
-        depth_dict (Dict[str, int]): Dictionary mapping keys to depth values
-        key (str): The key to look up
+        template_path (str): Path to the Jinja template of index.html
+        bytecode_cache_dir (str, optional): Directory where Jinja keeps the compiled template,
+                                            so later processes skip compiling it
         
     Returns:
-        int: The depth value for the key, or the default if not found
+        jinja2.Template: The compiled template
+    """
+    import jinja2
+    
+    bytecode_cache = None
+    if bytecode_cache_dir is not None:
+        os.makedirs(bytecode_cache_dir, exist_ok=True)
+        bytecode_cache = jinja2.FileSystemBytecodeCache(bytecode_cache_dir)
+    
+    env = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(os.path.dirname(os.path.abspath(template_path))),
+        bytecode_cache=bytecode_cache
+    )
+    return env.get_template(os.path.basename(template_path))
+
+@dataclass
+class BuildSummary:
     """
-    # If the key exists, return its depth
-    if key in depth_dict:
-        return depth_dict[key]
+    Summary of a report build returned by generate_report and update_report.
     
-    # Otherwise check for a default, or use the global default
-    return depth_dict.get('default', DEFAULT_DEPTH)
+    Attributes:
+        pages (List[str]): Report names of all pages written, in the order they were written
+        removed (List[str]): Report names of pages deleted by update_report
+        failures (Dict[str, str]): Error messages for reports that failed to render
+        cache_stats (Dict[str, int]): Render cache hits, misses and evictions of this build
+        timings (Dict[str, float]): Seconds spent in each stage of the build - "plan" (menu
+                                    tree), "table_of_contents", "render" (page content),
+                                    "write" (page assets and files), "search" (search
+                                    index, if enabled), "shell" (index.html), "publish"
+                                    (if enabled) and "total"
+        slow_leaves (List[Tuple[str, float]]): The slowest rendered reports, with their render
+                                               seconds, slowest first
+        timed_out (List[str]): Reports that failed for going over the leaf timeout
+        retries (Dict[str, int]): Reports rendered again after timing out or losing their
+                                  worker, with the number of retries
+        published (Dict[str, Any]): The release written by publish, with the files added,
+                                    changed and removed (see publish_release)
+        error (str, optional): Why the build failed, for builds of generate_reports_batch
+                               that raised instead of returning
+    """
+    pages: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    failures: Dict[str, str] = field(default_factory=dict)
+    cache_stats: Dict[str, int] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)
+    slow_leaves: List[Tuple[str, float]] = field(default_factory=list)
+    timed_out: List[str] = field(default_factory=list)
+    retries: Dict[str, int] = field(default_factory=dict)
+    published: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
 
 #------------------------------------------------------------------------------
 # MENU STRUCTURE FUNCTIONS
@@ -56,68 +185,22 @@ def get_depth_for_key(depth_dict: Dict[str, int], key: str) -> int:
 
 def flatten_dict_to_menu(
     data_dict: Dict[str, Any], 
-    depth: Union[int, Dict[str, int]] = DEFAULT_DEPTH, 
-    current_depth: int = 1,
-    current_key: str = ""
+    depth: Union[int, Dict[str, int]] = DEFAULT_DEPTH
 ) -> Dict[str, Any]:
     """
-    Recursively process nested dictionary to create menu structure.
+    Create the menu structure of a nested dictionary.
     
     Args:
-        data_dict (Dict[str, Any]): The nested dictionary to process
+        data_dict (Dict[str, Any]): The nested dictionary to process, or a
+                                    DirectoryReportSource
         depth (Union[int, Dict[str, int]]): Maximum depth to process - either a fixed int or a dict
                                            mapping keys to depths
-        current_depth (int): Current depth in the recursion
-        current_key (str): Current top-level key being processed
         
     Returns:
-        Dict[str, Any]: A menu structure dictionary
+        Dict[str, Any]: A menu structure dictionary, mapping each key to the file name of its
+                        page or to the dictionary of its submenu (see ReportPlan.menu)
     """
-    menu = {}
-    
-    # Handle depth as either int or dict
-    max_depth = depth
-    if isinstance(depth, dict):
-        if current_depth == 1:
-            # At top level, we don't have a key yet, so we process each key with its own depth
-            for key, value in data_dict.items():
-                key_depth = get_depth_for_key(depth, key)
-                if isinstance(value, dict) and current_depth < key_depth:
-                    # Process with the specific depth for this key
-                    submenu = flatten_dict_to_menu(value, depth, current_depth + 1, key)
-                    if submenu:  # Only add non-empty submenus
-                        menu[key] = submenu
-                else:
-                    # For leaf nodes or when we've reached max depth
-                    if current_depth >= key_depth:
-                        # We've reached maximum depth, use an empty dict as placeholder
-                        menu[key] = {}
-                    else:
-                        # For actual leaf nodes (non-dict values) at lower depths
-                        menu[key] = value
-            return menu
-        else:
-            # Not at top level, use the current_key to get the depth
-            max_depth = get_depth_for_key(depth, current_key)
-    
-    # Process each item with the determined depth
-    for key, value in data_dict.items():
-        if isinstance(value, dict) and current_depth < max_depth:
-            # Process nested dictionary recursively
-            submenu = flatten_dict_to_menu(value, depth, current_depth + 1, current_key)
-            if submenu:  # Only add non-empty submenus
-                menu[key] = submenu
-        else:
-            # For leaf nodes or when we've reached max depth
-            # If we're at the last depth level, always use an empty dict
-            if current_depth >= max_depth:
-                # We've reached maximum depth, use an empty dict as placeholder
-                menu[key] = {}
-            else:
-                # For actual leaf nodes (non-dict values) at lower depths
-                menu[key] = value
-            
-    return menu
+    return ReportPlan.build(data_dict, depth).menu()
 
 #------------------------------------------------------------------------------
 # CONTENT PROCESSING FUNCTIONS
@@ -127,141 +210,903 @@ def process_report_content(
     content: Any, 
     report_name: str,
     temp_dir: str,
-    notebook_template: str
+    notebook_template: str,
+    errors: Optional[Dict[str, str]] = None,
+    engine: Optional[KernelEngine] = None,
+    renderer: str = "notebook",
+    frame_store: Optional[FrameStore] = None,
+    content_path: Optional[str] = None,
+    tracer: Optional[Tracer] = None,
+    timeout: Optional[float] = None
 ) -> str:
     """
     Process report content through a Jupyter notebook template.
     
     Args:
-        content (Any): The report content to process
+        content (Any): The report content to process. Lazy leaves (see lazy.py) are resolved
+                       here and released when the page is done; leaves reading an Arrow
+                       IPC file are handed to the notebook kernel as a file reference.
         report_name (str): Name of the report
         temp_dir (str): Directory for temporary files
         notebook_template (str): Path to the notebook template
+        errors (Dict[str, str], optional): Dictionary collecting the error message if processing fails
+        engine (KernelEngine, optional): Warm kernel engine to execute the notebook on.
+                                         If None, papermill runs the notebook on a new kernel.
+        renderer (str): "notebook" always executes the notebook template. "native" builds the
+                        page in Python for the built-in content types and only falls back to
+                        the notebook for content it does not support.
+        frame_store (FrameStore, optional): Store for handing DataFrames and Series to the kernel
+                                            as Arrow files. If None, the content is a plain dill pickle.
+                                            A lazy leaf uses a store of its own in temp_dir.
+        content_path (str, optional): File the content was already written to with dump_content,
+                                      handed to the kernel as is
+        tracer (Tracer, optional): Records the time of each stage and of each notebook cell
+        timeout (float, optional): Seconds the notebook may run; a slower notebook is stopped
+                                   and replaced by an error block
         
     Returns:
-        str: HTML content generated from the notebook
+        str: HTML content generated from the notebook, or an error block if processing failed
     """
     # Create sanitized filename
-    filename = f"{report_name}".lower().replace(' ', '_').replace('/', '-')
-    
-    # Paths for processing
-    pickle_path = os.path.join(temp_dir, f"{filename}.pkl")
-    executed_notebook_path = os.path.join(temp_dir, f"{filename}.ipynb")
-    html_path = os.path.join(temp_dir, f"{filename}.html")
+    filename = slugify(f"{report_name}")
     
-    # Save content to pickle
-    with open(pickle_path, 'wb') as f:
-        dill.dump(content, f)
+    # Path for the content handed to the kernel
+    pickle_path = content_path or os.path.join(temp_dir, f"{filename}.pkl")
+    deadline = time.monotonic() + timeout if timeout is not None else None
     
     try:
-        # Execute the notebook with papermill
-        pm.execute_notebook(
-            notebook_template,
-            executed_notebook_path,
-            parameters={
-                'report_path': pickle_path,
-                'title': report_name,
-                'paths': sys.path
-            }
-        )
+        if renderer == "notebook" and content_path is None and is_arrow_file(leaf_file(content)):
+            # The kernel memory-maps the file itself, so it is neither loaded nor pickled here
+            with trace_span(tracer, 'serialize', report_name, reference=True) as details:
+                dump_file_reference(leaf_file(content), pickle_path)
+                details['bytes'] = os.path.getsize(pickle_path)
+            content_path = pickle_path
+        elif is_lazy(content):
+            with trace_span(tracer, 'resolve', report_name):
+                content = resolve_leaf(content)
+            if frame_store is not None:
+                # The frames of a resolved leaf belong to this page alone; a store of the
+                # page does not keep them in memory once the page is done
+                frame_store = FrameStore(os.path.join(temp_dir, 'frames'))
         
-        # Convert notebook to HTML
-        subprocess.run(
-                [
-                    "jupyter", "nbconvert",
-                    "--to", "html",
-                    executed_notebook_path,
-                    "--output", os.path.basename(html_path),
-                    "--no-input"
-                ],
-                check=True  # Ensures it raises an exception if the command fails
-            )
+        if renderer == "native" and is_native_supported(content):
+            # Build the executed notebook directly, without a kernel
+            with trace_span(tracer, 'native_render', report_name):
+                executed_notebook = build_native_notebook(content, report_name)
+        else:
+            # Save content for the kernel, unless the caller already did
+            if content_path is None:
+                with trace_span(tracer, 'serialize', report_name) as details:
+                    dump_content(content, pickle_path, frame_store)
+                    details['bytes'] = os.path.getsize(pickle_path)
+            
+            if engine is not None:
+                with trace_span(tracer, 'kernel_start', report_name) as details:
+                    details['started'] = engine.ensure_started()
+                
+                # Execute only the per-report cells on the warm kernel
+                with trace_span(tracer, 'execute', report_name, engine='kernel') as details:
+                    executed_notebook = engine.execute({
+                        'report_path': pickle_path,
+                        'title': report_name
+                    }, max(deadline - time.monotonic(), 0) if deadline is not None else None)
+                    details['kernel_rss_mb'] = engine.kernel_memory_mb()
+            else:
+                import papermill as pm
+                
+                # Execute the notebook with papermill, keeping the result in memory
+                with trace_span(tracer, 'execute', report_name, engine='papermill'):
+                    executed_notebook = pm.execute_notebook(
+                        notebook_template,
+                        None,
+                        parameters={
+                            'report_path': pickle_path,
+                            'title': report_name,
+                            'paths': sys.path
+                        },
+                        # Papermill times each cell; the watchdog of a pool worker bounds the total
+                        execution_timeout=max(math.ceil(deadline - time.monotonic()), 1) if deadline is not None else None
+                    )
+            if tracer is not None:
+                tracer.add_cell_events(executed_notebook, report_name)
+        
+        # Convert notebook to HTML in process
+        with trace_span(tracer, 'export', report_name) as details:
+            html_content = export_notebook_html(executed_notebook, filename)
+            details['bytes'] = len(html_content)
         
-        # Read the HTML content
-        with open(html_path, 'r', encoding='utf-8') as f:
-            html_content = f.read()
-        
-        # For Table of Contents, inject the JavaScript function
-        if report_name == "Table of Contents":
-            # Simplified and direct approach with globally accessible function
-            js_handler = """
-            <script>
-            // Global function to handle TOC link clicks
-            window.handleTocLinkClick = function(url, title) {
-                try {
-                    // First, check if we are in an iframe
-                    if (window !== window.parent) {
-                        // Try to use parent's showContentInIframe function
-                        window.parent.showContentInIframe(url, title, null);
-                    } else if (typeof window.showContentInIframe === 'function') {
-                        // We're in the main window directly
-                        window.showContentInIframe(url, title, null);
-                    } else {
-                        // Fallback to direct navigation
-                        window.location.href = url;
-                    }
-                } catch (e) {
-                    console.error("Error handling TOC link:", e);
-                    // Fallback to direct navigation on error
+        html_content = add_page_scripts(html_content, report_name)
+            
+        return html_content
+    
+    except Exception as e:
+        print(f"Error processing content for {report_name}: {e}")
+        if errors is not None:
+            # Some errors, e.g. MemoryError, have no message
+            errors[report_name] = str(e) or type(e).__name__
+        return error_html(e)
+
+def add_page_scripts(html_content: str, report_name: str) -> str:
+    """
+    Add the scripts specific to a page to its exported HTML.
+    
+    Args:
+        html_content (str): The exported page
+        report_name (str): Name of the report
+        
+    Returns:
+        str: The page, with the link handler added to the Table of Contents
+    """
+    # For Table of Contents, inject the JavaScript function
+    if report_name == TABLE_OF_CONTENTS_NAME:
+        # Simplified and direct approach with globally accessible function
+        js_handler = """
+        <script>
+        // Global function to handle TOC link clicks
+        window.handleTocLinkClick = function(url, title) {
+            try {
+                // First, check if we are in an iframe
+                if (window !== window.parent) {
+                    // Try to use parent's showContentInIframe function
+                    window.parent.showContentInIframe(url, title, null);
+                } else if (typeof window.showContentInIframe === 'function') {
+                    // We're in the main window directly
+                    window.showContentInIframe(url, title, null);
+                } else {
+                    // Fallback to direct navigation
                     window.location.href = url;
                 }
-                
-                return false; // Prevent default anchor behavior
-            };
+            } catch (e) {
+                console.error("Error handling TOC link:", e);
+                // Fallback to direct navigation on error
+                window.location.href = url;
+            }
             
-            // Apply to all TOC links after DOM is loaded
-            document.addEventListener('DOMContentLoaded', function() {
-                document.querySelectorAll('.toc-link').forEach(function(link) {
-                    link.addEventListener('click', function(e) {
-                        e.preventDefault();
-                        var url = this.getAttribute('data-url');
-                        var title = this.getAttribute('data-title');
-                        handleTocLinkClick(url, title);
-                    });
+            return false; // Prevent default anchor behavior
+        };
+        
+        // Apply to all TOC links after DOM is loaded
+        document.addEventListener('DOMContentLoaded', function() {
+            document.querySelectorAll('.toc-link').forEach(function(link) {
+                link.addEventListener('click', function(e) {
+                    e.preventDefault();
+                    var url = this.getAttribute('data-url');
+                    var title = this.getAttribute('data-title');
+                    handleTocLinkClick(url, title);
                 });
             });
-            </script>
-            """
+        });
+        </script>
+        """
+        
+        # Insert the script just before the closing </body> tag
+        html_content = html_content.replace('</body>', f'{js_handler}\n</body>')
+    
+    return html_content
+
+def error_html(error: Exception) -> str:
+    """
+    Build the HTML block shown in place of a report that failed to render.
+    
+    Args:
+        error (Exception): The error raised while rendering
+        
+    Returns:
+        str: HTML error block
+    """
+    return f"<div class='error'>Error processing report: {str(error)}</div>"
+
+# Kernel engine of the current pool worker process, set up by _init_report_worker
+_worker_engine = None
+# Directory of the current worker's pool for the markers of the leaf watchdog
+_worker_pool_dir = None
+
+def _init_report_worker(
+    engine: str,
+    notebook_template: str,
+    engine_options: Dict[str, Any],
+    pool_dir: Optional[str] = None
+) -> None:
+    """
+    Initialize a pool worker process, creating its warm kernel engine if requested.
+    
+    Args:
+        engine (str): Execution engine name, one of ENGINES
+        notebook_template (str): Path to the notebook template
+        engine_options (Dict[str, Any]): Keyword arguments for KernelEngine
+        pool_dir (str, optional): Directory of the pool for the markers of the leaf watchdog
+    """
+    global _worker_engine, _worker_pool_dir
+    _worker_pool_dir = pool_dir
+    if engine == "kernel":
+        _worker_engine = KernelEngine(notebook_template, **engine_options)
+        # Pool workers exit without running atexit handlers, so register with multiprocessing
+        multiprocessing.util.Finalize(_worker_engine, _worker_engine.shutdown, exitpriority=10)
+
+def _process_report_job(
+    content_path: str,
+    report_name: str,
+    temp_dir: str,
+    notebook_template: str,
+    renderer: str = "notebook",
+    trace: bool = False,
+    lazy: bool = False,
+    handoff: str = "dill",
+    timeout: Optional[float] = None,
+    memory_mb: Optional[float] = None,
+    watchdog: bool = True
+) -> Tuple[str, Optional[str], List[TraceEvent], Dict[str, Any]]:
+    """
+    Worker entry point for rendering a single report in a process pool.
+    
+    The parent writes the content with dump_content, so anything the notebook template
+    can load (lambdas, local classes, ...) can also cross the process boundary. The file
+    goes straight to the kernel; it is only loaded here for the native renderer, and for
+    lazy leaves, which are resolved in the worker and handed to the kernel from here.
+    
+    Args:
+        content_path (str): File the report content was written to
+        report_name (str): Name of the report
+        temp_dir (str): Directory for temporary files, private to this report
+        notebook_template (str): Path to the notebook template
+        renderer (str): Renderer name, one of RENDERERS
+        trace (bool): Record trace events for the parent's tracer
+        lazy (bool): The content is a lazy leaf
+        handoff (str): Handoff format for the resolved content of a lazy leaf
+        timeout (float, optional): Seconds the report may take (see limits.py)
+        memory_mb (float, optional): Address-space limit of this process and its kernels
+        watchdog (bool): Kill this process if the report is stuck past its timeout, leaving
+                         TIMEOUT_MARKER in temp_dir for the parent
+        
+    Returns:
+        Tuple[str, Optional[str], List[TraceEvent], Dict[str, Any]]: The HTML content, the
+            error message if any, the trace events, and the "seconds" the report took and
+            whether it "timed_out"
+    """
+    errors = {}
+    content = None
+    tracer = Tracer() if trace else None
+    frame_store = None
+    set_memory_limit(memory_mb)
+    job_start = time.perf_counter()
+    
+    def result(html_content: str, error: Optional[str]) -> Tuple[str, Optional[str], List[TraceEvent], Dict[str, Any]]:
+        seconds = time.perf_counter() - job_start
+        timed_out = error is not None and timeout is not None and seconds >= timeout
+        return html_content, error, tracer.events if tracer else [], {'seconds': seconds, 'timed_out': timed_out}
+    
+    with LeafWatchdog(timeout, os.path.join(temp_dir, TIMEOUT_MARKER), _worker_pool_dir) if timeout is not None and watchdog else contextlib.nullcontext():
+        if renderer == "native" or lazy:
+            try:
+                with trace_span(tracer, 'load', report_name):
+                    content = load_content(content_path)
+                if lazy:
+                    # The kernel gets the resolved content, written by process_report_content
+                    content_path = None
+                    if handoff == "arrow":
+                        frame_store = FrameStore(os.path.join(temp_dir, 'frames'))
+            except Exception as e:
+                print(f"Error processing content for {report_name}: {e}")
+                return result(error_html(e), str(e))
+        html_content = process_report_content(
+            content, report_name, temp_dir, notebook_template, errors, _worker_engine, renderer,
+            frame_store, content_path, tracer, timeout
+        )
+    return result(html_content, errors.get(report_name))
+
+class _WorkerPool(ProcessPoolExecutor):
+    """
+    Process pool rendering reports, with a directory for the markers of its leaf watchdogs.
+    
+    A worker killed by its watchdog breaks the whole pool, and every report in flight on it
+    fails with BrokenProcessPool. The marker tells those reports that a timeout broke the
+    pool, not one of them.
+    
+    Args:
+        workers (int): Number of worker processes
+        engine (str): Execution engine name, one of ENGINES
+        notebook_template (str): Path to the notebook template
+        engine_options (Dict[str, Any]): Keyword arguments for KernelEngine
+        parent_dir (str): Directory the marker directory is created in, removed by its owner
+    """
+    
+    def __init__(
+        self,
+        workers: int,
+        engine: str,
+        notebook_template: str,
+        engine_options: Dict[str, Any],
+        parent_dir: str
+    ):
+        self.pool_dir = tempfile.mkdtemp(prefix='pool_', dir=parent_dir)
+        super().__init__(
+            max_workers=workers,
+            initializer=_init_report_worker,
+            initargs=(engine, notebook_template, engine_options, self.pool_dir)
+        )
+    
+    def timed_out(self) -> bool:
+        """Tell whether a leaf watchdog killed a worker of this pool."""
+        return pool_timed_out(self.pool_dir)
+
+class RenderSession:
+    """
+    Execution resources shared by the builds of several reports.
+    
+    With several workers, the session holds one process pool, whose workers keep their warm
+    kernels (engine "kernel") from one build to the next; otherwise it holds one warm kernel
+    in this process, started on first use and rendering one page at a time. Pass it to
+    generate_report as session, or let generate_reports_batch create one.
+    
+    Args:
+        workers (int, optional): Number of worker processes. None or 1 renders in this process
+        engine (str): Execution engine, one of ENGINES
+        engine_options (Dict[str, Any], optional): Keyword arguments for KernelEngine
+        notebook_template (str): Path to the notebook template the warm kernels run
+    """
+    
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        engine: str = "papermill",
+        engine_options: Optional[Dict[str, Any]] = None,
+        notebook_template: str = NOTEBOOK_TEMPLATE_PATH
+    ):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+        self.workers = workers if workers and workers > 1 else 1
+        self.engine = engine
+        self.engine_options = dict(engine_options or {})
+        self.notebook_template = notebook_template
+        # Serializes the pages rendered in this process, which share one kernel
+        self.lock = threading.Lock()
+        self.executor: Optional[_WorkerPool] = None
+        self._kernel_engine: Optional[KernelEngine] = None
+        self._temp_dir: Optional[str] = None
+        if self.workers > 1:
+            self._temp_dir = tempfile.mkdtemp(prefix='qreporting-session-')
+            self.executor = self._new_executor()
+    
+    def _new_executor(self) -> _WorkerPool:
+        """Create the worker pool of the session."""
+        return _WorkerPool(self.workers, self.engine, self.notebook_template, self.engine_options, self._temp_dir)
+    
+    def replace_executor(self, broken: _WorkerPool) -> _WorkerPool:
+        """
+        Replace a pool broken by a worker that died, e.g. killed by the leaf watchdog.
+        
+        Builds sharing the session may notice the same broken pool; only the first one
+        replaces it.
+        
+        Args:
+            broken (_WorkerPool): The pool a job failed on
             
-            # Insert the script just before the closing </body> tag
-            html_content = html_content.replace('</body>', f'{js_handler}\n</body>')
+        Returns:
+            _WorkerPool: The current pool
+        """
+        with self.lock:
+            if self.executor is broken:
+                broken.shutdown(wait=False)
+                self.executor = self._new_executor()
+            return self.executor
+    
+    def kernel_engine(self) -> Optional[KernelEngine]:
+        """
+        Get the warm kernel of this process, starting it on first use. Call with lock held.
+        
+        Returns:
+            KernelEngine: The kernel, or None with the "papermill" engine
+        """
+        if self.engine == "kernel" and self._kernel_engine is None:
+            self._kernel_engine = KernelEngine(self.notebook_template, **self.engine_options)
+        return self._kernel_engine
+    
+    def close(self) -> None:
+        """Shut down the worker processes and the warm kernel."""
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self._temp_dir is not None:
+            shutil.rmtree(self._temp_dir, ignore_errors=True)
+            self._temp_dir = None
+        if self._kernel_engine is not None:
+            self._kernel_engine.shutdown()
+            self._kernel_engine = None
+    
+    def __enter__(self) -> 'RenderSession':
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+def lookup_cached_page(
+    cache: RenderCache,
+    content: Any,
+    report_name: str,
+    notebook_template: str,
+    renderer: str,
+    handoff: str = "dill",
+    content_digest: Optional[str] = None,
+    build_stats: Optional[Dict[str, int]] = None,
+    tracer: Optional[Tracer] = None
+) -> Tuple[Optional[str], Optional[str]]:
+    """
+    Look up a rendered page in the cache.
+    
+    A key that cannot be computed, e.g. for content that cannot be serialized, is a miss
+    with no key, so the page is rendered but not stored.
+    
+    Args:
+        cache (RenderCache): The render cache
+        content (Any): The report content
+        report_name (str): Name of the report
+        notebook_template (str): Path to the notebook template
+        renderer (str): Renderer name, one of RENDERERS
+        handoff (str): Handoff format, one of HANDOFF_FORMATS
+        content_digest (str, optional): Content hash recorded for the manifest, used instead
+                                        of hashing the content again
+        build_stats (Dict[str, int], optional): Cache statistics of the build, counting the lookup
+        tracer (Tracer, optional): Records the lookup
+        
+    Returns:
+        Tuple[Optional[str], Optional[str]]: The cached HTML, or None on a miss, and the cache key
+    """
+    with trace_span(tracer, 'cache_lookup', report_name) as details:
+        try:
+            cache_key = cache.key(content, report_name, notebook_template, renderer, content_digest, handoff)
+        except Exception as e:
+            print(f"Warning: Could not compute cache key for {report_name}: {e}")
+            cache_key = None
+        cached_html = cache.get(cache_key, build_stats) if cache_key else None
+        details['hit'] = cached_html is not None
+    return cached_html, cache_key
+
+def store_cached_page(
+    cache: RenderCache,
+    cache_key: str,
+    report_name: str,
+    html_content: str,
+    tracer: Optional[Tracer] = None
+) -> None:
+    """
+    Store a rendered page in the cache, warning instead of raising if it cannot be written.
+    
+    Args:
+        cache (RenderCache): The render cache
+        cache_key (str): Key from lookup_cached_page
+        report_name (str): Name of the report
+        html_content (str): The rendered page
+        tracer (Tracer, optional): Records the store
+    """
+    with trace_span(tracer, 'cache_store', report_name, bytes=len(html_content)):
+        try:
+            cache.put(cache_key, html_content)
+        except OSError as e:
+            print(f"Warning: Could not cache {report_name}: {e}")
+
+def _iter_spooled_reports(
+    jobs: Iterable[Tuple[str, Any]],
+    spool: Union[str, Spool],
+    notebook_template: str,
+    failures: Dict[str, str],
+    renderer: str,
+    handoff: str,
+    tracer: Optional[Tracer],
+    prepare: Callable[[int, str, Any], Tuple[Optional[str], Optional[str]]],
+    finish: Callable[[str, str, str], Tuple[str, str]],
+    leaf_timeout: Optional[float] = None,
+    leaf_memory_mb: Optional[float] = None,
+    leaf_stats: Optional[Dict[str, Dict[str, Any]]] = None
+) -> Iterator[Tuple[str, str]]:
+    """
+    Render reports through a spool directory, yielding each page as soon as a worker returns it.
+    
+    At most spool.max_in_flight jobs are in the spool at once. The jobs of the build are
+    removed from the spool when it ends, also if it fails or is interrupted.
+    
+    Args:
+        jobs (Iterable[Tuple[str, Any]]): (report name, content) pairs to render
+        spool (Union[str, Spool]): The spool, or its directory
+        notebook_template (str): Path to the notebook template
+        failures (Dict[str, str]): Dictionary collecting error messages of failed reports
+        renderer (str): Renderer name, one of RENDERERS
+        handoff (str): Handoff format, one of HANDOFF_FORMATS
+        tracer (Tracer, optional): Records the stages of every report
+        prepare (Callable): Cache lookup of iter_rendered_reports
+        finish (Callable): Stores a rendered page in the cache and releases its temporary files
+        leaf_timeout (float, optional): Seconds a report may take on its worker
+        leaf_memory_mb (float, optional): Address-space limit of the worker while rendering
+        leaf_stats (Dict[str, Dict[str, Any]], optional): Dictionary collecting the render
+                                                          "seconds", "retries" and whether
+                                                          it "timed_out" of each report
+        
+    Yields:
+        Tuple[str, str]: (report name, HTML content) in completion order
+    """
+    if isinstance(spool, str):
+        spool = Spool(spool)
+    build_id = spool.new_build_id()
+    frame_store = FrameStore(spool.frames_dir(build_id)) if handoff == "arrow" else None
+    notebook_template = os.path.abspath(notebook_template)
+    in_flight = {}
+    
+    def collect(results: Iterable[Tuple[str, Optional[str], Optional[str], List[TraceEvent], Dict[str, Any]]]) -> Iterator[Tuple[str, str]]:
+        """Turn finished spool jobs into pages."""
+        for job_id, html_content, error, events, stats in results:
+            report_name, job_dir = in_flight.pop(job_id)
+            if leaf_stats is not None:
+                leaf_stats[report_name] = stats
+            if tracer is not None:
+                tracer.extend(events)
+            if html_content is None:
+                print(f"Error processing content for {report_name}: {error}")
+                html_content = error_html(RuntimeError(error))
+            if error is not None:
+                failures[report_name] = error
+            yield finish(report_name, html_content, job_dir)
+    
+    try:
+        for index, (report_name, content) in enumerate(jobs):
+            cached_html, job_dir = prepare(index, report_name, content)
+            if cached_html is not None:
+                yield report_name, cached_html
+                continue
             
-        return html_content
+            job_id = f"{build_id}-{index:05d}"
+            content_path = os.path.join(spool.job_dir(job_id), CONTENT_FILE)
+            try:
+                with trace_span(tracer, 'serialize', report_name) as details:
+                    dump_content(content, content_path, frame_store)
+                    details['bytes'] = os.path.getsize(content_path)
+            except Exception as e:
+                print(f"Error processing content for {report_name}: {e}")
+                failures[report_name] = str(e)
+                spool.remove_job(job_id)
+                yield finish(report_name, error_html(e), job_dir)
+                continue
+            spool.submit(job_id, {
+                'report_name': report_name,
+                'notebook_template': notebook_template,
+                'renderer': renderer,
+                'handoff': handoff,
+                'lazy': is_lazy(content),
+                'trace': tracer is not None,
+                'timeout': leaf_timeout,
+                'memory_mb': leaf_memory_mb
+            })
+            in_flight[job_id] = (report_name, job_dir)
+            
+            # Keep a bounded number of jobs in the spool
+            if len(in_flight) >= spool.max_in_flight:
+                yield from collect(spool.wait(in_flight))
+        
+        while in_flight:
+            yield from collect(spool.wait(in_flight))
+    finally:
+        spool.remove_build(build_id)
+
+def iter_rendered_reports(
+    jobs: Iterable[Tuple[str, Any]],
+    temp_dir: str,
+    notebook_template: str,
+    workers: Optional[int] = None,
+    failures: Optional[Dict[str, str]] = None,
+    engine: str = "papermill",
+    engine_options: Optional[Dict[str, Any]] = None,
+    renderer: str = "notebook",
+    cache: Optional[RenderCache] = None,
+    handoff: str = "dill",
+    tracer: Optional[Tracer] = None,
+    spool: Optional[Union[str, Spool]] = None,
+    session: Optional[RenderSession] = None,
+    leaf_timeout: Optional[float] = None,
+    leaf_memory_mb: Optional[float] = None,
+    leaf_retries: int = 0,
+    leaf_stats: Optional[Dict[str, Dict[str, Any]]] = None,
+    content_digests: Optional[Dict[str, Optional[str]]] = None,
+    cache_stats: Optional[Dict[str, int]] = None
+) -> Iterator[Tuple[str, str]]:
+    """
+    Render reports one at a time or on a process pool, yielding each page as soon as it is done.
     
-    except Exception as e:
-        print(f"Error processing content for {report_name}: {e}")
-        return f"<div class='error'>Error processing report: {str(e)}</div>"
+    Jobs are consumed lazily and, on a pool, at most a few per worker are in flight, so
+    neither the jobs nor the rendered pages need to be held in memory all at once. Every
+    report gets its own subdirectory of temp_dir, removed once the report is done. A report
+    that fails is replaced by an error block and recorded in failures; the remaining reports
+    are still rendered.
+    
+    With leaf limits, reports render on worker processes even if workers is 1, so that a
+    report over its limits can be killed without stopping the build (see limits.py).
+    
+    Args:
+        jobs (Iterable[Tuple[str, Any]]): (report name, content) pairs to render
+        temp_dir (str): Directory for temporary files
+        notebook_template (str): Path to the notebook template
+        workers (int, optional): Number of worker processes. None or 1 renders in this process
+        failures (Dict[str, str], optional): Dictionary collecting error messages of failed reports
+        engine (str): Execution engine - "papermill" starts a kernel per report, "kernel" keeps
+                      one warm kernel per process (see KernelEngine)
+        engine_options (Dict[str, Any], optional): Keyword arguments for KernelEngine
+        renderer (str): "notebook" or "native" (see process_report_content)
+        cache (RenderCache, optional): Cache of rendered pages. Cached pages are reused and
+                                       newly rendered pages are stored.
+        handoff (str): How content is handed to the kernel - "dill" pickles it, "arrow" writes
+                       DataFrames and Series once as memory-mappable Arrow files (see handoff.py)
+        tracer (Tracer, optional): Records the stages of every report, including those
+                                   rendered in worker processes
+        spool (Union[str, Spool], optional): Spool directory shared with `qreporting worker`
+                                             processes, on this or other hosts, which then
+                                             render the pages instead of this process or a
+                                             pool (see spool.py). workers and engine are not used.
+        session (RenderSession, optional): Pool or warm kernel shared with other builds, used
+                                           instead of creating one; workers, engine and
+                                           engine_options are then taken from the session
+        leaf_timeout (float, optional): Seconds a report may take before it is stopped and
+                                        replaced by an error block
+        leaf_memory_mb (float, optional): Address-space limit, in megabytes, of the worker
+                                          processes and kernels rendering the reports
+        leaf_retries (int): Times a report that timed out, or was lost with its worker,
+                            is rendered again before it fails
+        leaf_stats (Dict[str, Dict[str, Any]], optional): Dictionary collecting the render
+                                                          "seconds", "retries" and whether
+                                                          it "timed_out" of each report
+                                                          rendered in this process, a pool or
+                                                          by spool workers
+        content_digests (Dict[str, Optional[str]], optional): Content digests of reports, e.g.
+                                                              those recorded for the manifest,
+                                                              used for their cache keys instead
+                                                              of hashing the content again
+        cache_stats (Dict[str, int], optional): Dictionary counting the cache hits, misses and
+                                                evictions of this build, apart from other
+                                                builds sharing the cache
+        
+    Yields:
+        Tuple[str, str]: (report name, HTML content) in completion order
+    """
+    if session is not None:
+        if session.engine == "kernel" and os.path.abspath(notebook_template) != os.path.abspath(session.notebook_template):
+            raise ValueError("The warm kernels of the session run a different notebook template")
+        workers, engine, engine_options = session.workers, session.engine, session.engine_options
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+    if renderer not in RENDERERS:
+        raise ValueError(f"Unknown renderer {renderer!r}, expected one of {RENDERERS}")
+    if handoff not in HANDOFF_FORMATS:
+        raise ValueError(f"Unknown handoff format {handoff!r}, expected one of {HANDOFF_FORMATS}")
+    if failures is None:
+        failures = {}
+    if engine_options is None:
+        engine_options = {}
+    if leaf_stats is None:
+        leaf_stats = {}
+    limits = leaf_timeout is not None or leaf_memory_mb is not None
+    
+    # DataFrames shared between reports are written once per build
+    frame_store = FrameStore(os.path.join(temp_dir, 'frames')) if handoff == "arrow" and spool is None else None
+    cache_keys = {}
+    
+    def prepare(index: int, report_name: str, content: Any) -> Tuple[Optional[str], Optional[str]]:
+        """Look up a job in the cache, or create its temporary directory."""
+        if cache is not None:
+            content_digest = content_digests.get(report_name) if content_digests else None
+            cached_html, cache_key = lookup_cached_page(
+                cache, content, report_name, notebook_template, renderer, handoff, content_digest, cache_stats,
+                tracer
+            )
+            if cached_html is not None:
+                return cached_html, None
+            cache_keys[report_name] = cache_key
+        
+        job_dir = os.path.join(temp_dir, f"report_{index:05d}")
+        os.makedirs(job_dir, exist_ok=True)
+        return None, job_dir
+    
+    def finish(report_name: str, html_content: str, job_dir: str) -> Tuple[str, str]:
+        """Store a rendered page and release its temporary files."""
+        shutil.rmtree(job_dir, ignore_errors=True)
+        cache_key = cache_keys.pop(report_name, None)
+        if cache_key and report_name not in failures:
+            store_cached_page(cache, cache_key, report_name, html_content, tracer)
+        return report_name, html_content
+    
+    if spool is not None:
+        yield from _iter_spooled_reports(
+            jobs, spool, notebook_template, failures, renderer, handoff, tracer, prepare, finish,
+            leaf_timeout, leaf_memory_mb, leaf_stats
+        )
+    elif (not workers or workers <= 1) and not limits:
+        kernel_engine = None
+        # The kernel of a session is shared with the builds running in other threads
+        lock = session.lock if session is not None else contextlib.nullcontext()
+        try:
+            for index, (report_name, content) in enumerate(jobs):
+                cached_html, job_dir = prepare(index, report_name, content)
+                if cached_html is not None:
+                    yield report_name, cached_html
+                    continue
+                with lock:
+                    if session is not None:
+                        kernel_engine = session.kernel_engine()
+                    elif engine == "kernel" and kernel_engine is None:
+                        kernel_engine = KernelEngine(notebook_template, **engine_options)
+                    render_start = time.perf_counter()
+                    html_content = process_report_content(
+                        content, report_name, job_dir, notebook_template, failures, kernel_engine, renderer,
+                        frame_store, tracer=tracer
+                    )
+                    leaf_stats[report_name] = {'seconds': time.perf_counter() - render_start}
+                yield finish(report_name, html_content, job_dir)
+        finally:
+            if kernel_engine is not None and session is None:
+                kernel_engine.shutdown()
+    else:
+        # The pool of a session stays up for its other builds
+        shared_pool = session is not None and session.executor is not None
+        
+        def new_executor() -> _WorkerPool:
+            return _WorkerPool(workers or 1, engine, notebook_template, engine_options, temp_dir)
+        
+        executor = session.executor if shared_pool else new_executor()
+        in_flight = {}
+        
+        def replace_executor(broken: _WorkerPool) -> None:
+            """Replace a pool broken by a worker that died, unless that was done already."""
+            nonlocal executor
+            if shared_pool:
+                executor = session.replace_executor(broken)
+            elif executor is broken:
+                broken.shutdown(wait=False)
+                executor = new_executor()
+        
+        def submit(report_name: str, job_dir: str, content_path: str, lazy: bool, retries: int = 0, lost: int = 0) -> None:
+            """Submit a report to the pool, replacing the pool if it broke since the last submit."""
+            arguments = (
+                _process_report_job, content_path, report_name, job_dir, notebook_template, renderer,
+                tracer is not None, lazy, handoff, leaf_timeout, leaf_memory_mb
+            )
+            try:
+                future = executor.submit(*arguments)
+            except BrokenProcessPool:
+                replace_executor(executor)
+                future = executor.submit(*arguments)
+            in_flight[future] = (report_name, job_dir, content_path, lazy, retries, lost, executor)
+        
+        def collect(done: Iterable[Future]) -> Iterator[Tuple[str, str]]:
+            """Turn finished futures into pages, submitting again the reports to retry."""
+            # In submission order, so that reports lost with a pool keep their place in the queue
+            for future in [future for future in in_flight if future in done]:
+                report_name, job_dir, content_path, lazy, retries, lost, job_executor = in_flight.pop(future)
+                stats = {}
+                try:
+                    html_content, error, events, stats = future.result()
+                    if tracer is not None:
+                        tracer.extend(events)
+                except BrokenProcessPool as e:
+                    # A worker died, and the pool with it: every report in flight is lost
+                    replace_executor(job_executor)
+                    marker_path = os.path.join(job_dir, TIMEOUT_MARKER)
+                    if os.path.exists(marker_path):
+                        # Killed by the watchdog of its worker
+                        os.remove(marker_path)
+                        error = str(LeafTimeoutError(f"Timed out after {leaf_timeout:g}s, worker killed"))
+                        stats = {'timed_out': True}
+                    elif job_executor.timed_out():
+                        # Another report's watchdog broke the pool: not this report's loss
+                        submit(report_name, job_dir, content_path, lazy, retries, lost)
+                        continue
+                    elif lost < MAX_LOST_RESUBMITS:
+                        submit(report_name, job_dir, content_path, lazy, retries, lost + 1)
+                        continue
+                    else:
+                        error = f"Worker process died: {e}"
+                    html_content = error_html(RuntimeError(error))
+                    print(f"Error processing content for {report_name}: {error}")
+                except Exception as e:
+                    print(f"Error processing content for {report_name}: {e}")
+                    html_content, error = error_html(e), str(e)
+                if stats.get('timed_out') and retries < leaf_retries:
+                    print(f"Retrying {report_name} after it timed out")
+                    submit(report_name, job_dir, content_path, lazy, retries + 1, lost)
+                    continue
+                leaf_stats[report_name] = dict(stats, retries=retries + lost)
+                if error is not None:
+                    failures[report_name] = error
+                yield finish(report_name, html_content, job_dir)
+        
+        try:
+            for index, (report_name, content) in enumerate(jobs):
+                cached_html, job_dir = prepare(index, report_name, content)
+                if cached_html is not None:
+                    yield report_name, cached_html
+                    continue
+                
+                # Serialization failures are recorded without submitting
+                content_path = os.path.join(job_dir, "content.pkl")
+                try:
+                    with trace_span(tracer, 'serialize', report_name) as details:
+                        dump_content(content, content_path, frame_store)
+                        details['bytes'] = os.path.getsize(content_path)
+                except Exception as e:
+                    print(f"Error processing content for {report_name}: {e}")
+                    failures[report_name] = str(e)
+                    yield finish(report_name, error_html(e), job_dir)
+                    continue
+                submit(report_name, job_dir, content_path, is_lazy(content))
+                
+                # Keep a bounded number of jobs in flight
+                if len(in_flight) >= (workers or 1) * MAX_JOBS_IN_FLIGHT_PER_WORKER:
+                    done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                    yield from collect(done)
+            
+            # Retried reports are added while collecting
+            while in_flight:
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                yield from collect(done)
+        finally:
+            if not shared_pool:
+                executor.shutdown()
+    
+    if cache is not None:
+        cache.evict(cache_stats)
 
-def collect_all_content(
+def render_reports(
+    jobs: List[Tuple[str, Any]],
+    temp_dir: str,
+    notebook_template: str,
+    workers: Optional[int] = None,
+    failures: Optional[Dict[str, str]] = None,
+    engine: str = "papermill",
+    engine_options: Optional[Dict[str, Any]] = None,
+    renderer: str = "notebook",
+    cache: Optional[RenderCache] = None,
+    handoff: str = "dill",
+    tracer: Optional[Tracer] = None,
+    spool: Optional[Union[str, Spool]] = None,
+    session: Optional[RenderSession] = None,
+    leaf_timeout: Optional[float] = None,
+    leaf_memory_mb: Optional[float] = None,
+    leaf_retries: int = 0,
+    leaf_stats: Optional[Dict[str, Dict[str, Any]]] = None,
+    content_digests: Optional[Dict[str, Optional[str]]] = None,
+    cache_stats: Optional[Dict[str, int]] = None
+) -> Dict[str, str]:
+    """
+    Render a list of reports and collect the pages in memory.
+    
+    Takes the same arguments as iter_rendered_reports.
+    
+    Returns:
+        Dict[str, str]: Dictionary mapping report names to HTML content, in job order
+    """
+    results = dict(iter_rendered_reports(
+        jobs, temp_dir, notebook_template, workers, failures, engine, engine_options, renderer, cache,
+        handoff, tracer, spool, session, leaf_timeout, leaf_memory_mb, leaf_retries, leaf_stats,
+        content_digests, cache_stats
+    ))
+    return {report_name: results[report_name] for report_name, _ in jobs}
+
+def iter_content_jobs(
     data_dict: Dict[str, Any], 
     prefix: str = "",
-    temp_dir: str = "",
-    notebook_template: str = "",
     depth: Union[int, Dict[str, int]] = DEFAULT_DEPTH,
     current_depth: int = 1,
-    content_dict: Optional[Dict[str, str]] = None,
     top_level_key: str = ""
-) -> Dict[str, str]:
+) -> Iterator[Tuple[str, Any]]:
     """
-    Recursively process all content in the nested dictionary and convert to HTML.
-    Processes content for items at the target depth level or for leaf nodes at any level.
+    Recursively walk the nested dictionary, yielding the reports to render.
+    Yields content for items at the target depth level or for leaf nodes at any level.
     
     Args:
-        data_dict (Dict[str, Any]): The nested dictionary to process
+        data_dict (Dict[str, Any]): The nested dictionary to process, or a
+                                    DirectoryReportSource
         prefix (str): Prefix for the report name (for nested reports)
-        temp_dir (str): Directory for temporary files
-        notebook_template (str): Path to the notebook template
         depth (Union[int, Dict[str, int]]): Maximum depth to process - either a fixed int or a dict
         current_depth (int): Current depth in the recursion
-        content_dict (Dict[str, str]): Dictionary to store the HTML content
         top_level_key (str): Current top-level key being processed
         
-    Returns:
-        Dict[str, str]: Dictionary mapping report paths to HTML content
+    Yields:
+        Tuple[str, Any]: (report name, content) pairs in menu order
     """
-    if content_dict is None:
-        content_dict = {}
-    
     # Handle depth as either int or dict
     max_depth = depth
     if isinstance(depth, dict):
@@ -272,27 +1117,19 @@ def collect_all_content(
                 key_depth = get_depth_for_key(depth, key)
                 new_prefix = f"{prefix}{key}" if prefix else key
                 
-                if current_depth == key_depth or not isinstance(value, dict):
-                    # Process content at the target depth level for this key
-                    content_dict[new_prefix] = process_report_content(
-                        value,
-                        new_prefix,
-                        temp_dir,
-                        notebook_template
-                    )
-                elif isinstance(value, dict) and current_depth < key_depth:
+                if current_depth == key_depth or not isinstance(value, Mapping):
+                    # Yield content at the target depth level for this key
+                    yield new_prefix, value
+                elif isinstance(value, Mapping) and current_depth < key_depth:
                     # Process nested dictionary recursively with this key's depth
-                    collect_all_content(
+                    yield from iter_content_jobs(
                         value, 
                         f"{new_prefix}/", 
-                        temp_dir, 
-                        notebook_template,
                         depth,
                         current_depth + 1,
-                        content_dict,
                         key
                     )
-            return content_dict
+            return
         else:
             # Not at top level, use the top_level_key to get the depth
             max_depth = get_depth_for_key(depth, top_level_key)
@@ -301,46 +1138,494 @@ def collect_all_content(
     for key, value in data_dict.items():
         report_name = f"{prefix}{key}" if prefix else key
         
-        if current_depth == max_depth or not isinstance(value, dict):
-            # Process content at the target depth level or for any non-dictionary value (leaf nodes)
-            content_dict[report_name] = process_report_content(
-                value,
-                report_name,
-                temp_dir,
-                notebook_template
-            )
-        elif isinstance(value, dict) and current_depth < max_depth:
+        if current_depth == max_depth or not isinstance(value, Mapping):
+            # Yield content at the target depth level or for any non-dictionary value (leaf nodes)
+            yield report_name, value
+        elif isinstance(value, Mapping) and current_depth < max_depth:
             # Process nested dictionary recursively
-            collect_all_content(
+            yield from iter_content_jobs(
                 value, 
                 f"{report_name}/", 
-                temp_dir, 
-                notebook_template,
                 depth,
                 current_depth + 1,
-                content_dict,
                 top_level_key
             )
-            
+
+def collect_all_content(
+    data_dict: Dict[str, Any], 
+    prefix: str = "",
+    temp_dir: str = "",
+    notebook_template: str = "",
+    depth: Union[int, Dict[str, int]] = DEFAULT_DEPTH,
+    current_depth: int = 1,
+    content_dict: Optional[Dict[str, str]] = None,
+    top_level_key: str = "",
+    workers: Optional[int] = None,
+    failures: Optional[Dict[str, str]] = None
+) -> Dict[str, str]:
+    """
+    Process all content in the nested dictionary and convert to HTML.
+    Processes content for items at the target depth level or for leaf nodes at any level.
+    
+    Args:
+        data_dict (Dict[str, Any]): The nested dictionary to process, or a
+                                    DirectoryReportSource
+        prefix (str): Prefix for the report name (for nested reports)
+        temp_dir (str): Directory for temporary files
+        notebook_template (str): Path to the notebook template
+        depth (Union[int, Dict[str, int]]): Maximum depth to process - either a fixed int or a dict
+        current_depth (int): Current depth in the recursion
+        content_dict (Dict[str, str]): Dictionary to store the HTML content
+        top_level_key (str): Current top-level key being processed
+        workers (int, optional): Number of worker processes used to render reports in parallel
+        failures (Dict[str, str], optional): Dictionary collecting error messages of failed reports
+        
+    Returns:
+        Dict[str, str]: Dictionary mapping report paths to HTML content
+    """
+    if content_dict is None:
+        content_dict = {}
+    
+    jobs = iter_content_jobs(data_dict, prefix, depth, current_depth, top_level_key)
+    content_dict.update(iter_rendered_reports(jobs, temp_dir, notebook_template, workers, failures))
+    
     return content_dict
 
+#------------------------------------------------------------------------------
+# PAGE OUTPUT FUNCTIONS
+#------------------------------------------------------------------------------
+
+def plan_page_jobs(
+    plan: ReportPlan,
+    toc_content: Optional[str],
+    output_dir: str,
+    large_table_rows: Optional[int] = None,
+    hashes: Optional[Dict[str, Optional[str]]] = None,
+    pages: Optional[Iterable[PlanNode]] = None,
+    assets_dir: Optional[str] = None
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Get the pages of a report to render, in menu order and followed by the Table of Contents.
+    
+    Args:
+        plan (ReportPlan): The compiled report
+        toc_content (str, optional): HTML of the Table of Contents, processed through the notebook
+                                     template just like other content. None leaves it out.
+        output_dir (str): Directory of the report
+        large_table_rows (int, optional): Replace DataFrames and Series with more rows by
+                                          virtual-scrolling tables as each job is taken
+        hashes (Dict[str, Optional[str]], optional): Dictionary collecting the content hash of
+                                                     each page for the build manifest
+        pages (Iterable[PlanNode], optional): The pages to render, all pages of the plan if None
+        assets_dir (str, optional): Directory for the table script, shared with other reports
+        
+    Returns:
+        Iterator[Tuple[str, Any]]: (report name, content) pairs
+    """
+    nodes = plan.pages if pages is None else pages
+    jobs = ((node.path, node.value) for node in nodes)
+    if toc_content is not None:
+        jobs = chain(jobs, [(TABLE_OF_CONTENTS_NAME, toc_content)])
+    return (
+        (report_name, prepare_page_content(report_name, content, output_dir, large_table_rows, hashes, assets_dir))
+        for report_name, content in jobs
+    )
+
+def prepare_page_content(
+    report_name: str,
+    content: Any,
+    output_dir: str,
+    large_table_rows: Optional[int] = None,
+    hashes: Optional[Dict[str, Optional[str]]] = None,
+    assets_dir: Optional[str] = None
+) -> Any:
+    """
+    Prepare the content of a page as its job is taken: hash it and replace its large tables.
+    
+    Args:
+        report_name (str): Name of the report
+        content (Any): The report content
+        output_dir (str): Directory of the report
+        large_table_rows (int, optional): Replace DataFrames and Series with more rows by
+                                          virtual-scrolling tables
+        hashes (Dict[str, Optional[str]], optional): Dictionary collecting the content hash of
+                                                     each page except the Table of Contents
+        assets_dir (str, optional): Directory for the table script, shared with other reports
+        
+    Returns:
+        Any: The content to render
+    """
+    if hashes is not None and report_name != TABLE_OF_CONTENTS_NAME:
+        hashes[report_name] = content_hash(content)
+    if large_table_rows is not None:
+        content = replace_large_tables(content, output_dir, slugify(report_name), large_table_rows, assets_dir=assets_dir)
+    return content
+
+def write_page(
+    report_name: str,
+    html_content: str,
+    output_dir: str,
+    shared_assets: bool = True,
+    image_assets: bool = False,
+    assets_dir: Optional[str] = None
+) -> str:
+    """
+    Write a rendered report page to the output directory.
+    
+    Args:
+        report_name (str): Name of the report
+        html_content (str): The rendered page
+        output_dir (str): Directory of the report
+        shared_assets (bool): Link the page to one copy of the common styles and scripts
+        image_assets (bool): Write embedded images to content-hashed files, loaded lazily
+        assets_dir (str, optional): Directory for these files, shared with other reports;
+                                    the assets directory of the report by default
+        
+    Returns:
+        str: The page as written
+    """
+    # Link the page to one copy of the common styles and scripts
+    if shared_assets:
+        html_content = extract_shared_assets(html_content, output_dir, assets_dir)
+    if image_assets:
+        html_content = extract_image_assets(html_content, output_dir, assets_dir)
+    
+    report_path = os.path.join(output_dir, f"{slugify(report_name)}.html")
+    with open(report_path, 'w', encoding='utf-8') as f:
+        f.write(html_content)
+    return html_content
+
+def write_rendered_pages(
+    jobs: Iterable[Tuple[str, Any]],
+    output_dir: str,
+    temp_dir: str,
+    notebook_template: str,
+    summary: BuildSummary,
+    active_name: Optional[str] = None,
+    shared_assets: bool = True,
+    tracer: Optional[Tracer] = None,
+    image_assets: bool = False,
+    search: Optional[SearchIndex] = None,
+    assets_dir: Optional[str] = None,
+    **render_options: Any
+) -> Optional[str]:
+    """
+    Render pages, in parallel if requested, writing each one as soon as it is done.
+    
+    Only the page shown initially in index.html is kept in memory. The pages written, the
+    failures, the slow, timed out and retried leaves, the cache statistics and the "render"
+    and "write" timings are recorded in the summary.
+    
+    Args:
+        jobs (Iterable[Tuple[str, Any]]): (report name, content) pairs to render
+        output_dir (str): Directory of the report
+        temp_dir (str): Directory for temporary files
+        notebook_template (str): Path to the notebook template
+        summary (BuildSummary): Summary of the build
+        active_name (str, optional): Report displayed initially in index.html
+        shared_assets (bool): Link the pages to one copy of the common styles and scripts
+        tracer (Tracer, optional): Records the stages of every report
+        image_assets (bool): Write embedded images to content-hashed files, loaded lazily
+        search (SearchIndex, optional): Index the pages are added to as they are written
+        assets_dir (str, optional): Directory for the common styles, scripts and images,
+                                    shared with other reports
+        **render_options: workers, engine, engine_options, renderer, cache, handoff, spool,
+                          session, content_digests and the leaf limits (see
+                          iter_rendered_reports)
+        
+    Returns:
+        Optional[str]: The page of active_name as written, None if it was not rendered
+    """
+    active_content = None
+    write_time = 0.0
+    leaf_stats: Dict[str, Dict[str, Any]] = {}
+    if render_options.get('cache') is not None:
+        summary.cache_stats = dict.fromkeys(CACHE_STATS, 0)
+    stage_start = time.perf_counter()
+    for report_name, content in iter_rendered_reports(
+        jobs,
+        temp_dir,
+        notebook_template,
+        failures=summary.failures,
+        tracer=tracer,
+        leaf_stats=leaf_stats,
+        cache_stats=summary.cache_stats,
+        **render_options
+    ):
+        write_start = time.perf_counter()
+        
+        with trace_span(tracer, 'write', report_name) as details:
+            content = write_page(report_name, content, output_dir, shared_assets, image_assets, assets_dir)
+            details['bytes'] = len(content)
+            if search is not None and report_name != TABLE_OF_CONTENTS_NAME:
+                search.add_page(report_name, f"{slugify(report_name)}.html", content)
+        summary.pages.append(report_name)
+        
+        if report_name == active_name:
+            active_content = content
+        write_time += time.perf_counter() - write_start
+    
+    summary.timings['render'] = time.perf_counter() - stage_start - write_time
+    summary.timings['write'] = write_time
+    
+    # Leaves killed by the watchdog have no time of their own
+    timed = [(report_name, stats['seconds']) for report_name, stats in leaf_stats.items() if 'seconds' in stats]
+    summary.slow_leaves = heapq.nlargest(SLOW_LEAVES_REPORTED, timed, key=lambda item: item[1])
+    summary.timed_out = [
+        report_name for report_name, stats in leaf_stats.items()
+        if stats.get('timed_out') and report_name in summary.failures
+    ]
+    summary.retries = {
+        report_name: stats['retries'] for report_name, stats in leaf_stats.items() if stats.get('retries')
+    }
+    return active_content
+
+def write_menu_script(plan: ReportPlan, output_dir: str, icon_mappings: Dict[str, str]) -> str:
+    """
+    Write the menu of a report as a content-hashed script for the lazily rendered sidebar.
+    
+    The script assigns {"entries": [...], "icons": [...]} to window.REPORT_MENU, where each
+    entry is [label, file name] for a page or [label, [entries]] for a submenu, and icons
+    holds the icon of each top-level entry. A script, unlike a JSON file, can also be loaded
+    when the report is opened from the file system.
+    
+    Args:
+        plan (ReportPlan): The compiled report
+        output_dir (str): Directory of the report
+        icon_mappings (Dict[str, str]): Font Awesome icon names by top-level key
+        
+    Returns:
+        str: Path of the script relative to the output directory
+    """
+    # The Table of Contents has its own entry at the end of the menu
+    entries = [
+        entry for entry in menu_outline(plan)
+        if entry[0] not in ('Reportmap', TABLE_OF_CONTENTS_NAME)
+    ]
+    menu = {
+        'entries': entries,
+        'icons': [icon_mappings.get(entry[0], 'file-alt') for entry in entries]
+    }
+    script = f"window.REPORT_MENU = {json.dumps(menu, separators=(',', ':'))};\n"
+    return write_asset(output_dir, script, 'js', prefix='menu')
+
+def write_index_page(
+    plan: ReportPlan,
+    output_dir: str,
+    report_title: str = "Report",
+    active_report: Optional[str] = None,
+    active_content: Optional[str] = None,
+    template_cache_dir: Optional[str] = None,
+    lazy_menu: bool = False,
+    search_script: Optional[str] = None
+) -> str:
+    """
+    Render the report shell with its menu and write it as index.html.
+    
+    Args:
+        plan (ReportPlan): The compiled report
+        output_dir (str): Directory of the report
+        report_title (str): Title of the report
+        active_report (str, optional): The report displayed initially, the Table of Contents if None
+        active_content (str, optional): HTML of the report displayed initially; not used
+                                        with lazy_menu, which loads the page in the iframe
+        template_cache_dir (str, optional): Directory for Jinja's compiled template bytecode
+        lazy_menu (bool): Load the menu from a script and create its entries as submenus
+                          are opened, instead of writing every entry into index.html
+        search_script (str, optional): Path of the search index script, relative to the output
+                                       directory. The shell shows a search box if given.
+        
+    Returns:
+        str: Path to index.html
+    """
+    # Create Table of Contents link
+    table_of_contents_link = f"{slugify(TABLE_OF_CONTENTS_NAME)}.html"
+    
+    # Load icon mappings and the Jinja template, cached per process
+    icon_mappings = load_icon_mappings()
+    template = get_report_template(REPORT_TEMPLATE_PATH, template_cache_dir)
+    
+    if lazy_menu:
+        menu_options = {
+            'menu_structure': None,
+            'menu_script': write_menu_script(plan, output_dir, icon_mappings),
+            'active_content': None,
+            'active_url': f"{slugify(active_report)}.html" if active_report else table_of_contents_link
+        }
+    else:
+        # Create links in the menu structure to the generated HTML files
+        menu_options = {'menu_structure': plan.menu(), 'active_content': active_content}
+    
+    # Render template
+    html_output = template.render(
+        active_report=active_report or TABLE_OF_CONTENTS_NAME,
+        report_title=report_title,
+        table_of_contents_link=table_of_contents_link,
+        default_icons=icon_mappings,
+        search_script=search_script,
+        **menu_options
+    )
+    
+    # Write main index.html
+    index_path = os.path.join(output_dir, 'index.html')
+    with open(index_path, 'w', encoding='utf-8') as f:
+        f.write(html_output)
+    
+    # Remove the menu scripts of earlier builds, which index.html no longer loads
+    assets_dir = os.path.join(output_dir, ASSETS_DIR)
+    current_script = os.path.basename(menu_options.get('menu_script', ''))
+    if os.path.isdir(assets_dir):
+        for name in os.listdir(assets_dir):
+            if name.startswith('menu-') and name.endswith('.js') and name != current_script:
+                os.remove(os.path.join(assets_dir, name))
+    return index_path
+
 #------------------------------------------------------------------------------
 # REPORT GENERATION FUNCTIONS
 #------------------------------------------------------------------------------
 
+def build_settings(
+    report_title: str,
+    depth: Union[int, Dict[str, int]],
+    notebook_template: str,
+    active_report: Optional[str],
+    renderer: str,
+    shared_assets: bool,
+    image_assets: bool,
+    assets_dir: Optional[str],
+    handoff: str,
+    large_table_rows: Optional[int],
+    template_cache_dir: Optional[str],
+    lazy_menu: bool,
+    search_index: bool,
+    publish: bool = False
+) -> Dict[str, Any]:
+    """
+    Collect the settings of a build, recorded in its manifest and reused by update_report.
+    
+    Args:
+        report_title (str): Title of the report
+        depth (Union[int, Dict[str, int]]): Maximum depth for nested menus
+        notebook_template (str): Path to the notebook template
+        active_report (str, optional): The initial active report
+        renderer (str): Renderer name, one of RENDERERS
+        shared_assets (bool): Common styles and scripts are shared files
+        image_assets (bool): Embedded images are written to files
+        assets_dir (str, optional): Directory for the shared styles, scripts and images
+        handoff (str): Handoff format, one of HANDOFF_FORMATS
+        large_table_rows (int, optional): Rows above which tables are virtual-scrolling
+        template_cache_dir (str, optional): Directory for Jinja's compiled template bytecode
+        lazy_menu (bool): The sidebar is created from a menu script
+        search_index (bool): The pages are indexed for the search box
+        publish (bool): The report is published as releases
+        
+    Returns:
+        Dict[str, Any]: The settings, with absolute paths
+    """
+    return {
+        'report_title': report_title,
+        'depth': depth,
+        'notebook_template': os.path.abspath(notebook_template),
+        'active_report': active_report,
+        'renderer': renderer,
+        'shared_assets': shared_assets,
+        'image_assets': image_assets,
+        'assets_dir': os.path.abspath(assets_dir) if assets_dir else None,
+        'handoff': handoff,
+        'large_table_rows': large_table_rows,
+        'template_cache_dir': template_cache_dir,
+        'lazy_menu': lazy_menu,
+        'search_index': search_index,
+        'publish': publish
+    }
+
+def finish_build(
+    plan: ReportPlan,
+    output_dir: str,
+    settings: Dict[str, Any],
+    summary: BuildSummary,
+    hashes: Dict[str, Optional[str]],
+    active_content: Optional[str],
+    search: Optional[SearchIndex] = None,
+    tracer: Optional[Tracer] = None,
+    profile: bool = False
+) -> None:
+    """
+    Write what follows the pages of a new build: the search index, index.html, the build
+    manifest and the profile.
+    
+    Args:
+        plan (ReportPlan): The compiled report
+        output_dir (str): Directory of the report
+        settings (Dict[str, Any]): Settings of the build, from build_settings
+        summary (BuildSummary): Summary of the build, with its failures
+        hashes (Dict[str, Optional[str]]): Content hashes of the pages for the manifest
+        active_content (str, optional): The page shown initially, embedded in index.html
+        search (SearchIndex, optional): The search index of the pages, if enabled
+        tracer (Tracer, optional): Records the stages
+        profile (bool): Save the trace events as output_dir/profile.json
+    """
+    search_script = None
+    if search is not None:
+        stage_start = time.perf_counter()
+        with trace_span(tracer, 'search'):
+            search_script = search.write(output_dir, [node.path for node in plan.pages])
+        summary.timings['search'] = time.perf_counter() - stage_start
+    
+    stage_start = time.perf_counter()
+    if active_content is None and not settings['active_report']:
+        active_content = ""
+    with trace_span(tracer, 'shell'):
+        write_index_page(
+            plan, output_dir, settings['report_title'], settings['active_report'], active_content,
+            settings['template_cache_dir'], settings['lazy_menu'], search_script
+        )
+    summary.timings['shell'] = time.perf_counter() - stage_start
+    
+    # Record the build, so that update_report can later render only what changed
+    for report_name in summary.failures:
+        hashes[report_name] = None
+    write_manifest(output_dir, plan, settings, hashes)
+    
+    if profile:
+        tracer.write_chrome_trace(os.path.join(output_dir, 'profile.json'))
+
 def generate_report(
     data_dict: Dict[str, Any],
     output_dir: str,
     report_title: str = "Report",
     depth: Union[int, Dict[str, int]] = DEFAULT_DEPTH,
     notebook_template: str = NOTEBOOK_TEMPLATE_PATH,
-    active_report: Optional[str] = None
-) -> None:
+    active_report: Optional[str] = None,
+    workers: Optional[int] = None,
+    engine: str = "papermill",
+    engine_options: Optional[Dict[str, Any]] = None,
+    leaf_timeout: Optional[float] = None,
+    leaf_memory_mb: Optional[float] = None,
+    leaf_retries: int = 0,
+    renderer: str = "notebook",
+    cache: Optional[Union[str, RenderCache]] = None,
+    shared_assets: bool = True,
+    image_assets: bool = False,
+    assets_dir: Optional[str] = None,
+    handoff: str = "dill",
+    large_table_rows: Optional[int] = None,
+    template_cache_dir: Optional[str] = None,
+    lazy_menu: bool = False,
+    search_index: bool = False,
+    trace_hooks: Optional[List[Callable[[TraceEvent], None]]] = None,
+    profile: bool = False,
+    spool: Optional[Union[str, Spool]] = None,
+    session: Optional[RenderSession] = None,
+    publish: bool = False,
+    staging_dir: Optional[str] = None
+) -> BuildSummary:
     """
     Generate an HTML report from a nested dictionary.
     
     Args:
-        data_dict (Dict[str, Any]): The nested dictionary with report data
+        data_dict (Dict[str, Any]): The nested dictionary with report data, or a
+                                    DirectoryReportSource
         output_dir (str): Directory to save the generated report
         report_title (str): Title of the report
         depth (Union[int, Dict[str, int]]): Maximum depth for nested menus - either a fixed int or a dict
@@ -348,7 +1633,113 @@ def generate_report(
                                           a 'default' key or DEFAULT_DEPTH will be used as fallback.
         notebook_template (str): Path to the Jupyter notebook template
         active_report (str, optional): The initial active report to display
+        workers (int, optional): Number of worker processes used to render pages in parallel.
+                                 None or 1 renders all pages in the current process.
+        engine (str): Notebook execution engine - "papermill" (a new kernel per page) or
+                      "kernel" (warm kernels reused across pages, one per worker)
+        engine_options (Dict[str, Any], optional): Options for the "kernel" engine, e.g.
+                                                   max_reports, max_memory_mb or timeout
+        leaf_timeout (float, optional): Seconds a page may take to render. A slower page is
+                                        stopped, its kernel or worker process killed, and
+                                        replaced by an error page; the build goes on. Pages
+                                        then render on worker processes, even without workers.
+                                        On spool workers only the kernel's cell timeout
+                                        applies: a page stuck outside the kernel, e.g. loading
+                                        a lazy leaf, is not stopped, and leaf_retries is not
+                                        used. Its time is still reported in slow_leaves.
+        leaf_memory_mb (float, optional): Address-space limit, in megabytes, of the worker
+                                          processes and the kernels they start. A page that
+                                          allocates more fails with a MemoryError.
+        leaf_retries (int): Times a page that timed out, or whose worker died, is rendered
+                            again before it counts as failed
+        renderer (str): "notebook" runs every page through the notebook template. "native" builds
+                        pages for plain dicts, lists, strings, DataFrames, Series and Stylers
+                        directly in Python and uses the notebook only for other content.
+        cache (Union[str, RenderCache], optional): Render cache, or a directory for one. Pages whose
+                                                   content, template and settings are unchanged
+                                                   are reused instead of rendered again. Their
+                                                   content hashes are also recorded in the
+                                                   manifest, so that update_report can skip
+                                                   pages given again unchanged.
+        shared_assets (bool): Move the styles and scripts every page inlines into shared files
+                              under output_dir/assets/ that all pages link to
+        image_assets (bool): Write the figures pages embed as base64 data to content-hashed
+                             files under output_dir/assets/, stored once however many pages
+                             show them and loaded lazily as they scroll into view
+        assets_dir (str, optional): Directory for the shared styles, scripts and images instead
+                                    of output_dir/assets/, e.g. one directory shared by many
+                                    reports published side by side; pages link to it by
+                                    relative path
+        handoff (str): How content is handed to the notebook kernel - "dill" pickles it, "arrow"
+                       writes DataFrames and Series as Arrow files the kernel memory-maps, once
+                       per build even when the same DataFrame appears under several keys
+                       (requires pyarrow)
+        large_table_rows (int, optional): DataFrames and Series with more rows are written as
+                                          chunked JSON under output_dir/tables/ and shown as
+                                          virtual-scrolling tables with sorting and filtering.
+                                          None renders every table as plain HTML.
+        template_cache_dir (str, optional): Directory for Jinja's compiled template bytecode,
+                                            which saves short-lived processes from compiling
+                                            the report template on every run
+        lazy_menu (bool): Write the menu as a compact script under output_dir/assets/ that the
+                          sidebar creates entries from as submenus are opened, and load the
+                          initial page in the iframe, so index.html stays small for reports
+                          with thousands of pages
+        search_index (bool): Index the titles, headings, table columns and (up to a cap per
+                             page) table values of all pages under output_dir/search/, and
+                             add a search box to the sidebar that queries it
+        trace_hooks (List[Callable[[TraceEvent], None]], optional): Functions called with a
+                                            TraceEvent for each stage of each report (cache
+                                            lookup, serialization, kernel start, execution,
+                                            export, write) and for each executed notebook cell
+        profile (bool): Save the trace events as output_dir/profile.json in Chrome trace format,
+                        with the slowest reports and stages in its "otherData" summary
+        spool (Union[str, Spool], optional): Shared spool directory (or a Spool with lease
+                                             settings) whose jobs are rendered by
+                                             `python -m qreporting worker <spool>` processes on
+                                             any number of hosts. This process only writes the
+                                             jobs, the pages and index.html; workers and engine
+                                             are then set on the worker command line.
+        session (RenderSession, optional): Worker pool or warm kernel shared with other builds
+                                           (see generate_reports_batch), used instead of
+                                           workers, engine and engine_options
+        publish (bool): Build in a staging directory and publish the result as a new release
+                        that output_dir, then a symlink, switches to atomically. Files equal to
+                        the live ones are hard-linked instead of written, and the release
+                        records what changed in publish.json (see publish.py). Cannot be
+                        combined with assets_dir.
+        staging_dir (str, optional): Directory for the staging directory, e.g. on a local
+                                     disk; the system's temporary directory by default
+        
+    Returns:
+        BuildSummary: The pages written, the reports that failed to render, the slowest,
+                      timed out and retried pages, and cache statistics
     """
+    summary = BuildSummary()
+    tracer = Tracer(trace_hooks) if trace_hooks or profile else None
+    build_start = time.perf_counter()
+    
+    # Compile the menu tree first, so conflicting report names fail before anything is written
+    with trace_span(tracer, 'plan'):
+        plan = ReportPlan.build(data_dict, depth)
+    summary.timings['plan'] = time.perf_counter() - build_start
+    settings = build_settings(
+        report_title, depth, notebook_template, active_report, renderer, shared_assets, image_assets, assets_dir,
+        handoff, large_table_rows, template_cache_dir, lazy_menu, search_index, publish
+    )
+    
+    if isinstance(cache, str):
+        cache = RenderCache(cache)
+    
+    # With publish, build in a staging directory and swap the result in at the end
+    publish_dir = output_dir
+    if publish:
+        if assets_dir:
+            raise ValueError("assets_dir cannot be combined with publish: pages would link to it from the staging directory")
+        output_dir = tempfile.mkdtemp(prefix='qreporting-stage-', dir=staging_dir)
+    elif is_published(output_dir):
+        raise ValueError(f"{output_dir} holds a published report; pass publish=True to replace it")
+    
     # Create output directory if it doesn't exist
     os.makedirs(output_dir, exist_ok=True)
     
@@ -357,158 +1748,384 @@ def generate_report(
     os.makedirs(temp_dir, exist_ok=True)
     
     try:
-        # Create menu structure with empty dictionaries at target depth
-        menu_structure = flatten_dict_to_menu(data_dict, depth)
-        
-        # Process content only for items at the target depth
-        all_content = collect_all_content(
-            data_dict,
-            temp_dir=temp_dir,
-            notebook_template=notebook_template,
-            depth=depth
+        # Render the pages of the plan, and process the Table of Contents
+        # through the notebook template just like other content
+        stage_start = time.perf_counter()
+        with trace_span(tracer, 'table_of_contents'):
+            toc_content = plan.table_of_contents()
+        summary.timings['table_of_contents'] = time.perf_counter() - stage_start
+        # Hashing serializes every page, so it is done only when the cache key can reuse it;
+        # without, the manifest has no hashes and update_report renders every page it is given
+        hashes: Dict[str, Optional[str]] = {}
+        jobs = plan_page_jobs(
+            plan, toc_content, output_dir, large_table_rows, hashes if cache is not None else None,
+            assets_dir=assets_dir
         )
+        search = SearchIndex() if search_index else None
         
-        # Generate Table of Contents content
-        toc_content = generate_table_of_contents(menu_structure)
-        
-        # Process Table of Contents through notebook template just like other content
-        toc_html = process_report_content(
-            toc_content,
-            "Table of Contents",
+        # Render all pages, in parallel if requested, writing each one as soon as it is done
+        active_name = active_report or TABLE_OF_CONTENTS_NAME
+        active_content = write_rendered_pages(
+            jobs,
+            output_dir,
             temp_dir,
-            notebook_template
+            notebook_template,
+            summary,
+            active_name,
+            shared_assets,
+            tracer,
+            image_assets,
+            search,
+            assets_dir,
+            workers=workers,
+            engine=engine,
+            engine_options=engine_options,
+            leaf_timeout=leaf_timeout,
+            leaf_memory_mb=leaf_memory_mb,
+            leaf_retries=leaf_retries,
+            renderer=renderer,
+            cache=cache,
+            handoff=handoff,
+            spool=spool,
+            session=session,
+            # The manifest hashes are those of the content rendered, unless tables are replaced
+            content_digests=hashes if large_table_rows is None else None
+        )
+        finish_build(
+            plan, output_dir, settings, summary, hashes, active_content, search, tracer, profile
         )
         
-        # Add Table of Contents to all_content
-        all_content["Table of Contents"] = toc_html
+        if publish:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            stage_start = time.perf_counter()
+            summary.published = publish_release(output_dir, publish_dir)
+            summary.timings['publish'] = time.perf_counter() - stage_start
+        summary.timings['total'] = time.perf_counter() - build_start
         
-        # Create links in the menu structure to the generated HTML files
-        def add_content_links(menu_dict, prefix="", current_depth=1, top_key=""):
-            """Recursively add links to HTML content files in the menu structure."""
-            updated_menu = {}
-            
-            # Determine the max depth for this branch
-            max_depth = depth
-            if isinstance(depth, dict):
-                if current_depth == 1:
-                    # We're at the top level, so we'll process each key separately
-                    for key, value in menu_dict.items():
-                        # Get the depth for this specific key
-                        key_depth = get_depth_for_key(depth, key)
-                        item_path = f"{prefix}{key}" if prefix else key
-                        item_filename = item_path.lower().replace(' ', '_').replace('/', '-') + '.html'
-                        
-                        if isinstance(value, dict):
-                            if current_depth < key_depth - 1:
-                                # Continue recursion for nested menus
-                                updated_menu[key] = add_content_links(value, f"{item_path}/", current_depth + 1, key)
-                            else:
-                                # We're at the level just before target depth - add links to content files
-                                linked_submenu = {}
-                                for subkey in value.keys():
-                                    sub_path = f"{item_path}/{subkey}"
-                                    sub_filename = sub_path.lower().replace(' ', '_').replace('/', '-') + '.html'
-                                    linked_submenu[subkey] = sub_filename
-                                updated_menu[key] = linked_submenu
-                        else:
-                            # For non-dict values or empty placeholders at max depth
-                            updated_menu[key] = item_filename
-                    
-                    return updated_menu
-                else:
-                    # Not at top level, use the top_key to get the depth
-                    max_depth = get_depth_for_key(depth, top_key)
-            
-            # Process each item with the determined depth
-            for key, value in menu_dict.items():
-                item_path = f"{prefix}{key}" if prefix else key
-                item_filename = item_path.lower().replace(' ', '_').replace('/', '-') + '.html'
-                
-                if isinstance(value, dict):
-                    if current_depth < max_depth - 1:
-                        # Continue recursion for nested menus
-                        updated_menu[key] = add_content_links(value, f"{item_path}/", current_depth + 1, top_key)
-                    else:
-                        # We're at the level just before target depth - add links to content files
-                        linked_submenu = {}
-                        for subkey in value.keys():
-                            sub_path = f"{item_path}/{subkey}"
-                            sub_filename = sub_path.lower().replace(' ', '_').replace('/', '-') + '.html'
-                            linked_submenu[subkey] = sub_filename
-                        updated_menu[key] = linked_submenu
-                else:
-                    # For non-dict values or empty placeholders at max depth
-                    updated_menu[key] = item_filename
-            
-            return updated_menu
+        if summary.failures:
+            print(f"Warning: {len(summary.failures)} report(s) failed to render: {', '.join(summary.failures)}")
         
-        # Add links to content files in the menu structure
-        linked_menu = add_content_links(menu_structure)
+        return summary
+    
+    except Exception as e:
+        print(f"Error generating report: {e}")
+        raise
+    finally:
+        # Clean up temporary directory
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        if publish:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+def update_report(
+    output_dir: str,
+    partial_dict: Dict[str, Any],
+    workers: Optional[int] = None,
+    engine: str = "papermill",
+    engine_options: Optional[Dict[str, Any]] = None,
+    leaf_timeout: Optional[float] = None,
+    leaf_memory_mb: Optional[float] = None,
+    leaf_retries: int = 0,
+    cache: Optional[Union[str, RenderCache]] = None,
+    trace_hooks: Optional[List[Callable[[TraceEvent], None]]] = None,
+    profile: bool = False,
+    spool: Optional[Union[str, Spool]] = None,
+    staging_dir: Optional[str] = None
+) -> BuildSummary:
+    """
+    Update part of a report written earlier by generate_report.
+    
+    The changed part of the report is merged into the menu recorded in the build manifest
+    (output_dir/manifest.json): submenus are merged entry by entry, any other value
+    replaces its entry, and the REMOVE marker deletes an entry with its pages. Only pages
+    whose content is new or changed are rendered (generate_report records content hashes
+    only when it has a cache, so without one every page given is rendered again), pages of
+    deleted entries are removed,
+    and the Table of Contents and index.html are written again only when the menu changed
+    (or, for index.html, when the page it shows initially was rendered again). The
+    settings of the original build, such as the title, depth and renderer, are reused.
+    A published report is copied to a staging directory, updated there and published again.
+    
+    Example:
+        update_report("./report_output", {"Products": {"Overview": overview, "Legacy": REMOVE}})
+    
+    Args:
+        output_dir (str): Directory of the report
+        partial_dict (Dict[str, Any]): Nested dictionary with the changed, added and removed entries
+        workers (int, optional): Number of worker processes (see generate_report)
+        engine (str): Notebook execution engine - "papermill" or "kernel"
+        engine_options (Dict[str, Any], optional): Options for the "kernel" engine
+        leaf_timeout (float, optional): Seconds a page may take to render (see generate_report)
+        leaf_memory_mb (float, optional): Memory limit of the processes rendering pages
+        leaf_retries (int): Times a page that timed out is rendered again
+        cache (Union[str, RenderCache], optional): Render cache, or a directory for one
+        trace_hooks (List[Callable[[TraceEvent], None]], optional): Functions called with a
+                                            TraceEvent for each stage of each report
+        profile (bool): Save the trace events as output_dir/profile.json
+        spool (Union[str, Spool], optional): Spool directory for rendering on worker processes
+        staging_dir (str, optional): Directory for the staging copy of a published report
         
-        # Set Table of Contents as default content if no active_report is specified
-        if not active_report:
-            active_content = all_content.get("Table of Contents")
-        else:
-            active_content = all_content.get(active_report, "")
+    Returns:
+        BuildSummary: The pages written and removed, the reports that failed to render and
+                      cache statistics
         
-        # Create Table of Contents link
-        table_of_contents_link = "table_of_contents.html"
+    Raises:
+        FileNotFoundError: If output_dir holds no build manifest
+    """
+    summary = BuildSummary()
+    tracer = Tracer(trace_hooks) if trace_hooks or profile else None
+    build_start = time.perf_counter()
+    
+    manifest = load_manifest(output_dir)
+    settings = manifest['settings']
+    notebook_template = settings['notebook_template']
+    active_report = settings['active_report']
+    
+    # Compile the updated menu tree; pages of the earlier build are StoredPage placeholders
+    with trace_span(tracer, 'plan'):
+        plan = ReportPlan.build(merge_report(stored_report(manifest), partial_dict), settings['depth'])
         
-        # Load icon mappings
-        icon_mappings = {}
-        try:
-            with open(ICON_MAPPING_PATH, 'r') as f:
-                icon_mappings = json.load(f)
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Warning: Could not load icon mappings: {e}")
-            # Use default fallback if file cannot be loaded
-            icon_mappings = {
-                "Dashboard": "home",
-                "Reports": "chart-bar",
-                "Settings": "cog",
-                "Table of Contents": "sitemap"
-            }
+        # Pages given again with the content they were rendered from are kept
+        previous_pages = manifest['pages']
+        hashes: Dict[str, Optional[str]] = {}
+        changed = []
+        for node in plan.pages:
+            if isinstance(node.value, StoredPage):
+                hashes[node.path] = node.value.content_hash
+                continue
+            hashes[node.path] = content_hash(node.value)
+            previous = previous_pages.get(node.path)
+            if (
+                previous is not None
+                and hashes[node.path] is not None
+                and previous['hash'] == hashes[node.path]
+                and os.path.exists(os.path.join(output_dir, node.filename))
+            ):
+                continue
+            changed.append(node)
         
-        # Load Jinja template
-        env = jinja2.Environment(loader=jinja2.FileSystemLoader('./'))
-        template = env.get_template(REPORT_TEMPLATE_PATH)
-        
-        # Render template
-        html_output = template.render(
-            menu_structure=linked_menu,
-            active_content=active_content,
-            active_report=active_report or "Table of Contents",
-            report_title=report_title,
-            table_of_contents_link=table_of_contents_link,
-            default_icons=icon_mappings
+        current_files = {node.filename for node in plan.pages}
+        removed = [path for path, page in previous_pages.items() if page['file'] not in current_files]
+        menu_changed = menu_outline(plan) != manifest['menu']
+    summary.timings['plan'] = time.perf_counter() - build_start
+    
+    if isinstance(cache, str):
+        cache = RenderCache(cache)
+    
+    # A published release is never modified in place: update a staging copy of it
+    publish_dir = output_dir
+    publish = settings.get('publish', False)
+    if publish:
+        output_dir = tempfile.mkdtemp(prefix='qreporting-stage-', dir=staging_dir)
+        copy_release(publish_dir, output_dir)
+    
+    # Create temporary directory for processing
+    temp_dir = os.path.join(output_dir, 'temp')
+    os.makedirs(temp_dir, exist_ok=True)
+    
+    try:
+        stage_start = time.perf_counter()
+        toc_content = None
+        if menu_changed:
+            with trace_span(tracer, 'table_of_contents'):
+                toc_content = plan.table_of_contents()
+        summary.timings['table_of_contents'] = time.perf_counter() - stage_start
+        
+        # Tables are numbered per page, so a shorter page would leave some behind
+        for node in changed:
+            remove_page_tables(output_dir, node.slug)
+        jobs = plan_page_jobs(
+            plan, toc_content, output_dir, settings['large_table_rows'], pages=changed,
+            assets_dir=settings.get('assets_dir')
         )
         
-        # Write main index.html
-        index_path = os.path.join(output_dir, 'index.html')
-        with open(index_path, 'w', encoding='utf-8') as f:
-            f.write(html_output)
+        search = SearchIndex.load(output_dir) if settings.get('search_index', False) else None
         
-        # Save all individual reports
-        for report_name, content in all_content.items():
-            # Create sanitized filename
-            filename = report_name.lower().replace(' ', '_').replace('/', '-')
-            report_path = os.path.join(output_dir, f"{filename}.html")
-            
-            with open(report_path, 'w', encoding='utf-8') as f:
-                f.write(content)
+        active_name = active_report or TABLE_OF_CONTENTS_NAME
+        active_content = write_rendered_pages(
+            jobs,
+            output_dir,
+            temp_dir,
+            notebook_template,
+            summary,
+            active_name,
+            settings['shared_assets'],
+            tracer,
+            settings.get('image_assets', False),
+            search,
+            settings.get('assets_dir'),
+            workers=workers,
+            engine=engine,
+            engine_options=engine_options,
+            leaf_timeout=leaf_timeout,
+            leaf_memory_mb=leaf_memory_mb,
+            leaf_retries=leaf_retries,
+            renderer=settings['renderer'],
+            cache=cache,
+            handoff=settings['handoff'],
+            spool=spool,
+            content_digests=hashes if settings['large_table_rows'] is None else None
+        )
+        
+        # The search box loads search/pages.js, so index.html does not change with the index
+        search_script = None
+        if search is not None:
+            stage_start = time.perf_counter()
+            with trace_span(tracer, 'search'):
+                search_script = search.write(output_dir, [node.path for node in plan.pages])
+            summary.timings['search'] = time.perf_counter() - stage_start
+        
+        stage_start = time.perf_counter()
+        lazy_menu = settings.get('lazy_menu', False)
+        if menu_changed or (active_content is not None and not lazy_menu):
+            with trace_span(tracer, 'shell'):
+                if active_content is None and not lazy_menu:
+                    # The page shown initially is unchanged; embed it as written before
+                    active_path = os.path.join(output_dir, f"{slugify(active_name)}.html")
+                    if os.path.exists(active_path):
+                        with open(active_path, 'r', encoding='utf-8') as f:
+                            active_content = f.read()
+                    elif not active_report:
+                        active_content = ""
+                write_index_page(
+                    plan, output_dir, settings['report_title'], active_report, active_content,
+                    settings['template_cache_dir'], lazy_menu, search_script
+                )
+        summary.timings['shell'] = time.perf_counter() - stage_start
+        
+        # Delete the pages of removed entries once index.html no longer links to them
+        for report_name in removed:
+            page_path = os.path.join(output_dir, previous_pages[report_name]['file'])
+            if os.path.exists(page_path):
+                os.remove(page_path)
+            remove_page_tables(output_dir, slugify(report_name))
+            summary.removed.append(report_name)
+        
+        for report_name in summary.failures:
+            hashes[report_name] = None
+        write_manifest(output_dir, plan, settings, hashes)
+        
+        if profile:
+            tracer.write_chrome_trace(os.path.join(output_dir, 'profile.json'))
+        
+        if publish:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+            stage_start = time.perf_counter()
+            summary.published = publish_release(output_dir, publish_dir)
+            summary.timings['publish'] = time.perf_counter() - stage_start
+        summary.timings['total'] = time.perf_counter() - build_start
+        
+        if summary.failures:
+            print(f"Warning: {len(summary.failures)} report(s) failed to render: {', '.join(summary.failures)}")
+        
+        return summary
     
     except Exception as e:
-        print(f"Error generating report: {e}")
+        print(f"Error updating report: {e}")
         raise
     finally:
         # Clean up temporary directory
         shutil.rmtree(temp_dir, ignore_errors=True)
+        if publish:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+def generate_reports_batch(
+    jobs: Iterable[Union[Tuple[Dict[str, Any], str], Dict[str, Any]]],
+    workers: Optional[int] = None,
+    engine: str = "papermill",
+    engine_options: Optional[Dict[str, Any]] = None,
+    notebook_template: str = NOTEBOOK_TEMPLATE_PATH,
+    assets_dir: Optional[str] = None,
+    concurrent_reports: int = DEFAULT_CONCURRENT_REPORTS,
+    **options: Any
+) -> Dict[str, BuildSummary]:
+    """
+    Generate many reports, e.g. one per client, sharing their execution resources.
+    
+    All builds share one RenderSession: with several workers, one process pool whose warm
+    kernels render the pages of every report, with the pages of concurrent_reports reports
+    in flight at once; otherwise one warm kernel in this process, rendering the reports one
+    after another. The report template is compiled once per process either way. With
+    assets_dir, the styles, scripts and images common to the reports are written once, to
+    one directory all reports link to.
+    
+    Jobs are consumed lazily, so a generator can build each report dictionary just before
+    it is rendered. A build that fails does not stop the others; its summary holds the error.
+    
+    Example:
+        generate_reports_batch(
+            ({"data_dict": client_report(client), "output_dir": f"out/{client}", "report_title": client}
+             for client in clients),
+            workers=8, engine="kernel", assets_dir="out/assets"
+        )
+    
+    Args:
+        jobs (Iterable[Union[Tuple[Dict[str, Any], str], Dict[str, Any]]]): (data_dict, output_dir)
+            pairs, or dictionaries of generate_report arguments including data_dict and output_dir
+        workers (int, optional): Number of worker processes shared by all builds
+        engine (str): Notebook execution engine - "papermill" or "kernel"
+        engine_options (Dict[str, Any], optional): Options for the "kernel" engine
+        notebook_template (str): Path to the notebook template of all reports
+        assets_dir (str, optional): Directory for the styles, scripts and images shared by all
+                                    reports; each report's own output_dir/assets/ by default
+        concurrent_reports (int): Reports built at once when rendering on a pool
+        **options: generate_report arguments for every report, e.g. renderer or cache; the
+                   arguments of a job take precedence
+        
+    Returns:
+        Dict[str, BuildSummary]: Summary of each build by output directory, in job order
+    """
+    summaries: Dict[str, BuildSummary] = {}
+    
+    def build(job: Union[Tuple[Dict[str, Any], str], Dict[str, Any]]) -> Tuple[str, BuildSummary]:
+        """Generate one report of the batch, recording its error instead of raising it."""
+        arguments = dict(options, assets_dir=assets_dir)
+        if isinstance(job, dict):
+            arguments.update(job)
+        else:
+            arguments['data_dict'], arguments['output_dir'] = job
+        output_dir = arguments['output_dir']
+        try:
+            return output_dir, generate_report(notebook_template=notebook_template, session=session, **arguments)
+        except Exception as e:
+            return output_dir, BuildSummary(error=str(e))
+    
+    with RenderSession(workers, engine, engine_options, notebook_template) as session:
+        if session.executor is None or concurrent_reports <= 1:
+            for job in jobs:
+                output_dir, summary = build(job)
+                summaries[output_dir] = summary
+        else:
+            with ThreadPoolExecutor(max_workers=concurrent_reports) as threads:
+                # Take a job only when a build slot is free, so pending jobs are not built early
+                builds: List[Future] = []
+                running = set()
+                for job in jobs:
+                    if len(running) >= concurrent_reports:
+                        _, running = wait(running, return_when=FIRST_COMPLETED)
+                    builds.append(threads.submit(build, job))
+                    running.add(builds[-1])
+                for future in builds:
+                    output_dir, summary = future.result()
+                    summaries[output_dir] = summary
+    
+    failed = [output_dir for output_dir, summary in summaries.items() if summary.error is not None]
+    if failed:
+        print(f"Warning: {len(failed)} of {len(summaries)} report(s) failed to build: {', '.join(failed)}")
+    return summaries
 
 def generate_simple_report(
     content: Any,
     report_name: str,
     output_dir: str,
-    notebook_template: str = NOTEBOOK_TEMPLATE_PATH
+    notebook_template: str = NOTEBOOK_TEMPLATE_PATH,
+    workers: Optional[int] = None,
+    engine: str = "papermill",
+    engine_options: Optional[Dict[str, Any]] = None,
+    renderer: str = "notebook",
+    shared_assets: bool = False,
+    image_assets: bool = False,
+    handoff: str = "dill",
+    large_table_rows: Optional[int] = None
 ) -> str:
     """
     Generate a simple HTML report file from data without generating the full report structure.
@@ -521,6 +2138,19 @@ def generate_simple_report(
         report_name (str): Name of the report (will be used in the title and filename)
         output_dir (str): Directory where the HTML file will be saved
         notebook_template (str): Path to the Jupyter notebook template for processing
+        workers (int, optional): Number of worker processes. When greater than 1 the page is
+                                 rendered in a worker process instead of the current one.
+        engine (str): Notebook execution engine - "papermill" or "kernel"
+        engine_options (Dict[str, Any], optional): Options for the "kernel" engine
+        renderer (str): "notebook" or "native" (see generate_report)
+        shared_assets (bool): Link the page to shared style and script files under
+                              output_dir/assets/ instead of inlining them. Off by default
+                              so the page stays self-contained.
+        image_assets (bool): Write embedded images to files under output_dir/assets/
+                             (see generate_report). Off by default for the same reason.
+        handoff (str): How content is handed to the notebook kernel - "dill" or "arrow"
+        large_table_rows (int, optional): Show DataFrames and Series with more rows as
+                                          virtual-scrolling tables (see generate_report)
         
     Returns:
         str: Path to the generated HTML file
@@ -533,21 +2163,27 @@ def generate_simple_report(
     os.makedirs(temp_dir, exist_ok=True)
     
     try:
+        # Create sanitized filename
+        filename = slugify(report_name)
+        
+        if large_table_rows is not None:
+            content = replace_large_tables(content, output_dir, filename, large_table_rows)
+        
         # Process the content to generate HTML
-        html_content = process_report_content(
-            content,
-            report_name,
+        html_content = render_reports(
+            [(report_name, content)],
             temp_dir,
-            notebook_template
-        )
-        
-        # Create sanitized filename
-        filename = report_name.lower().replace(' ', '_').replace('/', '-') + '.html'
-        report_path = os.path.join(output_dir, filename)
+            notebook_template,
+            workers,
+            engine=engine,
+            engine_options=engine_options,
+            renderer=renderer,
+            handoff=handoff
+        )[report_name]
         
         # Save the HTML content to a file
-        with open(report_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
+        write_page(report_name, html_content, output_dir, shared_assets, image_assets)
+        report_path = os.path.join(output_dir, f"{filename}.html")
             
         print(f"Report created successfully: {report_path}")
         return report_path
@@ -568,39 +2204,20 @@ def generate_table_of_contents(menu_structure: Dict[str, Any]) -> str:
     Generate a simple HTML structure for the Table of Contents.
     
     Args:
-        menu_structure (Dict[str, Any]): The menu structure
+        menu_structure (Dict[str, Any]): The menu structure; every entry that is not a
+                                         non-empty dictionary is a page
         
     Returns:
         str: Simple HTML for the Table of Contents to be processed through the notebook template
     """
-    # Create a function to recursively build the ToC HTML
-    def build_toc_html(structure, current_path=""):
-        html = "<ul>"
-        for key, value in structure.items():
-            # Build the full path for this item
-            item_path = f"{current_path}/{key}" if current_path else key
-            link_id = item_path.lower().replace(' ', '_').replace('/', '-')
-            
-            html += f'<li><strong>{key}</strong>'
-            
-            if isinstance(value, dict) and value:
-                # For items with children
-                html += build_toc_html(value, item_path)
-            else:
-                # For leaf items
-                filename = link_id + '.html'
-                # Direct onclick handler using global function for maximum compatibility
-                html += f' - <a href="#" class="toc-link" onclick="return handleTocLinkClick(\'{filename}\', \'{key}\')" data-url="{filename}" data-title="{key}">{key}</a>'
-            
-            html += '</li>'
-        
-        html += "</ul>"
-        return html
-
-    # Return the TOC HTML without the script (will be added after notebook processing)
-    toc_html = build_toc_html(menu_structure)
+    def pages(structure: Mapping) -> Dict[str, Any]:
+        return {
+            key: pages(value) if isinstance(value, Mapping) and value else None
+            for key, value in structure.items()
+        }
     
-    return toc_html
+    # Every submenu of the structure is expanded; its pages are named like those of a build
+    return ReportPlan.build(pages(menu_structure), sys.maxsize).table_of_contents()
 
 def generate_table_of_contents_content(
     menu_structure: Dict[str, Any],
@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+"""
+Kernel Execution Engine
+
+This module keeps long-lived Jupyter kernels warm between reports. The setup cells of the
+notebook template (cells tagged "setup") run once per kernel, and only the remaining
+per-report cells run for each report. Kernels are recycled after a number of reports or
+when their memory use crosses a threshold.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import copy
+import datetime
+import sys
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import nbformat
+
+# Constants
+SETUP_TAG = "setup"
+PARAMETERS_TAG = "parameters"
+DEFAULT_MAX_REPORTS_PER_KERNEL = 100
+DEFAULT_KERNEL_STARTUP_TIMEOUT = 60
+
+# Message types that end up as cell outputs
+OUTPUT_MESSAGE_TYPES = ('stream', 'display_data', 'execute_result', 'error')
+
+#------------------------------------------------------------------------------
+# HELPER FUNCTIONS
+#------------------------------------------------------------------------------
+
+class KernelExecutionError(Exception):
+    """Raised when a cell of the notebook template fails in a warm kernel."""
+
+def get_process_memory_mb(pid: int) -> Optional[float]:
+    """
+    Get the resident memory of a process.
+
+    Args:
+        pid (int): Process id
+
+    Returns:
+        Optional[float]: Resident set size in megabytes, or None if it cannot be determined
+    """
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+    except Exception:
+        return None
+
+    # Fall back to procfs when psutil is not installed
+    try:
+        with open(f"/proc/{pid}/status", 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+def _timestamp() -> str:
+    """Get the current UTC time in the ISO format nbclient uses for cell timings."""
+    return datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None).isoformat() + 'Z'
+
+#------------------------------------------------------------------------------
+# KERNEL ENGINE
+#------------------------------------------------------------------------------
+
+class KernelEngine:
+    """
+    Execute the notebook template for many reports on a warm kernel.
+
+    The template is split into three groups of cells:
+    - parameter cells (tagged "parameters"), run once per kernel to define defaults
+    - setup cells (tagged "setup"), run once per kernel after the parameters
+    - report cells (everything else), run for every report
+
+    A template without setup tags still works; every cell then runs per report and only
+    the kernel startup is saved.
+
+    Args:
+        notebook_template (str): Path to the notebook template
+        max_reports (int): Number of reports after which the kernel is restarted
+        max_memory_mb (float, optional): Restart the kernel when its resident memory exceeds this
+        timeout (float, optional): Timeout in seconds for a single cell
+        startup_timeout (float): Timeout in seconds for the kernel to start
+        paths (List[str], optional): Import paths for the kernel, defaults to sys.path
+    """
+
+    def __init__(
+        self,
+        notebook_template: str,
+        max_reports: int = DEFAULT_MAX_REPORTS_PER_KERNEL,
+        max_memory_mb: Optional[float] = None,
+        timeout: Optional[float] = None,
+        startup_timeout: float = DEFAULT_KERNEL_STARTUP_TIMEOUT,
+        paths: Optional[List[str]] = None
+    ):
+        self.notebook_template = notebook_template
+        self.max_reports = max_reports
+        self.max_memory_mb = max_memory_mb
+        self.timeout = timeout
+        self.startup_timeout = startup_timeout
+        self.paths = list(sys.path if paths is None else paths)
+
+        import nbformat
+
+        # Split the template once
+        self.notebook = nbformat.read(notebook_template, as_version=4)
+        self.kernel_name = self.notebook.metadata.get('kernelspec', {}).get('name', 'python3')
+        self.parameter_cells = []
+        self.setup_cells = []
+        self.report_cells = []
+        for index, cell in enumerate(self.notebook.cells):
+            if cell.cell_type != 'code':
+                continue
+            tags = cell.metadata.get('tags', [])
+            if PARAMETERS_TAG in tags:
+                self.parameter_cells.append(index)
+            elif SETUP_TAG in tags:
+                self.setup_cells.append(index)
+            else:
+                self.report_cells.append(index)
+
+        # Kernel state
+        self._km = None
+        self._kc = None
+        self._reports_on_kernel = 0
+        self.kernels_started = 0
+        self.reports_executed = 0
+
+    def __enter__(self) -> 'KernelEngine':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.shutdown()
+
+    def start(self) -> None:
+        """Start a kernel and run the parameter and setup cells on it."""
+        from jupyter_client.manager import start_new_kernel
+
+        self._km, self._kc = start_new_kernel(
+            startup_timeout=self.startup_timeout,
+            kernel_name=self.kernel_name
+        )
+        self.kernels_started += 1
+        self._reports_on_kernel = 0
+
+        for index in self.parameter_cells:
+            self._run(self.notebook.cells[index].source)
+        self._run(f"paths = {self.paths!r}")
+        for index in self.setup_cells:
+            self._run(self.notebook.cells[index].source)
+
+    def shutdown(self) -> None:
+        """Stop the current kernel, if any."""
+        if self._kc is not None:
+            self._kc.stop_channels()
+        if self._km is not None:
+            try:
+                self._km.shutdown_kernel(now=True)
+            except Exception as e:
+                print(f"Warning: Could not shut down kernel: {e}")
+        self._km = None
+        self._kc = None
+
+    def restart(self) -> None:
+        """Replace the current kernel with a fresh one."""
+        self.shutdown()
+        self.start()
+
+    def kernel_memory_mb(self) -> Optional[float]:
+        """
+        Get the resident memory of the current kernel.
+
+        Returns:
+            Optional[float]: Resident memory in megabytes, or None if unknown
+        """
+        if self._km is None:
+            return None
+        pid = getattr(self._km.provisioner, 'pid', None)
+        return get_process_memory_mb(pid) if pid else None
+
+    def ensure_started(self) -> bool:
+        """
+        Start or recycle the kernel if the next report needs a fresh one.
+
+        Called by execute(); calling it beforehand separates kernel startup from execution,
+        e.g. for timing.
+
+        Returns:
+            bool: True if a kernel was started
+        """
+        if not self._needs_recycle():
+            return False
+        self.restart()
+        return True
+
+    def _needs_recycle(self) -> bool:
+        """Check whether the kernel must be (re)started before the next report."""
+        if self._km is None or not self._km.is_alive():
+            return True
+        if self._reports_on_kernel >= self.max_reports:
+            return True
+        if self.max_memory_mb is not None:
+            memory = self.kernel_memory_mb()
+            if memory is not None and memory > self.max_memory_mb:
+                return True
+        return False
+
+    def _run(self, code: str, deadline: Optional[float] = None) -> List['nbformat.NotebookNode']:
+        """
+        Run code on the kernel and collect its outputs as notebook outputs.
+
+        Args:
+            code (str): Code to execute
+            deadline (float, optional): time.monotonic() by which the code must be done
+
+        Returns:
+            List[nbformat.NotebookNode]: The cell outputs
+
+        Raises:
+            KernelExecutionError: If the code raises an exception in the kernel
+            TimeoutError: If the code runs past the cell timeout or the deadline. The kernel,
+                          still busy, is shut down and replaced for the next report.
+        """
+        import nbformat
+
+        outputs = []
+
+        def output_hook(msg: Dict[str, Any]) -> None:
+            msg_type = msg['header']['msg_type']
+            if msg_type in OUTPUT_MESSAGE_TYPES:
+                outputs.append(nbformat.v4.output_from_msg(msg))
+            elif msg_type == 'clear_output':
+                outputs.clear()
+
+        timeout = self.timeout
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        try:
+            if timeout is not None and timeout <= 0:
+                raise TimeoutError("No time left")
+            reply = self._kc.execute_interactive(
+                code,
+                timeout=timeout,
+                output_hook=output_hook,
+                allow_stdin=False
+            )
+        except TimeoutError:
+            self.shutdown()
+            raise TimeoutError(f"Kernel did not finish within {max(timeout or 0, 0):.1f}s") from None
+        content = reply['content']
+        if content['status'] == 'error':
+            error = KernelExecutionError(f"{content['ename']}: {content['evalue']}")
+            error.outputs = outputs
+            raise error
+        return outputs
+
+    def execute(self, parameters: Dict[str, Any], timeout: Optional[float] = None) -> 'nbformat.NotebookNode':
+        """
+        Execute the report cells of the template for one report.
+
+        Args:
+            parameters (Dict[str, Any]): Values for the template parameters, e.g. report_path and title
+            timeout (float, optional): Seconds all report cells together may take
+
+        Returns:
+            nbformat.NotebookNode: A copy of the template with the report cell outputs filled in
+
+        Raises:
+            KernelExecutionError: If a report cell fails
+            TimeoutError: If the report cells take longer than timeout
+        """
+        self.ensure_started()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        self._reports_on_kernel += 1
+        self.reports_executed += 1
+
+        # Inject the parameters the same way papermill does
+        self._run('\n'.join(f"{name} = {value!r}" for name, value in parameters.items()), deadline)
+
+        notebook = copy.deepcopy(self.notebook)
+        for index in self.setup_cells + self.parameter_cells:
+            notebook.cells[index].outputs = []
+        for index in self.report_cells:
+            cell = notebook.cells[index]
+            # Timing metadata as recorded by nbclient
+            cell.metadata['execution'] = {'iopub.execute_input': _timestamp()}
+            try:
+                cell.outputs = self._run(cell.source, deadline)
+            except KernelExecutionError as e:
+                cell.outputs = e.outputs
+                raise
+            finally:
+                cell.metadata['execution']['shell.execute_reply'] = _timestamp()
+        return notebook
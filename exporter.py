@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""
+HTML Exporter
+
+This module converts executed notebooks to HTML in memory. The nbconvert exporter and its
+template are created once per process and reused for every report, instead of running
+`jupyter nbconvert` as a subprocess for each one. nbconvert is imported when the first
+page is exported.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import functools
+from typing import TYPE_CHECKING, Any, Dict
+
+if TYPE_CHECKING:
+    import nbformat
+    from nbconvert import HTMLExporter
+
+# Same settings as `jupyter nbconvert --to html --no-input`
+HTML_EXPORTER_CONFIG: Dict[str, Any] = {
+    'exclude_input': True,
+    'exclude_input_prompt': True,
+    'exclude_output_prompt': True
+}
+# Cells get ids from their position, so that unchanged pages export to identical bytes
+CELL_ID_FORMAT = "cell-{index}"
+
+#------------------------------------------------------------------------------
+# EXPORT FUNCTIONS
+#------------------------------------------------------------------------------
+
+@functools.lru_cache(maxsize=None)
+def get_html_exporter() -> 'HTMLExporter':
+    """
+    Get the shared HTML exporter of the current process.
+
+    Returns:
+        HTMLExporter: Exporter configured like `jupyter nbconvert --no-input`
+    """
+    from nbconvert import HTMLExporter
+
+    return HTMLExporter(**HTML_EXPORTER_CONFIG)
+
+def export_notebook_html(notebook: 'nbformat.NotebookNode', name: str) -> str:
+    """
+    Convert an executed notebook to a standalone HTML page.
+
+    Args:
+        notebook (nbformat.NotebookNode): The executed notebook
+        name (str): Notebook name, used as the page title like nbconvert does
+
+    Returns:
+        str: The HTML page
+    """
+    # nbformat and papermill give new cells random ids, which nbconvert writes into the page
+    for index, cell in enumerate(notebook.cells):
+        if 'id' in cell:
+            cell['id'] = CELL_ID_FORMAT.format(index=index)
+    html_content, _ = get_html_exporter().from_notebook_node(
+        notebook,
+        resources={'metadata': {'name': name}}
+    )
+    return html_content
+
+def exporter_fingerprint() -> Dict[str, Any]:
+    """
+    Describe the exporter configuration, for use in cache keys.
+
+    Returns:
+        Dict[str, Any]: The nbconvert version, template name and exporter settings
+    """
+    import nbconvert
+
+    return {
+        'nbconvert': nbconvert.__version__,
+        'template': get_html_exporter().template_name,
+        'config': HTML_EXPORTER_CONFIG,
+        'cell_ids': CELL_ID_FORMAT
+    }
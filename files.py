@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""
+Atomic File Writes
+
+This module writes files under a temporary name in their directory and renames them into
+place, so that readers - viewers of a report, other builds sharing a cache or assets
+directory, spool workers - see either the old or the new file, never a partial one.
+Temporary files start with ".tmp-" and end with ".tmp", so that directory listings can
+skip them.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import contextlib
+import os
+import tempfile
+from typing import Optional, Union
+
+# Permissions of files served like the pages; mkstemp creates private files
+SERVED_FILE_MODE = 0o644
+
+#------------------------------------------------------------------------------
+# ATOMIC WRITES
+#------------------------------------------------------------------------------
+
+def write_atomic(path: str, data: Union[str, bytes], mode: Optional[int] = None) -> None:
+    """
+    Replace a file with new content in one rename.
+
+    Args:
+        path (str): Path of the file; its directory must exist
+        data (Union[str, bytes]): The content, text written as UTF-8
+        mode (int, optional): Permissions of the file, e.g. SERVED_FILE_MODE for files
+                              served like the pages. None keeps it private to this user.
+    """
+    fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path) or '.', prefix='.tmp-', suffix='.tmp')
+    try:
+        if isinstance(data, str):
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(data)
+        else:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+        if mode is not None:
+            os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temp_path)
+        raise
@@ -0,0 +1,289 @@
+#!/usr/bin/env python
+"""
+Content Handoff
+
+This module writes report content to the file the notebook kernel loads. With the default
+"dill" format the whole content is one dill pickle. With the "arrow" format DataFrames and
+Series, wherever they appear in the content, are written as uncompressed Arrow IPC files
+that the kernel memory-maps, and the pickle only holds references to them. A DataFrame that
+appears under several reports is written once per build and referenced from each. A leaf
+that is already an Arrow IPC file on disk is handed off as a reference to that file, in
+either format, without loading it first.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import functools
+import itertools
+import os
+import pickle
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+# Handoff formats
+HANDOFF_FORMATS = ("dill", "arrow")
+
+# Tag of the persistent ids referring to Arrow files
+ARROW_REFERENCE_TAG = 'qreporting-arrow'
+SERIES_COLUMN = '__series__'
+
+# Extensions of Arrow IPC files, which the kernel can memory-map as they are
+ARROW_FILE_EXTENSIONS = ('.arrow', '.feather')
+
+#------------------------------------------------------------------------------
+# HELPER FUNCTIONS
+#------------------------------------------------------------------------------
+
+def require_pyarrow() -> Any:
+    """
+    Import pyarrow, which the "arrow" handoff format needs.
+
+    Returns:
+        module: The pyarrow module
+
+    Raises:
+        ImportError: If pyarrow is not installed
+    """
+    try:
+        import pyarrow
+    except ImportError as e:
+        raise ImportError("The 'arrow' handoff format requires pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+def is_columnar(obj: Any) -> bool:
+    """
+    Check whether an object is handed off as an Arrow file.
+
+    Only plain DataFrames and Series whose columns survive an Arrow round trip unchanged
+    (unique string names, no attrs) qualify; everything else is pickled.
+
+    Args:
+        obj (Any): Any object inside the report content
+
+    Returns:
+        bool: True for DataFrames and Series stored as Arrow files
+    """
+    import pandas as pd
+
+    if type(obj) is pd.Series:
+        return not obj.attrs
+    if type(obj) is pd.DataFrame:
+        columns = obj.columns
+        return (
+            not obj.attrs
+            and not isinstance(columns, pd.MultiIndex)
+            and columns.is_unique
+            and all(isinstance(name, str) for name in columns)
+        )
+    return False
+
+def is_arrow_file(path: Optional[str]) -> bool:
+    """
+    Check whether a file can be handed to the kernel by reference.
+
+    Args:
+        path (str, optional): Path of a file
+
+    Returns:
+        bool: True for existing files with an Arrow IPC extension
+    """
+    return (
+        path is not None
+        and os.path.splitext(path)[1].lower() in ARROW_FILE_EXTENSIONS
+        and os.path.isfile(path)
+    )
+
+#------------------------------------------------------------------------------
+# FRAME STORE
+#------------------------------------------------------------------------------
+
+class FrameStore:
+    """
+    Directory of Arrow files for the DataFrames and Series of one build.
+
+    Objects are identified by identity, so the same object referenced from several reports
+    is written once. The store keeps a reference to every object it has written so that
+    identities are not reused while the build runs, which holds no extra memory for the
+    objects of the report dictionary; the resolved content of lazy leaves goes to a store of
+    its page instead. The store may be shared by threads rendering pages at the same time.
+
+    Args:
+        store_dir (str): Directory for the Arrow files
+    """
+
+    def __init__(self, store_dir: str):
+        require_pyarrow()
+        self.store_dir = store_dir
+        os.makedirs(store_dir, exist_ok=True)
+        self._written: Dict[int, Tuple[Any, Optional[tuple]]] = {}
+        self._file_numbers = itertools.count()
+        self._lock = threading.Lock()
+
+    def reference(self, obj: Any) -> Optional[tuple]:
+        """
+        Get the reference to an object's Arrow file, writing the file on first use.
+
+        Args:
+            obj (Any): A DataFrame or Series that passes is_columnar
+
+        Returns:
+            Optional[tuple]: Persistent id of the file, or None if the object cannot be
+                             converted and has to be pickled instead
+        """
+        key = id(obj)
+        with self._lock:
+            if key not in self._written:
+                self._written[key] = (obj, self._write(obj))
+            return self._written[key][1]
+
+    def _write(self, obj: Any) -> Optional[tuple]:
+        """Write an object as an Arrow IPC file."""
+        import pyarrow as pa
+
+        kind, name = 'frame', None
+        frame = obj
+        if obj.ndim == 1:
+            kind, name = 'series', obj.name
+            frame = obj.to_frame(name=SERIES_COLUMN)
+
+        try:
+            table = pa.Table.from_pandas(frame, preserve_index=True)
+        except (pa.ArrowException, TypeError, ValueError):
+            # Mixed object columns and similar; fall back to pickling this object
+            return None
+
+        path = os.path.join(self.store_dir, f"{next(self._file_numbers):06d}.arrow")
+        with pa.OSFile(path, 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        return (ARROW_REFERENCE_TAG, kind, os.path.abspath(path), name)
+
+class _ReferencePickler(pickle.Pickler):
+    """Pickler writing only a persistent id, which the unpickler resolves to the content."""
+
+    def __init__(self, file: Any, reference: tuple):
+        super().__init__(file)
+        self.reference = reference
+
+    def persistent_id(self, obj: Any) -> Optional[tuple]:
+        return self.reference if obj is self else None
+
+@functools.lru_cache(maxsize=None)
+def handoff_picklers() -> Tuple[type, type]:
+    """
+    Create the dill Pickler and Unpickler that hand off Arrow references, once per process.
+
+    They subclass dill's classes, so they are created on first use to keep dill out of
+    `import qreporting`.
+
+    Returns:
+        Tuple[type, type]: The Pickler and Unpickler classes
+    """
+    import dill
+
+    class _HandoffPickler(dill.Pickler):
+        """dill Pickler replacing columnar objects with references into a FrameStore."""
+
+        def __init__(self, file: Any, store: FrameStore):
+            super().__init__(file)
+            self.store = store
+
+        def persistent_id(self, obj: Any) -> Optional[tuple]:
+            if is_columnar(obj):
+                return self.store.reference(obj)
+            return None
+
+    class _HandoffUnpickler(dill.Unpickler):
+        """dill Unpickler resolving Arrow references by memory-mapping the files."""
+
+        def __init__(self, file: Any):
+            super().__init__(file)
+            self.frames: Dict[str, Any] = {}
+
+        def persistent_load(self, pid: tuple) -> Any:
+            # Objects shared within one report stay shared after loading
+            path = pid[2]
+            if path not in self.frames:
+                self.frames[path] = load_arrow_reference(pid)
+            return self.frames[path]
+
+    return _HandoffPickler, _HandoffUnpickler
+
+#------------------------------------------------------------------------------
+# HANDOFF FUNCTIONS
+#------------------------------------------------------------------------------
+
+def load_arrow_reference(pid: tuple) -> Any:
+    """
+    Load a DataFrame or Series from its Arrow file.
+
+    The file is memory-mapped; numeric columns without nulls are used without copying.
+    The same logic lives in `ReportUnpickler` of generic_report_template.ipynb.
+
+    Args:
+        pid (tuple): Persistent id created by FrameStore
+
+    Returns:
+        Any: The DataFrame or Series
+    """
+    import pyarrow as pa
+
+    tag, kind, path, name = pid
+    if tag != ARROW_REFERENCE_TAG:
+        raise pickle.UnpicklingError(f"Unsupported persistent id: {tag}")
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    frame = table.to_pandas(split_blocks=True)
+    if kind == 'series':
+        series = frame[SERIES_COLUMN]
+        series.name = name
+        return series
+    return frame
+
+def dump_content(content: Any, path: str, store: Optional[FrameStore] = None) -> None:
+    """
+    Write report content for the notebook kernel.
+
+    Args:
+        content (Any): The report content
+        path (str): Path of the pickle file to write
+        store (FrameStore, optional): Store for DataFrames and Series. If None, the whole
+                                      content is a plain dill pickle.
+    """
+    import dill
+
+    with open(path, 'wb') as f:
+        if store is None:
+            dill.dump(content, f)
+        else:
+            handoff_pickler, _ = handoff_picklers()
+            handoff_pickler(f, store).dump(content)
+
+def dump_file_reference(source_path: str, path: str) -> None:
+    """
+    Write a reference to an Arrow IPC file for the notebook kernel, which loads the file
+    as a DataFrame.
+
+    Args:
+        source_path (str): Path of the Arrow IPC (Feather version 2) file
+        path (str): Path of the pickle file to write
+    """
+    reference = (ARROW_REFERENCE_TAG, 'frame', os.path.abspath(source_path), None)
+    with open(path, 'wb') as f:
+        pickler = _ReferencePickler(f, reference)
+        pickler.dump(pickler)
+
+def load_content(path: str) -> Any:
+    """
+    Load report content written by dump_content.
+
+    Args:
+        path (str): Path of the pickle file
+
+    Returns:
+        Any: The report content
+    """
+    _, handoff_unpickler = handoff_picklers()
+    with open(path, 'rb') as f:
+        return handoff_unpickler(f).load()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+"""
+Lazy Leaves
+
+This module lets report content be loaded when its page is rendered instead of when the
+report dictionary is built. A leaf may be a zero-argument callable or a LazyLeaf, e.g. a
+query or a file path plus a loader. Callables that need arguments, such as content objects
+defining __call__, are content like any other leaf. Building the menu and the Table of Contents never
+evaluates it; it is resolved by the process that renders the page (the worker, on a
+process pool) and released once the page is done, so only the leaves being rendered are
+held in memory.
+
+A lazy leaf is always a single page, even if it resolves to a dictionary. Since its content
+is not known before it is resolved, it is only cached, and skipped by update_report, when
+it has a key identifying that content.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import hashlib
+import inspect
+import os
+import types
+from typing import Any, Callable, Optional
+
+# Default loaders of LazyLeaf.from_file, by file extension
+FILE_LOADERS = {
+    '.csv': 'read_csv',
+    '.parquet': 'read_parquet',
+    '.feather': 'read_feather',
+    '.arrow': 'read_feather',
+    '.pkl': 'read_pickle',
+    '.pickle': 'read_pickle'
+}
+
+#------------------------------------------------------------------------------
+# LAZY LEAVES
+#------------------------------------------------------------------------------
+
+class LazyLeaf:
+    """
+    Report content loaded when its page is rendered.
+
+    Example:
+        LazyLeaf(pd.read_sql, "SELECT * FROM sales", engine, key="sales-2024-06-30")
+
+    Args:
+        loader (Callable[..., Any]): Function returning the content
+        *args: Positional arguments of the loader
+        key (Any, optional): Value that changes whenever the content does, e.g. a version or
+                             a timestamp. Without a key the page is rendered on every build.
+        **kwargs: Keyword arguments of the loader
+    """
+
+    def __init__(self, loader: Callable[..., Any], *args: Any, key: Any = None, **kwargs: Any):
+        self.loader = loader
+        self.args = args
+        self.kwargs = kwargs
+        self.key = key
+
+    @classmethod
+    def from_file(cls, path: str, loader: Optional[Callable[[str], Any]] = None) -> 'LazyLeaf':
+        """
+        Create a leaf loaded from a file, keyed by the file's path, size and modification time.
+
+        Args:
+            path (str): Path of the file
+            loader (Callable[[str], Any], optional): Function reading the file. If None, pandas
+                                                     reads .csv, .parquet, .feather, .arrow and .pkl files.
+
+        Returns:
+            LazyLeaf: The leaf
+
+        Raises:
+            ValueError: If no loader is given and the extension has no default one
+        """
+        path = os.path.abspath(path)
+        if loader is None:
+            extension = os.path.splitext(path)[1].lower()
+            if extension not in FILE_LOADERS:
+                raise ValueError(f"No default loader for {path}, pass loader")
+            loader = _PandasReader(FILE_LOADERS[extension])
+        stat = os.stat(path)
+        return cls(loader, path, key=(path, stat.st_size, stat.st_mtime_ns))
+
+    def resolve(self) -> Any:
+        """
+        Load the content.
+
+        Returns:
+            Any: The content; generators are collected into a list
+        """
+        return resolve_leaf(self)
+
+    def map(self, func: Callable[..., Any], *args: Any) -> 'LazyLeaf':
+        """
+        Get a leaf whose content is this leaf's content passed through a function.
+
+        The result has no key, since the function may have side effects.
+
+        Args:
+            func (Callable[..., Any]): Function called with the content and args
+            *args: Further arguments of func
+
+        Returns:
+            LazyLeaf: The transformed leaf
+        """
+        return LazyLeaf(_apply, self, func, args)
+
+    def __repr__(self) -> str:
+        name = getattr(self.loader, '__qualname__', repr(self.loader))
+        return f"LazyLeaf({name})"
+
+class _PandasReader:
+    """Picklable reference to a pandas reader function, imported when called."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __call__(self, path: str) -> Any:
+        import pandas as pd
+
+        return getattr(pd, self.name)(path)
+
+def _apply(leaf: Any, func: Callable[..., Any], args: tuple) -> Any:
+    """Resolve a leaf and pass its content through a function."""
+    return func(resolve_leaf(leaf), *args)
+
+#------------------------------------------------------------------------------
+# HELPER FUNCTIONS
+#------------------------------------------------------------------------------
+
+def is_lazy(value: Any) -> bool:
+    """
+    Check whether a leaf of the report dictionary is resolved at render time.
+
+    A callable other than a class is lazy only if it can be called without arguments.
+    Callables whose signature is unknown, or that need arguments, are content; wrap them
+    in a LazyLeaf with their arguments to load them lazily.
+
+    Args:
+        value (Any): A leaf value
+
+    Returns:
+        bool: True for LazyLeaf objects and zero-argument callables other than classes
+    """
+    if isinstance(value, LazyLeaf):
+        return True
+    if not callable(value) or isinstance(value, type):
+        return False
+    try:
+        parameters = inspect.signature(value).parameters.values()
+    except (TypeError, ValueError):
+        return False
+    return all(
+        parameter.default is not parameter.empty
+        or parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD)
+        for parameter in parameters
+    )
+
+def resolve_leaf(value: Any) -> Any:
+    """
+    Get the content of a leaf, loading it if it is lazy.
+
+    Args:
+        value (Any): A leaf value
+
+    Returns:
+        Any: The content
+    """
+    if isinstance(value, LazyLeaf):
+        content = value.loader(*value.args, **value.kwargs)
+    elif is_lazy(value):
+        content = value()
+    else:
+        return value
+    return list(content) if isinstance(content, types.GeneratorType) else content
+
+def leaf_file(value: Any) -> Optional[str]:
+    """
+    Get the file a leaf reads with one of the default loaders of LazyLeaf.from_file.
+
+    Args:
+        value (Any): A leaf value
+
+    Returns:
+        Optional[str]: Absolute path of the file, None for other leaves
+    """
+    if isinstance(value, LazyLeaf) and isinstance(value.loader, _PandasReader):
+        return value.args[0]
+    return None
+
+def lazy_digest(value: Any) -> Optional[str]:
+    """
+    Identify the content of a lazy leaf without resolving it.
+
+    Args:
+        value (Any): A lazy leaf
+
+    Returns:
+        Optional[str]: SHA-256 hex digest of the leaf's key, None if it has no key
+    """
+    key = getattr(value, 'key', None)
+    if key is None:
+        return None
+    return hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
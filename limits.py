@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+"""
+Leaf Limits
+
+This module bounds the time and memory a single leaf of a report may take when its page is
+rendered on a worker process. Time is limited in two steps: the kernel's own cell timeout
+ends most slow leaves cleanly with an error page, and a watchdog thread kills the worker
+process, with its kernels, when a leaf is stuck anywhere else, e.g. exporting a huge page.
+The parent then replaces the pool and submits the leaves it lost again. Memory is limited
+with an address-space limit (RLIMIT_AS) on the worker, which the kernels it starts inherit,
+so that a leaf allocating too much fails with a MemoryError instead of exhausting the host.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import os
+import signal
+import threading
+from typing import Any, List, Optional
+
+# Seconds a leaf may run past its time limit before the watchdog kills its worker, giving
+# the kernel's cell timeout the chance to end it cleanly first
+KILL_GRACE_SECONDS = 10.0
+# Written to the job directory of a leaf whose worker the watchdog killed
+TIMEOUT_MARKER = "timed_out"
+# Exit code of a worker killed by the watchdog
+WATCHDOG_EXIT_CODE = 124
+# Times a leaf lost with a worker that died for another reason is submitted again
+MAX_LOST_RESUBMITS = 3
+# Number of the slowest leaves listed in a BuildSummary
+SLOW_LEAVES_REPORTED = 10
+
+# Soft address-space limit of this process before set_memory_limit changed it
+_original_memory_limit = None
+
+#------------------------------------------------------------------------------
+# LIMITS
+#------------------------------------------------------------------------------
+
+class LeafTimeoutError(Exception):
+    """Raised for a leaf whose worker was killed for going over its time limit."""
+
+def set_memory_limit(memory_mb: Optional[float]) -> None:
+    """
+    Limit the address space of this process and of the kernels it starts from now on.
+
+    Args:
+        memory_mb (float, optional): Limit in megabytes. None restores the limit the process
+                                     had before the first call.
+    """
+    global _original_memory_limit
+    try:
+        import resource
+    except ImportError:
+        if memory_mb is not None:
+            print("Warning: Memory limits are not supported on this platform")
+        return
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if memory_mb is None:
+        if _original_memory_limit is not None:
+            resource.setrlimit(resource.RLIMIT_AS, (_original_memory_limit, hard))
+            _original_memory_limit = None
+        return
+    if _original_memory_limit is None:
+        _original_memory_limit = soft
+    limit = int(memory_mb * 1024 * 1024)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+def child_pids(pid: Optional[int] = None) -> List[int]:
+    """
+    Get the descendants of a process, such as the kernels of a worker.
+
+    Args:
+        pid (int, optional): Process id, this process by default
+
+    Returns:
+        List[int]: Process ids of its children, their children and so on
+    """
+    pid = pid or os.getpid()
+    try:
+        import psutil
+        return [child.pid for child in psutil.Process(pid).children(recursive=True)]
+    except ImportError:
+        pass
+    except Exception:
+        return []
+
+    # Fall back to procfs when psutil is not installed
+    pids = []
+    pending = [pid]
+    while pending:
+        parent = pending.pop()
+        task_dir = f"/proc/{parent}/task"
+        try:
+            for thread_id in os.listdir(task_dir):
+                with open(os.path.join(task_dir, thread_id, 'children'), 'r') as f:
+                    children = [int(child) for child in f.read().split()]
+                pids.extend(children)
+                pending.extend(children)
+        except (OSError, ValueError):
+            continue
+    return pids
+
+class LeafWatchdog:
+    """
+    Kill this worker process if a leaf is still running KILL_GRACE_SECONDS after its time limit.
+
+    Before exiting, the watchdog writes a marker file that tells the parent which leaf timed
+    out, and kills the child processes of the worker, so that no kernel is left running the
+    leaf. Use it only in processes that can be replaced, such as pool workers.
+
+    Exiting breaks the whole pool, losing the other leaves in flight on it. A marker in the
+    pool's directory tells the parent that a timeout broke the pool, so that it does not
+    count the loss against those leaves (see pool_timed_out).
+
+    Args:
+        timeout (float): Time limit of the leaf in seconds
+        marker_path (str): File written before the process exits
+        pool_dir (str, optional): Directory shared by the workers of the pool, where a marker
+                                  named after this process is also written
+    """
+
+    def __init__(self, timeout: float, marker_path: str, pool_dir: Optional[str] = None):
+        self.timeout = timeout
+        self.marker_path = marker_path
+        self.pool_dir = pool_dir
+        self._timer = threading.Timer(timeout + KILL_GRACE_SECONDS, self._expire)
+        self._timer.daemon = True
+
+    def __enter__(self) -> 'LeafWatchdog':
+        self._timer.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._timer.cancel()
+
+    def _expire(self) -> None:
+        """Record the timeout, kill the kernels and exit."""
+        marker_paths = [self.marker_path]
+        if self.pool_dir is not None:
+            marker_paths.append(os.path.join(self.pool_dir, f"{TIMEOUT_MARKER}_{os.getpid()}"))
+        for marker_path in marker_paths:
+            try:
+                with open(marker_path, 'w', encoding='utf-8') as f:
+                    f.write(f"{self.timeout:g}")
+            except OSError:
+                pass
+        kill_signal = getattr(signal, 'SIGKILL', signal.SIGTERM)
+        for pid in child_pids():
+            try:
+                os.kill(pid, kill_signal)
+            except OSError:
+                pass
+        os._exit(WATCHDOG_EXIT_CODE)
+
+def pool_timed_out(pool_dir: str) -> bool:
+    """
+    Tell whether the watchdog of a worker of a pool killed its worker.
+
+    Args:
+        pool_dir (str): Directory the watchdogs of the pool's workers write their markers to
+
+    Returns:
+        bool: True if a leaf on the pool timed out and broke it
+    """
+    try:
+        return any(name.startswith(TIMEOUT_MARKER) for name in os.listdir(pool_dir))
+    except OSError:
+        return False
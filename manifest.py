@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+"""
+Build Manifest
+
+This module records what a build wrote, so that a report can later be updated in place.
+The manifest (`manifest.json` in the output directory) holds the settings of the build,
+the outline of the menu and, for every page, its file and a hash of its content. The
+stored outline is turned back into a report dictionary whose pages are StoredPage
+placeholders, into which the changed part of a report is merged.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import json
+import os
+from collections.abc import Mapping
+from typing import Any, Dict, List, Optional
+
+if __package__:
+    from .cache import hash_content
+    from .files import SERVED_FILE_MODE, write_atomic
+    from .lazy import is_lazy, lazy_digest
+    from .plan import PlanNode, ReportPlan
+else:  # Imported as a plain module, e.g. by example.py
+    from cache import hash_content
+    from files import SERVED_FILE_MODE, write_atomic
+    from lazy import is_lazy, lazy_digest
+    from plan import PlanNode, ReportPlan
+
+MANIFEST_NAME = "manifest.json"
+
+# Bump when the manifest layout changes
+MANIFEST_VERSION = 1
+
+#------------------------------------------------------------------------------
+# PLACEHOLDERS
+#------------------------------------------------------------------------------
+
+class StoredPage:
+    """
+    A page written by an earlier build, whose content is not available.
+
+    Args:
+        path (str): Report name of the page
+        content_hash (str, optional): Hash of the content the page was rendered from
+    """
+
+    def __init__(self, path: str, content_hash: Optional[str]):
+        self.path = path
+        self.content_hash = content_hash
+
+    def __repr__(self) -> str:
+        return f"StoredPage({self.path!r})"
+
+class _Remove:
+    """Type of the REMOVE marker."""
+
+    def __repr__(self) -> str:
+        return "REMOVE"
+
+# Marks an entry of a partial report dictionary to delete, with its pages
+REMOVE = _Remove()
+
+#------------------------------------------------------------------------------
+# MANIFEST FUNCTIONS
+#------------------------------------------------------------------------------
+
+def content_hash(content: Any) -> Optional[str]:
+    """
+    Hash report content for the manifest. Lazy leaves are hashed by their key.
+
+    Args:
+        content (Any): The report content
+
+    Returns:
+        Optional[str]: Hex digest, or None if the content cannot be serialized or is a
+                       lazy leaf without a key; such pages are always rendered again
+                       by update_report
+    """
+    if is_lazy(content):
+        return lazy_digest(content)
+    try:
+        return hash_content(content)
+    except Exception:
+        return None
+
+def menu_outline(plan: ReportPlan) -> List[list]:
+    """
+    Describe the shape of a report's menu.
+
+    Args:
+        plan (ReportPlan): The compiled report
+
+    Returns:
+        List[list]: [key, file name] for pages and [key, [entries]] for submenus, in menu order
+    """
+    def build(nodes: List[PlanNode]) -> List[list]:
+        return [[f"{node.key}", node.filename if node.leaf else build(node.children)] for node in nodes]
+    return build(plan.roots)
+
+def write_manifest(
+    output_dir: str,
+    plan: ReportPlan,
+    settings: Dict[str, Any],
+    hashes: Dict[str, Optional[str]]
+) -> None:
+    """
+    Save the manifest of a build, replacing the previous one atomically.
+
+    Args:
+        output_dir (str): Directory of the report
+        plan (ReportPlan): The compiled report
+        settings (Dict[str, Any]): Build settings that update_report reuses, JSON-serializable
+        hashes (Dict[str, Optional[str]]): Content hash of each page by report name
+    """
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'settings': settings,
+        'menu': menu_outline(plan),
+        'pages': {
+            node.path: {'file': node.filename, 'hash': hashes.get(node.path)} for node in plan.pages
+        }
+    }
+    write_atomic(os.path.join(output_dir, MANIFEST_NAME), json.dumps(manifest, indent=1), SERVED_FILE_MODE)
+
+def load_manifest(output_dir: str) -> Dict[str, Any]:
+    """
+    Load the manifest of an earlier build.
+
+    Args:
+        output_dir (str): Directory of the report
+
+    Returns:
+        Dict[str, Any]: The manifest
+
+    Raises:
+        FileNotFoundError: If the directory holds no manifest
+        ValueError: If the manifest was written by an incompatible version
+    """
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"No build manifest in {output_dir}; generate the report with generate_report first")
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported manifest version {manifest.get('version')!r} in {path}")
+    return manifest
+
+def stored_report(manifest: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Rebuild the report dictionary of an earlier build, with StoredPage placeholders as pages.
+
+    Keys are restored as strings.
+
+    Args:
+        manifest (Dict[str, Any]): The manifest
+
+    Returns:
+        Dict[str, Any]: Nested dictionary with the menu shape of the build
+    """
+    pages = manifest['pages']
+
+    def build(entries: List[list], prefix: str) -> Dict[str, Any]:
+        tree: Dict[str, Any] = {}
+        for key, entry in entries:
+            path = f"{prefix}/{key}" if prefix else key
+            if isinstance(entry, str):
+                tree[key] = StoredPage(path, pages.get(path, {}).get('hash'))
+            else:
+                tree[key] = build(entry, path)
+        return tree
+
+    return build(manifest['menu'], "")
+
+def merge_report(stored: Dict[str, Any], partial: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge the changed part of a report into a stored report dictionary.
+
+    Submenus are merged entry by entry; any other value replaces the entry, and REMOVE
+    deletes it. Keys are matched by their string form. The stored dictionary is not modified.
+
+    Args:
+        stored (Dict[str, Any]): Report dictionary from stored_report
+        partial (Dict[str, Any]): Changed, added and removed entries
+
+    Returns:
+        Dict[str, Any]: The updated report dictionary
+    """
+    merged = dict(stored)
+    names = {f"{key}": key for key in stored}
+    for key, value in partial.items():
+        existing = names.get(f"{key}", key)
+        if value is REMOVE:
+            merged.pop(existing, None)
+        elif isinstance(value, Mapping):
+            # New submenus are merged into an empty one, which drops REMOVE markers in them
+            current = merged.get(existing)
+            merged[existing] = merge_report(current if isinstance(current, dict) else {}, value)
+        else:
+            merged[existing] = value
+    return merged
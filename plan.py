@@ -0,0 +1,212 @@
+#!/usr/bin/env python
+"""
+Report Plan
+
+This module compiles the nested report dictionary into a ReportPlan in a single pass. The
+plan holds every node of the menu tree with its path, page file name, depth and parent, and
+the menu, the pages to render, their links and the Table of Contents are all derived from
+it. Two reports that would be written to the same file are detected when the plan is built.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+DEFAULT_DEPTH = 2
+
+# Pages generate_report writes besides the report pages
+TABLE_OF_CONTENTS_NAME = "Table of Contents"
+RESERVED_SLUGS = ("index", "table_of_contents")
+
+#------------------------------------------------------------------------------
+# HELPER FUNCTIONS
+#------------------------------------------------------------------------------
+
+def get_depth_for_key(depth_dict: Dict[str, int], key: str) -> int:
+    """
+    Get the depth value for a specific key from the depth dictionary.
+
+    Args:
+        depth_dict (Dict[str, int]): Dictionary mapping keys to depth values
+        key (str): The key to look up
+
+    Returns:
+        int: The depth value for the key, or the default if not found
+    """
+    # If the key exists, return its depth
+    if key in depth_dict:
+        return depth_dict[key]
+
+    # Otherwise check for a default, or use the global default
+    return depth_dict.get('default', DEFAULT_DEPTH)
+
+def slugify(report_name: str) -> str:
+    """
+    Get the file name, without extension, of a report page.
+
+    Args:
+        report_name (str): Report name, i.e. the path of the report in the menu ("A/B")
+
+    Returns:
+        str: The page file name without ".html" ("a-b")
+    """
+    return report_name.lower().replace(' ', '_').replace('/', '-')
+
+#------------------------------------------------------------------------------
+# REPORT PLAN
+#------------------------------------------------------------------------------
+
+@dataclass(eq=False)
+class PlanNode:
+    """
+    One entry of the report menu.
+
+    Attributes:
+        key (Any): Key of the entry in its parent dictionary
+        path (str): Report name, the keys from the top level joined with "/"
+        slug (str): Page file name without extension
+        depth (int): Menu level, 1 for top-level keys
+        leaf (bool): True if the entry is rendered as a page, False for submenus
+        parent (PlanNode, optional): The enclosing submenu, None at the top level
+        value (Any): The report content of a page, or the dictionary of a submenu
+        children (List[PlanNode]): Entries of a submenu
+    """
+    key: Any
+    path: str
+    slug: str
+    depth: int
+    leaf: bool
+    parent: Optional['PlanNode'] = field(default=None, repr=False)
+    value: Any = field(default=None, repr=False)
+    children: List['PlanNode'] = field(default_factory=list, repr=False)
+
+    @property
+    def filename(self) -> str:
+        """File name of the page, relative to the output directory."""
+        return self.slug + '.html'
+
+class ReportPlan:
+    """
+    Compiled structure of a report.
+
+    A dictionary value becomes a submenu while its level is below the depth configured for
+    its top-level key, and a page at that depth. Any other value is a page at its own level.
+    Submenus without entries are left out of the menu.
+
+    Args:
+        roots (List[PlanNode]): The top-level entries
+    """
+
+    def __init__(self, roots: List[PlanNode]):
+        self.roots = roots
+        self.pages: List[PlanNode] = []
+        self.by_slug: Dict[str, PlanNode] = {}
+        for node in self.walk():
+            if node.leaf:
+                self.pages.append(node)
+                self.by_slug[node.slug] = node
+
+    @classmethod
+    def build(
+        cls,
+        data_dict: Dict[str, Any],
+        depth: Union[int, Dict[str, int]] = DEFAULT_DEPTH
+    ) -> 'ReportPlan':
+        """
+        Compile a nested report dictionary into a plan.
+
+        Args:
+            data_dict (Dict[str, Any]): The nested dictionary with report data, or a
+                                        DirectoryReportSource
+            depth (Union[int, Dict[str, int]]): Maximum depth for nested menus - either a fixed
+                                                int or a dict mapping top-level keys to depths
+
+        Returns:
+            ReportPlan: The plan
+
+        Raises:
+            ValueError: If two reports would be written to the same file
+        """
+        files: Dict[str, str] = {}
+
+        def add_nodes(values: Dict[str, Any], parent: Optional[PlanNode], max_depth: int) -> List[PlanNode]:
+            nodes = []
+            current_depth = parent.depth + 1 if parent else 1
+            for key, value in values.items():
+                if parent is None and isinstance(depth, dict):
+                    max_depth = get_depth_for_key(depth, key)
+                path = f"{parent.path}/{key}" if parent else f"{key}"
+                leaf = current_depth >= max_depth or not isinstance(value, Mapping)
+                node = PlanNode(key, path, slugify(path), current_depth, leaf, parent, value)
+
+                if leaf:
+                    if node.slug in RESERVED_SLUGS:
+                        raise ValueError(f"Report '{path}' would overwrite the generated page {node.filename}")
+                    if node.slug in files:
+                        raise ValueError(
+                            f"Reports '{files[node.slug]}' and '{path}' would both be written to {node.filename}"
+                        )
+                    files[node.slug] = path
+                else:
+                    node.children = add_nodes(value, node, max_depth)
+                    if not node.children:
+                        # Empty submenus have no pages
+                        continue
+                nodes.append(node)
+            return nodes
+
+        return cls(add_nodes(data_dict, None, depth if isinstance(depth, int) else DEFAULT_DEPTH))
+
+    def walk(self) -> Iterator[PlanNode]:
+        """
+        Iterate over all nodes in menu order, each submenu before its entries.
+
+        Yields:
+            PlanNode: The nodes
+        """
+        stack = list(reversed(self.roots))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node.children))
+
+    def menu(self) -> Dict[Any, Any]:
+        """
+        Build the menu structure for the report template.
+
+        Returns:
+            Dict[Any, Any]: Nested dictionary mapping each key to the file name of its page,
+                            or to the dictionary of its submenu
+        """
+        def build(nodes: List[PlanNode]) -> Dict[Any, Any]:
+            return {node.key: node.filename if node.leaf else build(node.children) for node in nodes}
+        return build(self.roots)
+
+    def table_of_contents(self) -> str:
+        """
+        Generate a simple HTML structure for the Table of Contents.
+
+        Returns:
+            str: Simple HTML for the Table of Contents to be processed through the notebook template
+        """
+        def build_toc_html(nodes: List[PlanNode]) -> str:
+            html = "<ul>"
+            for node in nodes:
+                html += f'<li><strong>{node.key}</strong>'
+                if node.leaf:
+                    # Direct onclick handler using global function for maximum compatibility
+                    html += (
+                        f' - <a href="#" class="toc-link" onclick="return handleTocLinkClick(\'{node.filename}\', \'{node.key}\')"'
+                        f' data-url="{node.filename}" data-title="{node.key}">{node.key}</a>'
+                    )
+                else:
+                    html += build_toc_html(node.children)
+                html += '</li>'
+            html += "</ul>"
+            return html
+
+        return build_toc_html(self.roots)
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+"""
+Atomic Publishing
+
+This module publishes a report built in a staging directory as a new release of its output
+directory. Releases are kept next to the output directory, in `.<name>.releases/`, and the
+output directory itself becomes a symlink to the live release. Publishing a build:
+
+1. compares the content hash of every staged file with the live release, read from its
+   publish manifest, so the live files are not read again,
+2. hard-links unchanged files from the live release and copies only new and changed ones,
+3. writes the publish manifest of the release, with its file hashes and the changes,
+4. swaps the symlink with an atomic rename, so viewers see either the old or the new
+   report, never a mix of both, and
+5. deletes releases beyond the newest ones kept.
+
+Staging on a local disk keeps the writes to a network file system at the size of the change.
+Files of a release are never modified once it is published, since they may be shared with
+other releases. Symlinks require a POSIX file system.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import datetime
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import uuid
+from typing import Any, Dict
+
+PUBLISH_MANIFEST = "publish.json"
+RELEASES_SUFFIX = ".releases"
+# Releases kept, including the live one, so that viewers of the previous release can finish
+DEFAULT_KEEP_RELEASES = 3
+HASH_BLOCK_SIZE = 1024 * 1024
+
+#------------------------------------------------------------------------------
+# HELPER FUNCTIONS
+#------------------------------------------------------------------------------
+
+def releases_dir(output_dir: str) -> str:
+    """
+    Get the directory holding the releases of an output directory.
+
+    Args:
+        output_dir (str): Directory of the report
+
+    Returns:
+        str: The hidden sibling directory `.<name>.releases`
+    """
+    output_dir = os.path.abspath(output_dir)
+    parent, name = os.path.split(output_dir)
+    return os.path.join(parent, f".{name}{RELEASES_SUFFIX}")
+
+def is_published(output_dir: str) -> bool:
+    """
+    Check whether an output directory is a symlink to a published release.
+
+    Args:
+        output_dir (str): Directory of the report
+
+    Returns:
+        bool: True if the live release has a publish manifest
+    """
+    return os.path.islink(output_dir) and os.path.isfile(os.path.join(output_dir, PUBLISH_MANIFEST))
+
+def file_hash(path: str) -> str:
+    """Get the SHA-256 hash of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def tree_hashes(root: str) -> Dict[str, str]:
+    """
+    Hash every file under a directory.
+
+    Args:
+        root (str): The directory
+
+    Returns:
+        Dict[str, str]: Hash of each file by its path relative to root, with forward slashes
+    """
+    hashes = {}
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            path = os.path.join(dir_path, file_name)
+            relative = os.path.relpath(path, root).replace(os.sep, '/')
+            if relative != PUBLISH_MANIFEST:
+                hashes[relative] = file_hash(path)
+    return dict(sorted(hashes.items()))
+
+def copy_release(output_dir: str, stage_dir: str) -> None:
+    """
+    Copy the live release into a staging directory, to be updated and published again.
+
+    Args:
+        output_dir (str): Directory of the report
+        stage_dir (str): Staging directory
+    """
+    shutil.copytree(
+        output_dir, stage_dir, dirs_exist_ok=True, ignore=shutil.ignore_patterns(PUBLISH_MANIFEST)
+    )
+
+#------------------------------------------------------------------------------
+# PUBLISHING
+#------------------------------------------------------------------------------
+
+def publish_release(
+    stage_dir: str,
+    output_dir: str,
+    keep_releases: int = DEFAULT_KEEP_RELEASES
+) -> Dict[str, Any]:
+    """
+    Publish a staged build as the new live release of an output directory.
+
+    An output directory that is still a plain directory, from a build without publish, is
+    moved into the releases directory and serves as the previous release. Only that move
+    and the symlink that replaces it are not a single atomic step. A build identical to the
+    live release publishes nothing.
+
+    Args:
+        stage_dir (str): Directory the report was built in
+        output_dir (str): Directory of the report, replaced by a symlink to the release
+        keep_releases (int): Releases kept, including the new one
+
+    Returns:
+        Dict[str, Any]: The "release" name, the "previous" one, and the files "added",
+                        "changed" and "removed" and the number "unchanged"
+    """
+    output_dir = os.path.abspath(output_dir)
+    releases = releases_dir(output_dir)
+    os.makedirs(releases, exist_ok=True)
+
+    # Hashes of the live files, from the publish manifest if there is one
+    live_dir = None
+    live_hashes: Dict[str, str] = {}
+    previous = None
+    if os.path.islink(output_dir):
+        live_dir = os.path.realpath(output_dir)
+        previous = os.path.basename(live_dir)
+        try:
+            with open(os.path.join(live_dir, PUBLISH_MANIFEST), 'r', encoding='utf-8') as f:
+                live_hashes = json.load(f)['files']
+        except (OSError, ValueError, KeyError):
+            live_hashes = tree_hashes(live_dir)
+    elif os.path.isdir(output_dir):
+        live_dir = output_dir
+        live_hashes = tree_hashes(live_dir)
+
+    staged_hashes = tree_hashes(stage_dir)
+    if os.path.islink(output_dir) and staged_hashes == live_hashes:
+        # Nothing changed: the live release stays
+        return {
+            'release': previous,
+            'previous': previous,
+            'added': [],
+            'changed': [],
+            'removed': [],
+            'unchanged': len(staged_hashes)
+        }
+    timestamp = datetime.datetime.now(datetime.timezone.utc)
+    release = f"{timestamp.strftime('%Y%m%d-%H%M%S-%f')}-{uuid.uuid4().hex[:8]}"
+    release_dir = os.path.join(releases, release)
+    changes: Dict[str, Any] = {
+        'release': release,
+        'previous': previous,
+        'added': [],
+        'changed': [],
+        'removed': sorted(set(live_hashes) - set(staged_hashes)),
+        'unchanged': 0
+    }
+
+    # Assemble the release under a temporary name, so that a failed publish leaves no release
+    building_dir = tempfile.mkdtemp(dir=releases, prefix='.tmp-')
+    try:
+        # mkdtemp makes the directory private; releases are served to everyone
+        os.chmod(building_dir, 0o755)
+        for relative, digest in staged_hashes.items():
+            target = os.path.join(building_dir, *relative.split('/'))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            if live_dir is not None and live_hashes.get(relative) == digest:
+                changes['unchanged'] += 1
+                try:
+                    os.link(os.path.join(live_dir, *relative.split('/')), target)
+                    continue
+                except OSError:
+                    # No hard links on this file system, or the live file is gone
+                    pass
+            else:
+                changes['changed' if relative in live_hashes else 'added'].append(relative)
+            shutil.copy2(os.path.join(stage_dir, *relative.split('/')), target)
+
+        with open(os.path.join(building_dir, PUBLISH_MANIFEST), 'w', encoding='utf-8') as f:
+            json.dump(dict(changes, published=timestamp.isoformat(), files=staged_hashes), f, indent=1)
+        os.rename(building_dir, release_dir)
+    except BaseException:
+        shutil.rmtree(building_dir, ignore_errors=True)
+        raise
+
+    # A plain output directory from an earlier build becomes the previous release
+    if os.path.isdir(output_dir) and not os.path.islink(output_dir):
+        modified = datetime.datetime.fromtimestamp(os.path.getmtime(output_dir), datetime.timezone.utc)
+        previous = f"{modified.strftime('%Y%m%d-%H%M%S-%f')}-unpublished"
+        os.rename(output_dir, os.path.join(releases, previous))
+        changes['previous'] = previous
+
+    # Swap the symlink: rename replaces the old one atomically
+    link_path = os.path.join(os.path.dirname(output_dir), f".{os.path.basename(output_dir)}.{uuid.uuid4().hex}.link")
+    os.symlink(os.path.relpath(release_dir, os.path.dirname(output_dir)), link_path)
+    os.replace(link_path, output_dir)
+
+    prune_releases(output_dir, keep_releases)
+    return changes
+
+def prune_releases(output_dir: str, keep_releases: int = DEFAULT_KEEP_RELEASES) -> None:
+    """
+    Delete the oldest releases of an output directory, never the live one.
+
+    Args:
+        output_dir (str): Directory of the report
+        keep_releases (int): Releases kept, including the live one
+    """
+    releases = releases_dir(output_dir)
+    live = os.path.basename(os.path.realpath(output_dir))
+    names = sorted(name for name in os.listdir(releases) if not name.startswith('.'))
+    for name in names[:max(len(names) - keep_releases, 0)]:
+        if name != live:
+            shutil.rmtree(os.path.join(releases, name), ignore_errors=True)
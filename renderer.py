@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+"""
+Native Renderer
+
+This module renders the built-in content types without a Jupyter kernel. It builds the
+notebook outputs that `display_data` in generic_report_template.ipynb would produce
+(Markdown headings for dict keys, Markdown for strings, tables for DataFrames, Series and
+Stylers, raw HTML for IPython HTML objects) directly in Python, so the exported page has
+the same structure as a page rendered through the notebook.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:
+    import nbformat
+
+# Plain-text representation IPython attaches to Markdown display outputs
+MARKDOWN_TEXT_PLAIN = '<IPython.core.display.Markdown object>'
+
+#------------------------------------------------------------------------------
+# HELPER FUNCTIONS
+#------------------------------------------------------------------------------
+
+def is_native_supported(data: Any) -> bool:
+    """
+    Check whether data can be rendered without a kernel.
+
+    Mirrors the type checks of `display_data` in the notebook template. Objects with a
+    `.show()` method and types the template does not know are not supported.
+
+    Args:
+        data (Any): The report content
+
+    Returns:
+        bool: True if every value in the content has a native rendering
+    """
+    import pandas as pd
+    from IPython.display import HTML
+    from pandas.io.formats.style import Styler
+
+    if isinstance(data, dict):
+        return all(is_native_supported(value) for value in data.values())
+    elif isinstance(data, list):
+        return all(is_native_supported(item) for item in data)
+    elif isinstance(data, str):
+        return True
+    elif hasattr(data, 'show'):
+        return False
+    return isinstance(data, (pd.DataFrame, pd.Series, Styler, HTML))
+
+def markdown_output(text: str) -> 'nbformat.NotebookNode':
+    """
+    Build the output of `display(Markdown(text))`.
+
+    Args:
+        text (str): Markdown source
+
+    Returns:
+        nbformat.NotebookNode: A display_data output
+    """
+    import nbformat
+
+    return nbformat.v4.new_output(
+        'display_data',
+        data={'text/markdown': text, 'text/plain': MARKDOWN_TEXT_PLAIN}
+    )
+
+def html_output(data: Any) -> 'nbformat.NotebookNode':
+    """
+    Build the output of `display(data)` for an object with an HTML representation.
+
+    Args:
+        data (Any): A DataFrame, Styler or IPython HTML object
+
+    Returns:
+        nbformat.NotebookNode: A display_data output
+    """
+    import nbformat
+
+    return nbformat.v4.new_output(
+        'display_data',
+        data={'text/html': data._repr_html_(), 'text/plain': repr(data)}
+    )
+
+#------------------------------------------------------------------------------
+# RENDERING FUNCTIONS
+#------------------------------------------------------------------------------
+
+def build_outputs(data: Any, outputs: List['nbformat.NotebookNode']) -> List['nbformat.NotebookNode']:
+    """
+    Recursively build the notebook outputs for data, like `display_data` does.
+
+    Args:
+        data (Any): The report content, which must pass is_native_supported
+        outputs (List[nbformat.NotebookNode]): List to append the outputs to
+
+    Returns:
+        List[nbformat.NotebookNode]: The outputs
+    """
+    import pandas as pd
+    from IPython.display import HTML
+    from pandas.io.formats.style import Styler
+
+    if isinstance(data, dict):
+        for key, value in data.items():
+            outputs.append(markdown_output(f'### {key}'))
+            build_outputs(value, outputs)
+    elif isinstance(data, list):
+        for item in data:
+            build_outputs(item, outputs)
+    elif isinstance(data, str):
+        outputs.append(markdown_output(data))
+    elif isinstance(data, pd.DataFrame):
+        outputs.append(html_output(data))
+    elif isinstance(data, pd.Series):
+        outputs.append(html_output(data.to_frame()))
+    elif isinstance(data, (Styler, HTML)):
+        outputs.append(html_output(data))
+    else:
+        raise TypeError(f'Unsupported data type for native rendering: {type(data)}')
+    return outputs
+
+def build_native_notebook(content: Any, title: str) -> 'nbformat.NotebookNode':
+    """
+    Build an executed notebook for content without running a kernel.
+
+    The notebook has the title cell and the report cell of the notebook template,
+    with the outputs those cells would produce.
+
+    Args:
+        content (Any): The report content, which must pass is_native_supported
+        title (str): Title of the report
+
+    Returns:
+        nbformat.NotebookNode: The executed notebook, ready for HTML export
+    """
+    import nbformat
+
+    title_cell = nbformat.v4.new_code_cell("display(Markdown(f'# {title}'))\ndisplay(Markdown('---'))")
+    title_cell.outputs = [markdown_output(f'# {title}'), markdown_output('---')]
+
+    report_cell = nbformat.v4.new_code_cell('show_report(report_path)')
+    report_cell.outputs = build_outputs(content, [])
+
+    notebook = nbformat.v4.new_notebook(cells=[title_cell, report_cell])
+    notebook.metadata['kernelspec'] = {'display_name': 'Python 3', 'language': 'python', 'name': 'python3'}
+    notebook.metadata['language_info'] = {'name': 'python'}
+    return notebook
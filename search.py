@@ -0,0 +1,275 @@
+#!/usr/bin/env python
+"""
+Search Index
+
+This module builds a client-side search index over the pages of a report. Terms are taken
+from each page as it is written: its title, its headings, the column names of its tables
+and the values of their cells, up to a cap per page. The inverted index is split into
+shards by the first two characters of each term, so the shell downloads only the list of
+pages and the shards of the words being typed.
+
+The list of pages is written to `<output_dir>/search/pages.js`, and the shards under
+`search/<version>/`, where the version is a hash of the index, so that a page never loads
+shards of another build. Like the chunks of large tables, they are wrapped in a function
+call and loaded with `<script src>` tags, since `fetch` cannot read files when a report is
+opened from a file:// URL. The terms of every page are also kept in `search/documents.json`,
+so that update_report only extracts the terms of the pages it renders again.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+import tempfile
+from typing import Dict, Iterable, List, Optional, Tuple
+
+if __package__:
+    from .files import SERVED_FILE_MODE, write_atomic
+else:  # Imported as a plain module, e.g. by example.py
+    from files import SERVED_FILE_MODE, write_atomic
+
+# Directory, relative to the output directory, holding the search index
+SEARCH_DIR = "search"
+DOCUMENTS_FILE = "documents.json"
+PAGES_SCRIPT = "pages.js"
+
+# Table cells indexed per page; the column names are always indexed
+MAX_INDEXED_CELLS = 2000
+MIN_TERM_LENGTH = 2
+MAX_TERM_LENGTH = 40
+SHARD_PREFIX_LENGTH = 2
+
+# Weight of a term by where it appears on the page; a page keeps the highest one
+TITLE_WEIGHT = 8
+HEADING_WEIGHT = 4
+COLUMN_WEIGHT = 2
+VALUE_WEIGHT = 1
+
+HEADING_RE = re.compile(r'<h[1-6]\b[^>]*>(.*?)</h[1-6]>', re.S | re.I)
+COLUMN_RE = re.compile(r'<th\b[^>]*>(.*?)</th>', re.S | re.I)
+CELL_RE = re.compile(r'<td\b[^>]*>(.*?)</td>', re.S | re.I)
+LARGE_TABLE_RE = re.compile(r'data-table="([^"]*)"')
+TAG_RE = re.compile(r'<[^>]+>')
+# Terms are runs of letters and digits, as split by the shell's search box
+TERM_SPLIT_RE = re.compile(r'[\W_]+')
+
+#------------------------------------------------------------------------------
+# TERM EXTRACTION
+#------------------------------------------------------------------------------
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into lowercase search terms.
+
+    Args:
+        text (str): Plain text
+
+    Returns:
+        List[str]: Terms of at least MIN_TERM_LENGTH characters, truncated to MAX_TERM_LENGTH
+                   like the shell's search box truncates the terms of a query
+    """
+    return [
+        term[:MAX_TERM_LENGTH] for term in TERM_SPLIT_RE.split(text.lower())
+        if len(term) >= MIN_TERM_LENGTH
+    ]
+
+def _text(fragment: str) -> str:
+    """Get the text of an HTML fragment."""
+    return html.unescape(TAG_RE.sub(' ', fragment))
+
+def extract_terms(
+    report_name: str,
+    html_content: str,
+    max_cells: int = MAX_INDEXED_CELLS
+) -> Dict[str, int]:
+    """
+    Collect the search terms of a rendered page.
+
+    Args:
+        report_name (str): Name of the report, whose keys form the title
+        html_content (str): The page HTML
+        max_cells (int): Table cells indexed at most; numbers in cells are skipped
+
+    Returns:
+        Dict[str, int]: Weight of each term
+    """
+    terms: Dict[str, int] = {}
+
+    def add(text: str, weight: int, skip_numbers: bool = False) -> None:
+        for term in tokenize(text):
+            if skip_numbers and term.isdigit():
+                continue
+            if terms.get(term, 0) < weight:
+                terms[term] = weight
+
+    add(report_name, TITLE_WEIGHT)
+    for match in HEADING_RE.finditer(html_content):
+        add(_text(match.group(1)), HEADING_WEIGHT)
+    for match in COLUMN_RE.finditer(html_content):
+        add(_text(match.group(1)), COLUMN_WEIGHT)
+    for match in LARGE_TABLE_RE.finditer(html_content):
+        # Only the columns of virtual-scrolling tables are in the page
+        try:
+            columns = json.loads(html.unescape(match.group(1))).get('columns', [])
+        except (ValueError, AttributeError):
+            continue
+        add(' '.join(f"{column}" for column in columns), COLUMN_WEIGHT)
+    for count, match in enumerate(CELL_RE.finditer(html_content)):
+        if count >= max_cells:
+            break
+        add(_text(match.group(1)), VALUE_WEIGHT, skip_numbers=True)
+    return terms
+
+def shard_name(term: str) -> str:
+    """
+    Get the shard holding a term, named after its first characters.
+
+    Characters other than ASCII letters and digits are written as "_" and their code point
+    in hex, so that shard names are valid file names everywhere.
+
+    Args:
+        term (str): A search term
+
+    Returns:
+        str: The shard name
+    """
+    return ''.join(
+        char if char.isascii() and char.isalnum() else f"_{ord(char):x}"
+        for char in term[:SHARD_PREFIX_LENGTH]
+    )
+
+#------------------------------------------------------------------------------
+# SEARCH INDEX
+#------------------------------------------------------------------------------
+
+class SearchIndex:
+    """
+    Terms of the pages of a report, written as a sharded index the shell searches.
+
+    Args:
+        documents (Dict[str, Dict], optional): Indexed pages by report name, each with its
+                                               "title", page "url" and term "weights"
+    """
+
+    def __init__(self, documents: Optional[Dict[str, Dict]] = None):
+        self.documents: Dict[str, Dict] = dict(documents or {})
+
+    @classmethod
+    def load(cls, output_dir: str) -> 'SearchIndex':
+        """
+        Load the pages indexed by an earlier build.
+
+        Args:
+            output_dir (str): Directory of the report
+
+        Returns:
+            SearchIndex: The index, empty if the directory has none
+        """
+        path = os.path.join(output_dir, SEARCH_DIR, DOCUMENTS_FILE)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return cls(json.load(f))
+        except FileNotFoundError:
+            return cls()
+
+    def add_page(self, report_name: str, filename: str, html_content: str) -> None:
+        """
+        Index a page, replacing any earlier version of it.
+
+        Args:
+            report_name (str): Name of the report
+            filename (str): File of the page, relative to the output directory
+            html_content (str): The page HTML
+        """
+        self.documents[report_name] = {
+            'title': report_name.replace('/', ' / '),
+            'url': filename,
+            'weights': extract_terms(report_name, html_content)
+        }
+
+    def shards(self) -> Tuple[List[List[str]], Dict[str, Dict[str, List[int]]]]:
+        """
+        Build the inverted index.
+
+        Returns:
+            Tuple[List[List[str]], Dict[str, Dict[str, List[int]]]]: [title, url] of each
+                page in menu order, and the shards, each mapping its terms to a flat list of
+                (page number, weight) pairs
+        """
+        pages: List[List[str]] = []
+        shards: Dict[str, Dict[str, List[int]]] = {}
+        for number, document in enumerate(self.documents.values()):
+            pages.append([document['title'], document['url']])
+            for term, weight in document['weights'].items():
+                shards.setdefault(shard_name(term), {}).setdefault(term, []).extend((number, weight))
+        return pages, shards
+
+    def write(self, output_dir: str, order: Optional[Iterable[str]] = None) -> str:
+        """
+        Write the index and the terms of its pages, and delete the shards of earlier builds.
+
+        Args:
+            output_dir (str): Directory of the report
+            order (Iterable[str], optional): Report names in menu order; pages not in it
+                                             are removed from the index
+
+        Returns:
+            str: Path of the index script relative to the output directory
+        """
+        if order is not None:
+            self.documents = {
+                report_name: self.documents[report_name]
+                for report_name in order if report_name in self.documents
+            }
+        pages, shards = self.shards()
+        shard_scripts = {
+            name: f"qrSearch.addShard({json.dumps(name)},{json.dumps(shard, separators=(',', ':'))});\n"
+            for name, shard in sorted(shards.items())
+        }
+        pages_json = json.dumps(pages, separators=(',', ':'))
+        digest = hashlib.sha256(pages_json.encode('utf-8'))
+        for script in shard_scripts.values():
+            digest.update(script.encode('utf-8'))
+        version = digest.hexdigest()[:16]
+
+        search_dir = os.path.join(output_dir, SEARCH_DIR)
+        version_dir = os.path.join(search_dir, version)
+        if not os.path.isdir(version_dir):
+            # Write to a temporary directory first so that readers never see a partial index
+            os.makedirs(search_dir, exist_ok=True)
+            temp_dir = tempfile.mkdtemp(dir=search_dir, prefix='.tmp-')
+            try:
+                # mkdtemp makes the directory private; the shards are served with the report
+                os.chmod(temp_dir, 0o755)
+                for name, script in shard_scripts.items():
+                    with open(os.path.join(temp_dir, f"{name}.js"), 'w', encoding='utf-8') as f:
+                        f.write(script)
+                os.rename(temp_dir, version_dir)
+            except BaseException:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+                if not os.path.isdir(version_dir):
+                    raise
+
+        write_atomic(
+            os.path.join(search_dir, PAGES_SCRIPT),
+            f"qrSearch.setPages({json.dumps(SEARCH_DIR + '/' + version)},{pages_json});\n",
+            SERVED_FILE_MODE
+        )
+        write_atomic(
+            os.path.join(search_dir, DOCUMENTS_FILE),
+            json.dumps(self.documents, separators=(',', ':')),
+            SERVED_FILE_MODE
+        )
+
+        # Shards of earlier builds are no longer referenced by pages.js
+        for name in os.listdir(search_dir):
+            path = os.path.join(search_dir, name)
+            if name != version and not name.startswith('.') and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+        return f"{SEARCH_DIR}/{PAGES_SCRIPT}"
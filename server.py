@@ -0,0 +1,474 @@
+#!/usr/bin/env python
+"""
+On-Demand Report Server
+
+This module serves a report over HTTP without rendering it first. index.html and the menu
+are written as soon as the report dictionary is compiled; each page is rendered the first
+time it is requested and kept in an in-memory LRU cache, backed by the page files written
+to the output directory and, across runs, by an optional RenderCache. While a page is
+viewed, its siblings in the menu are rendered in the background, so the next click is
+usually served from the cache. Requested pages always go ahead of prefetched ones.
+
+Start it from Python with serve_report, or from the command line with
+`python -m qreporting serve module:report_dict`.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import collections
+import itertools
+import os
+import queue
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import unquote, urlparse
+
+if __package__:
+    from .cache import RenderCache
+    from .core import (
+        ENGINES, NOTEBOOK_TEMPLATE_PATH, RENDERERS, _init_report_worker, _process_report_job, error_html,
+        lookup_cached_page, prepare_page_content, process_report_content, store_cached_page, write_index_page,
+        write_page
+    )
+    from .engine import KernelEngine
+    from .handoff import HANDOFF_FORMATS, FrameStore, dump_content
+    from .lazy import is_lazy
+    from .plan import DEFAULT_DEPTH, TABLE_OF_CONTENTS_NAME, PlanNode, ReportPlan, slugify
+else:  # Imported as a plain module, e.g. by example.py
+    from cache import RenderCache
+    from core import (
+        ENGINES, NOTEBOOK_TEMPLATE_PATH, RENDERERS, _init_report_worker, _process_report_job, error_html,
+        lookup_cached_page, prepare_page_content, process_report_content, store_cached_page, write_index_page,
+        write_page
+    )
+    from engine import KernelEngine
+    from handoff import HANDOFF_FORMATS, FrameStore, dump_content
+    from lazy import is_lazy
+    from plan import DEFAULT_DEPTH, TABLE_OF_CONTENTS_NAME, PlanNode, ReportPlan, slugify
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+DEFAULT_MEMORY_PAGES = 64
+DEFAULT_PREFETCH = 4
+# Seconds a browser waits for a page before it is answered with 504 Gateway Timeout
+DEFAULT_REQUEST_TIMEOUT = 300.0
+
+# Queue priorities: pages requested by a browser go before prefetched siblings
+REQUEST_PRIORITY = 0
+PREFETCH_PRIORITY = 1
+
+#------------------------------------------------------------------------------
+# REPORT SERVER
+#------------------------------------------------------------------------------
+
+class ReportServer:
+    """
+    Pages of a report, rendered when they are first requested.
+
+    Args:
+        data_dict (Dict[str, Any]): The nested dictionary with report data, or a
+                                    DirectoryReportSource
+        output_dir (str, optional): Directory for index.html, the rendered pages and their
+                                    assets. A temporary directory, removed by close(), if None.
+        report_title (str): Title of the report
+        depth (Union[int, Dict[str, int]]): Maximum depth for nested menus (see generate_report)
+        notebook_template (str): Path to the Jupyter notebook template
+        active_report (str, optional): The report displayed initially, the Table of Contents if None
+        workers (int, optional): Number of worker processes rendering pages. None or 1 renders
+                                 them one at a time on a thread of this process.
+        engine (str): Notebook execution engine - "papermill" or "kernel" (see generate_report)
+        engine_options (Dict[str, Any], optional): Options for the "kernel" engine
+        renderer (str): "notebook" or "native" (see generate_report)
+        cache (Union[str, RenderCache], optional): Render cache, or a directory for one, that
+                                                   keeps pages across runs
+        handoff (str): How content is handed to the notebook kernel - "dill" or "arrow"
+        shared_assets (bool): Move the common styles and scripts to shared files
+        image_assets (bool): Write embedded images to content-hashed files
+        large_table_rows (int, optional): Show DataFrames and Series with more rows as
+                                          virtual-scrolling tables
+        memory_pages (int): Rendered pages kept in memory; older ones are read back from
+                            their files
+        prefetch (int): Siblings of a requested page rendered in the background, nearest
+                        first. 0 disables prefetching.
+        request_timeout (float, optional): Seconds a request waits for its page to be rendered
+                                           before it is answered with 504 Gateway Timeout; the
+                                           page is still rendered and cached. None waits forever.
+    """
+
+    def __init__(
+        self,
+        data_dict: Dict[str, Any],
+        output_dir: Optional[str] = None,
+        report_title: str = "Report",
+        depth: Union[int, Dict[str, int]] = DEFAULT_DEPTH,
+        notebook_template: str = NOTEBOOK_TEMPLATE_PATH,
+        active_report: Optional[str] = None,
+        workers: Optional[int] = None,
+        engine: str = "papermill",
+        engine_options: Optional[Dict[str, Any]] = None,
+        renderer: str = "notebook",
+        cache: Optional[Union[str, RenderCache]] = None,
+        handoff: str = "dill",
+        shared_assets: bool = True,
+        image_assets: bool = False,
+        large_table_rows: Optional[int] = None,
+        memory_pages: int = DEFAULT_MEMORY_PAGES,
+        prefetch: int = DEFAULT_PREFETCH,
+        request_timeout: Optional[float] = DEFAULT_REQUEST_TIMEOUT
+    ):
+        if engine not in ENGINES:
+            raise ValueError(f"Unknown engine {engine!r}, expected one of {ENGINES}")
+        if renderer not in RENDERERS:
+            raise ValueError(f"Unknown renderer {renderer!r}, expected one of {RENDERERS}")
+        if handoff not in HANDOFF_FORMATS:
+            raise ValueError(f"Unknown handoff format {handoff!r}, expected one of {HANDOFF_FORMATS}")
+
+        self.owns_output_dir = output_dir is None
+        self.output_dir = tempfile.mkdtemp(prefix='qreporting-') if output_dir is None else output_dir
+        os.makedirs(self.output_dir, exist_ok=True)
+        # Outside the served directory: the content handed to the kernels must not be downloadable
+        self.temp_dir = tempfile.mkdtemp(prefix='qreporting-serve-')
+        self.notebook_template = notebook_template
+        self.workers = workers if workers and workers > 1 else 1
+        self.engine = engine
+        self.engine_options = engine_options or {}
+        self.renderer = renderer
+        self.cache = RenderCache(cache) if isinstance(cache, str) else cache
+        self.handoff = handoff
+        self.shared_assets = shared_assets
+        self.image_assets = image_assets
+        self.large_table_rows = large_table_rows
+        self.memory_pages = memory_pages
+        self.prefetch = prefetch
+        self.request_timeout = request_timeout
+        self.failures: Dict[str, str] = {}
+
+        # Pages by file name, and the menu node of each (None for the Table of Contents)
+        self.plan = ReportPlan.build(data_dict, depth)
+        self.pages: Dict[str, Tuple[str, Optional[PlanNode]]] = {
+            node.filename: (node.path, node) for node in self.plan.pages
+        }
+        self.pages[f"{slugify(TABLE_OF_CONTENTS_NAME)}.html"] = (TABLE_OF_CONTENTS_NAME, None)
+        self.active_file = f"{slugify(active_report or TABLE_OF_CONTENTS_NAME)}.html"
+
+        self._lock = threading.Lock()
+        self._memory: 'collections.OrderedDict[str, bytes]' = collections.OrderedDict()
+        self._written: set = set()
+        self._futures: Dict[str, Future] = {}
+        self._queue: 'queue.PriorityQueue[Tuple[int, int, Optional[str]]]' = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._frame_store = FrameStore(os.path.join(self.temp_dir, 'frames')) if handoff == "arrow" else None
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._threads: List[threading.Thread] = []
+
+        # The shell loads the menu from a script and the initial page through the iframe,
+        # so neither needs a rendered page
+        write_index_page(self.plan, self.output_dir, report_title, active_report, lazy_menu=True)
+
+    def start(self) -> None:
+        """Start rendering, beginning with the page index.html shows first."""
+        if self.cache is not None:
+            self.cache.evict()
+        if self.workers > 1:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_report_worker,
+                initargs=(self.engine, self.notebook_template, self.engine_options)
+            )
+        for number in range(self.workers):
+            thread = threading.Thread(target=self._dispatch, name=f"qreporting-render-{number}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._submit(self.active_file, PREFETCH_PRIORITY)
+
+    def close(self) -> None:
+        """Stop rendering and remove temporary files, and the output directory if it is temporary."""
+        for _ in self._threads:
+            self._queue.put((-1, next(self._order), None))
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+        if self.cache is not None:
+            self.cache.evict()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+        if self.owns_output_dir:
+            shutil.rmtree(self.output_dir, ignore_errors=True)
+
+    #--------------------------------------------------------------------------
+    # Page access
+    #--------------------------------------------------------------------------
+
+    def get_page(self, filename: str, timeout: Optional[float] = None) -> Optional[bytes]:
+        """
+        Get a page, rendering it first if needed, and queue its siblings for prefetching.
+
+        Args:
+            filename (str): File name of the page, e.g. "sales-overview.html"
+            timeout (float, optional): Seconds to wait for the page to be rendered
+
+        Returns:
+            Optional[bytes]: The page, None if the report has no such page
+
+        Raises:
+            concurrent.futures.TimeoutError: If the page is not rendered in time
+        """
+        if filename not in self.pages:
+            return None
+        page = self._cached_page(filename)
+        while page is None:
+            future = self._submit(filename, REQUEST_PRIORITY)
+            # No future if the page was written since it was looked up
+            page = future.result(timeout) if future is not None else self._cached_page(filename)
+        self._prefetch_siblings(filename)
+        return page
+
+    def _cached_page(self, filename: str) -> Optional[bytes]:
+        """Get a rendered page from memory, or from its file if it left the memory cache."""
+        with self._lock:
+            if filename in self._memory:
+                self._memory.move_to_end(filename)
+                return self._memory[filename]
+            if filename not in self._written:
+                return None
+        try:
+            with open(os.path.join(self.output_dir, filename), 'rb') as f:
+                page = f.read()
+        except OSError:
+            return None
+        self._remember(filename, page)
+        return page
+
+    def _remember(self, filename: str, page: bytes) -> None:
+        """Keep a page in the memory cache, evicting the least recently used ones."""
+        with self._lock:
+            self._remember_locked(filename, page)
+
+    def _remember_locked(self, filename: str, page: bytes) -> None:
+        """Keep a page in the memory cache; the caller holds the lock."""
+        self._memory[filename] = page
+        self._memory.move_to_end(filename)
+        while len(self._memory) > self.memory_pages:
+            self._memory.popitem(last=False)
+
+    def _submit(self, filename: str, priority: int) -> Optional[Future]:
+        """Queue a page for rendering. Returns None if it is rendered already."""
+        with self._lock:
+            future = self._futures.get(filename)
+            if future is None:
+                if filename in self._written:
+                    return None
+                future = Future()
+                self._futures[filename] = future
+            elif priority >= PREFETCH_PRIORITY or future.running():
+                return future
+        # A prefetched page that is now requested is queued again at the higher priority;
+        # whichever entry is taken first renders it
+        self._queue.put((priority, next(self._order), filename))
+        return future
+
+    def _prefetch_siblings(self, filename: str) -> None:
+        """Queue the nearest siblings of a page that are not rendered yet."""
+        node = self.pages[filename][1]
+        if not self.prefetch or node is None:
+            return
+        siblings = [sibling for sibling in (node.parent.children if node.parent else self.plan.roots) if sibling.leaf]
+        position = siblings.index(node)
+        nearest = sorted(
+            (sibling for sibling in siblings if sibling is not node),
+            key=lambda sibling: abs(siblings.index(sibling) - position)
+        )
+        queued = 0
+        for sibling in nearest:
+            if queued >= self.prefetch:
+                break
+            with self._lock:
+                known = sibling.filename in self._written or sibling.filename in self._futures
+            if not known and self._submit(sibling.filename, PREFETCH_PRIORITY) is not None:
+                queued += 1
+
+    #--------------------------------------------------------------------------
+    # Rendering
+    #--------------------------------------------------------------------------
+
+    def _dispatch(self) -> None:
+        """Render queued pages until close() is called."""
+        kernel_engine = None
+        try:
+            while True:
+                _, _, filename = self._queue.get()
+                if filename is None:
+                    break
+                with self._lock:
+                    # Skip pages queued twice that are already taken
+                    future = self._futures.get(filename)
+                    if future is None or future.running() or not future.set_running_or_notify_cancel():
+                        continue
+                try:
+                    if self.engine == "kernel" and self._executor is None and kernel_engine is None:
+                        kernel_engine = KernelEngine(self.notebook_template, **self.engine_options)
+                    page = self._render(filename, kernel_engine)
+                except Exception as e:
+                    with self._lock:
+                        del self._futures[filename]
+                    future.set_exception(e)
+                    continue
+                with self._lock:
+                    self._written.add(filename)
+                    self._remember_locked(filename, page)
+                    del self._futures[filename]
+                future.set_result(page)
+        finally:
+            if kernel_engine is not None:
+                kernel_engine.shutdown()
+
+    def _content(self, report_name: str, node: Optional[PlanNode]) -> Any:
+        """Get the content of a page, with large tables replaced by their widgets."""
+        content = node.value if node is not None else self.plan.table_of_contents()
+        return prepare_page_content(report_name, content, self.output_dir, self.large_table_rows)
+
+    def _render(self, filename: str, kernel_engine: Optional[KernelEngine]) -> bytes:
+        """Render a page, or take it from the render cache, and write it."""
+        report_name, node = self.pages[filename]
+        content = self._content(report_name, node)
+
+        cache_key = None
+        html_content = None
+        if self.cache is not None:
+            html_content, cache_key = lookup_cached_page(
+                self.cache, content, report_name, self.notebook_template, self.renderer, self.handoff
+            )
+
+        if html_content is None:
+            job_dir = tempfile.mkdtemp(prefix='report_', dir=self.temp_dir)
+            errors: Dict[str, str] = {}
+            try:
+                if self._executor is None:
+                    html_content = process_report_content(
+                        content, report_name, job_dir, self.notebook_template, errors, kernel_engine,
+                        self.renderer, self._frame_store
+                    )
+                else:
+                    html_content = self._render_on_pool(content, report_name, job_dir, errors)
+            finally:
+                shutil.rmtree(job_dir, ignore_errors=True)
+            if report_name in errors:
+                self.failures[report_name] = errors[report_name]
+            else:
+                self.failures.pop(report_name, None)
+                if cache_key:
+                    store_cached_page(self.cache, cache_key, report_name, html_content)
+
+        html_content = write_page(report_name, html_content, self.output_dir, self.shared_assets, self.image_assets)
+        return html_content.encode('utf-8')
+
+    def _render_on_pool(self, content: Any, report_name: str, job_dir: str, errors: Dict[str, str]) -> str:
+        """Render a page on a worker process, recording its error if it fails."""
+        content_path = os.path.join(job_dir, "content.pkl")
+        try:
+            dump_content(content, content_path, self._frame_store)
+            html_content, error, _, _ = self._executor.submit(
+                _process_report_job, content_path, report_name, job_dir, self.notebook_template,
+                self.renderer, False, is_lazy(content), self.handoff
+            ).result()
+        except Exception as e:
+            # Serialization failed or the worker itself died
+            print(f"Error processing content for {report_name}: {e}")
+            html_content, error = error_html(e), str(e)
+        if error is not None:
+            errors[report_name] = error
+        return html_content
+
+#------------------------------------------------------------------------------
+# HTTP SERVER
+#------------------------------------------------------------------------------
+
+class _ReportRequestHandler(SimpleHTTPRequestHandler):
+    """Serve report pages through the ReportServer and every other file from the output directory."""
+
+    report: ReportServer
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, directory=self.report.output_dir, **kwargs)
+
+    def do_GET(self) -> None:
+        filename = unquote(urlparse(self.path).path).lstrip('/')
+        if filename not in self.report.pages:
+            super().do_GET()
+            return
+        try:
+            page = self.report.get_page(filename, self.report.request_timeout)
+        except FutureTimeoutError:
+            self.send_error(HTTPStatus.GATEWAY_TIMEOUT, f"Rendering {filename} timed out")
+            return
+        except Exception as e:
+            print(f"Error serving {filename}: {e}")
+            self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR, f"Could not render {filename}")
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(page)))
+        self.send_header('Cache-Control', 'no-cache')
+        self.end_headers()
+        self.wfile.write(page)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Asset requests would drown the output
+        pass
+
+def create_http_server(report: ReportServer, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """
+    Create an HTTP server for a report; the caller starts both and closes them.
+
+    Args:
+        report (ReportServer): The report to serve
+        host (str): Address to listen on
+        port (int): Port to listen on, 0 for any free port
+
+    Returns:
+        ThreadingHTTPServer: The server, not yet serving
+    """
+    handler = type('ReportRequestHandler', (_ReportRequestHandler,), {'report': report})
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    return httpd
+
+def serve_report(
+    data_dict: Dict[str, Any],
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    **options: Any
+) -> None:
+    """
+    Serve a report over HTTP, rendering each page when it is first requested.
+
+    Blocks until interrupted, then stops the renderers and removes temporary files.
+
+    Args:
+        data_dict (Dict[str, Any]): The nested dictionary with report data, or a
+                                    DirectoryReportSource
+        host (str): Address to listen on
+        port (int): Port to listen on, 0 for any free port
+        **options: Options of ReportServer, e.g. report_title, depth, workers, engine,
+                   cache, memory_pages, prefetch or request_timeout
+    """
+    report = ReportServer(data_dict, **options)
+    httpd = create_http_server(report, host, port)
+    try:
+        report.start()
+        print(f"Serving report on http://{host}:{httpd.server_address[1]}/ (press Ctrl+C to stop)")
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        report.close()
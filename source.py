@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+"""
+Directory Report Source
+
+This module reads a report from a directory tree instead of a nested dictionary. Every
+subdirectory is a submenu and every data file a leaf, named after the file without its
+extension. The tree is listed from directory entries and file metadata only; a file is
+opened when its page is rendered, in the process that renders it, and released afterwards.
+Arrow IPC files (.arrow, .feather) are not even loaded there: the notebook kernel
+memory-maps the file itself (see handoff.py).
+
+A DirectoryReportSource can be passed wherever a report dictionary is expected:
+
+    generate_report(DirectoryReportSource("/data/reports/2024-06"), "out/2024-06")
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import os
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Iterator, Optional
+
+if __package__:
+    from .lazy import FILE_LOADERS, LazyLeaf, resolve_leaf
+else:  # Imported as a plain module, e.g. by example.py
+    from lazy import FILE_LOADERS, LazyLeaf, resolve_leaf
+
+# Entries starting with these are skipped, e.g. ".DS_Store" or Spark's "_SUCCESS" markers
+IGNORED_PREFIXES = ('.', '_')
+
+#------------------------------------------------------------------------------
+# DIRECTORY REPORT SOURCE
+#------------------------------------------------------------------------------
+
+class DirectoryReportSource(Mapping):
+    """
+    Read-only report dictionary backed by a directory tree.
+
+    Entries are sorted by name. Files without a loader for their extension are skipped, and
+    a directory with such an extension, e.g. a partitioned Parquet dataset, is a single leaf.
+    A subdirectory rendered as a single page, at the maximum menu depth, is loaded as a
+    whole when its page is rendered.
+
+    Args:
+        root (str): The directory
+        loaders (Dict[str, Callable[[str], Any]], optional): Functions reading a file, by
+                                                             extension (".json"), used before
+                                                             the pandas readers of FILE_LOADERS
+
+    Raises:
+        ValueError: If two entries of a directory have the same name without extension
+    """
+
+    def __init__(self, root: str, loaders: Optional[Dict[str, Callable[[str], Any]]] = None):
+        self.root = os.path.abspath(root)
+        self.loaders = {extension.lower(): loader for extension, loader in (loaders or {}).items()}
+        self._entries: Optional[Dict[str, Any]] = None
+
+    def _list(self) -> Dict[str, Any]:
+        """List the directory once, creating the subsources and leaves of its entries."""
+        if self._entries is not None:
+            return self._entries
+
+        entries: Dict[str, Any] = {}
+        paths: Dict[str, str] = {}
+        with os.scandir(self.root) as scan:
+            dir_entries = sorted(scan, key=lambda entry: entry.name)
+        for entry in dir_entries:
+            if entry.name.startswith(IGNORED_PREFIXES):
+                continue
+            key, extension = os.path.splitext(entry.name)
+            extension = extension.lower()
+            if extension in self.loaders or extension in FILE_LOADERS:
+                value = LazyLeaf.from_file(entry.path, self.loaders.get(extension))
+            elif entry.is_dir():
+                key = entry.name
+                value = DirectoryReportSource(entry.path, self.loaders)
+            else:
+                continue
+            if key in entries:
+                raise ValueError(f"{paths[key]} and {entry.path} would both be the report '{key}'")
+            entries[key] = value
+            paths[key] = entry.path
+        self._entries = entries
+        return entries
+
+    def __getitem__(self, key: str) -> Any:
+        return self._list()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._list())
+
+    def __len__(self) -> int:
+        return len(self._list())
+
+    @property
+    def key(self) -> tuple:
+        """Identity of the tree's content, from the paths, sizes and modification times of its files."""
+        return tuple((key, value.key) for key, value in self.items())
+
+    def __call__(self) -> Dict[str, Any]:
+        """
+        Load the whole tree, for a directory rendered as a single page.
+
+        A subdirectory below the menu depth is a leaf of the report. It takes no arguments,
+        so is_lazy treats it as a lazy leaf and the worker rendering its page loads it here.
+
+        Returns:
+            Dict[str, Any]: Nested dictionary with the content of every file
+        """
+        return {key: resolve_leaf(value) for key, value in self.items()}
+
+    def __repr__(self) -> str:
+        return f"DirectoryReportSource({self.root!r})"
@@ -0,0 +1,459 @@
+#!/usr/bin/env python
+"""
+Spool Rendering
+
+This module spreads the pages of a build over any number of worker processes and hosts
+through a shared directory. The coordinator (generate_report with `spool=...`) writes
+each page as a job: its serialized content and a small JSON spec. Workers started with
+`python -m qreporting worker <spool_dir>` claim jobs by renaming their ticket file, which
+is atomic, render them and write the page back. A worker renews the lease on its job by
+touching the ticket; the coordinator puts jobs whose lease expired, e.g. because their
+worker crashed, back in the queue, and fails them after a number of attempts.
+
+Layout of the spool directory:
+    jobs/<job id>/      content.pkl, job.json and, once rendered, page.html
+    jobs/<build>-frames Arrow files of a build using the "arrow" handoff
+    pending/<job id>    tickets of jobs waiting for a worker
+    claimed/<job id>    tickets of jobs being rendered; the mtime is the lease
+    done/<job id>.json  results: the error message, if any, trace events and render stats
+
+All paths, including the notebook template and the output directory, must be the same
+on every host.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import contextlib
+import dataclasses
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+if __package__:
+    from .files import write_atomic
+    from .tracing import TraceEvent
+else:  # Imported as a plain module, e.g. by example.py
+    from files import write_atomic
+    from tracing import TraceEvent
+
+DEFAULT_LEASE_TIMEOUT = 60.0
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_MAX_IN_FLIGHT = 256
+DEFAULT_POLL_INTERVAL = 0.2
+
+# Leases are renewed this many times per lease timeout
+HEARTBEATS_PER_LEASE = 4
+
+CONTENT_FILE = "content.pkl"
+SPEC_FILE = "job.json"
+PAGE_FILE = "page.html"
+
+#------------------------------------------------------------------------------
+# HELPER FUNCTIONS
+#------------------------------------------------------------------------------
+
+def _remove(path: str) -> None:
+    """Remove a file if it exists."""
+    with contextlib.suppress(FileNotFoundError):
+        os.unlink(path)
+
+#------------------------------------------------------------------------------
+# SPOOL
+#------------------------------------------------------------------------------
+
+class Spool:
+    """
+    Shared directory of page jobs.
+
+    Args:
+        spool_dir (str): The spool directory, on storage shared by the coordinator and workers
+        lease_timeout (float): Seconds without a heartbeat after which a claimed job is
+                               considered abandoned and queued again
+        max_attempts (int): Times a job is handed out before it fails
+        max_in_flight (int): Jobs a coordinator keeps in the spool at once
+        poll_interval (float): Seconds between checks for new jobs or results
+    """
+
+    def __init__(
+        self,
+        spool_dir: str,
+        lease_timeout: float = DEFAULT_LEASE_TIMEOUT,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        poll_interval: float = DEFAULT_POLL_INTERVAL
+    ):
+        self.spool_dir = os.path.abspath(spool_dir)
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.max_in_flight = max_in_flight
+        self.poll_interval = poll_interval
+        for name in ('jobs', 'pending', 'claimed', 'done'):
+            os.makedirs(os.path.join(self.spool_dir, name), exist_ok=True)
+
+        # Times each job of this coordinator was handed out
+        self._attempts: Dict[str, int] = {}
+        self._last_lease_check = 0.0
+
+    def _path(self, *parts: str) -> str:
+        return os.path.join(self.spool_dir, *parts)
+
+    #--------------------------------------------------------------------------
+    # Coordinator
+    #--------------------------------------------------------------------------
+
+    def new_build_id(self) -> str:
+        """
+        Get an identifier for the jobs of one build.
+
+        Returns:
+            str: Unique prefix of the build's job ids
+        """
+        return uuid.uuid4().hex[:12]
+
+    def job_dir(self, job_id: str) -> str:
+        """
+        Create the directory of a job.
+
+        Args:
+            job_id (str): The job id
+
+        Returns:
+            str: The directory; the content goes to CONTENT_FILE inside it
+        """
+        path = self._path('jobs', job_id)
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def frames_dir(self, build_id: str) -> str:
+        """
+        Get the directory for the Arrow files of a build, removed with its jobs.
+
+        Args:
+            build_id (str): The build id
+
+        Returns:
+            str: The directory
+        """
+        return self._path('jobs', f"{build_id}-frames")
+
+    def submit(self, job_id: str, spec: Dict[str, Any]) -> None:
+        """
+        Queue a job whose content has been written to its directory.
+
+        Args:
+            job_id (str): The job id
+            spec (Dict[str, Any]): Arguments of the job for the worker
+        """
+        spec = dict(spec, lease_timeout=self.lease_timeout)
+        write_atomic(os.path.join(self.job_dir(job_id), SPEC_FILE), json.dumps(spec))
+        self._attempts[job_id] = 1
+        write_atomic(self._path('pending', job_id), job_id)
+
+    def poll(self, job_ids: Iterable[str]) -> List[Tuple[str, Optional[str], Optional[str], List[TraceEvent], Dict[str, Any]]]:
+        """
+        Collect the finished jobs among the given ones, without waiting.
+
+        Jobs whose lease expired are queued again, or failed once they were handed out
+        max_attempts times. Collected jobs are removed from the spool.
+
+        Args:
+            job_ids (Iterable[str]): Jobs of this coordinator still in flight
+
+        Returns:
+            List[Tuple[str, Optional[str], Optional[str], List[TraceEvent], Dict[str, Any]]]: (job id,
+                HTML content, error message, trace events, render stats); the HTML content is None
+                for jobs that failed because their lease expired too often. The stats hold the
+                "seconds" the page took and whether it "timed_out", as measured by the worker,
+                and the "retries" after expired leases.
+        """
+        results = []
+        check_leases = time.monotonic() - self._last_lease_check >= self.lease_timeout / HEARTBEATS_PER_LEASE
+        if check_leases:
+            self._last_lease_check = time.monotonic()
+
+        for job_id in list(job_ids):
+            result_path = self._path('done', f"{job_id}.json")
+            if os.path.exists(result_path):
+                with open(result_path, 'r', encoding='utf-8') as f:
+                    result = json.load(f)
+                with open(self._path('jobs', job_id, PAGE_FILE), 'r', encoding='utf-8') as f:
+                    html_content = f.read()
+                events = [TraceEvent(**event) for event in result['events']]
+                stats = dict(result.get('stats', {}), retries=self._attempts.get(job_id, 1) - 1)
+                results.append((job_id, html_content, result['error'], events, stats))
+                self.remove_job(job_id)
+            elif check_leases:
+                expired = self._expire_lease(job_id)
+                if expired is not None:
+                    results.append((job_id, *expired))
+        return results
+
+    def _expire_lease(self, job_id: str) -> Optional[Tuple[None, str, List[TraceEvent], Dict[str, Any]]]:
+        """Queue a job again if its lease expired; fail it after max_attempts."""
+        ticket = self._path('claimed', job_id)
+        try:
+            if time.time() - os.path.getmtime(ticket) < self.lease_timeout:
+                return None
+        except FileNotFoundError:
+            # Pending, or finished since the result was checked
+            return None
+
+        if self._attempts.get(job_id, 1) >= self.max_attempts:
+            attempts = self._attempts.get(job_id, 1)
+            error = f"Job abandoned by its worker {attempts} time(s) (lease expired)"
+            self.remove_job(job_id)
+            return None, error, [], {'retries': attempts - 1}
+        try:
+            os.rename(ticket, self._path('pending', job_id))
+        except FileNotFoundError:
+            return None
+        self._attempts[job_id] = self._attempts.get(job_id, 1) + 1
+        print(f"Warning: Lease of spool job {job_id} expired, queued again")
+        return None
+
+    def wait(self, job_ids: Iterable[str]) -> List[Tuple[str, Optional[str], Optional[str], List[TraceEvent], Dict[str, Any]]]:
+        """
+        Wait until at least one of the given jobs is finished.
+
+        Args:
+            job_ids (Iterable[str]): Jobs of this coordinator still in flight
+
+        Returns:
+            List[Tuple[str, Optional[str], Optional[str], List[TraceEvent], Dict[str, Any]]]: The
+                finished jobs (see poll)
+        """
+        job_ids = list(job_ids)
+        waited = 0.0
+        warned = False
+        while True:
+            results = self.poll(job_ids)
+            if results or not job_ids:
+                return results
+            time.sleep(self.poll_interval)
+
+            # Warn once if jobs wait a whole lease timeout with no worker rendering anything
+            waited = 0.0 if os.listdir(self._path('claimed')) else waited + self.poll_interval
+            if not warned and waited >= self.lease_timeout:
+                print(f"Warning: No worker has claimed a job in {self.spool_dir} for {waited:.0f}s; "
+                      f"start workers with: python -m qreporting worker {self.spool_dir}")
+                warned = True
+
+    def remove_job(self, job_id: str) -> None:
+        """
+        Remove a job with its tickets and result.
+
+        Args:
+            job_id (str): The job id
+        """
+        _remove(self._path('pending', job_id))
+        _remove(self._path('claimed', job_id))
+        _remove(self._path('done', f"{job_id}.json"))
+        shutil.rmtree(self._path('jobs', job_id), ignore_errors=True)
+        self._attempts.pop(job_id, None)
+
+    def remove_build(self, build_id: str) -> None:
+        """
+        Remove all jobs of a build, e.g. after it failed or was interrupted.
+
+        Args:
+            build_id (str): The build id
+        """
+        for name in ('pending', 'claimed', 'done', 'jobs'):
+            for entry in os.listdir(self._path(name)):
+                if entry.startswith(f"{build_id}-"):
+                    self.remove_job(entry.split('.')[0])
+
+    #--------------------------------------------------------------------------
+    # Worker
+    #--------------------------------------------------------------------------
+
+    def claim(self) -> Optional[str]:
+        """
+        Claim the oldest pending job.
+
+        Returns:
+            Optional[str]: The job id, or None if no job is pending
+        """
+        for job_id in sorted(os.listdir(self._path('pending'))):
+            if job_id.startswith('.'):
+                continue
+            try:
+                # Only one worker can rename the ticket
+                os.rename(self._path('pending', job_id), self._path('claimed', job_id))
+            except FileNotFoundError:
+                continue
+            os.utime(self._path('claimed', job_id))
+            return job_id
+        return None
+
+    def read_spec(self, job_id: str) -> Dict[str, Any]:
+        """
+        Read the arguments of a claimed job.
+
+        Args:
+            job_id (str): The job id
+
+        Returns:
+            Dict[str, Any]: The job spec, with the content path added as 'content_path'
+        """
+        with open(self._path('jobs', job_id, SPEC_FILE), 'r', encoding='utf-8') as f:
+            spec = json.load(f)
+        spec['content_path'] = self._path('jobs', job_id, CONTENT_FILE)
+        return spec
+
+    @contextlib.contextmanager
+    def lease(self, job_id: str, lease_timeout: float) -> Iterator[None]:
+        """
+        Keep the lease on a claimed job while it is rendered.
+
+        Args:
+            job_id (str): The job id
+            lease_timeout (float): Lease timeout of the job's coordinator
+        """
+        stop = threading.Event()
+
+        def heartbeat() -> None:
+            while not stop.wait(lease_timeout / HEARTBEATS_PER_LEASE):
+                with contextlib.suppress(FileNotFoundError):
+                    os.utime(self._path('claimed', job_id))
+
+        thread = threading.Thread(target=heartbeat, name=f"lease-{job_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def complete(
+        self,
+        job_id: str,
+        html_content: str,
+        error: Optional[str],
+        events: List[TraceEvent],
+        stats: Optional[Dict[str, Any]] = None
+    ) -> bool:
+        """
+        Hand the result of a job back to its coordinator.
+
+        Args:
+            job_id (str): The job id
+            html_content (str): The rendered page
+            error (str, optional): Error message if the page failed to render
+            events (List[TraceEvent]): Trace events recorded while rendering
+            stats (Dict[str, Any], optional): The "seconds" the page took and whether it
+                                              "timed_out" (see _process_report_job)
+
+        Returns:
+            bool: False if the job was withdrawn in the meantime and the result dropped
+        """
+        job_dir = self._path('jobs', job_id)
+        if not os.path.isdir(job_dir):
+            _remove(self._path('claimed', job_id))
+            return False
+        write_atomic(os.path.join(job_dir, PAGE_FILE), html_content)
+        result = {
+            'error': error,
+            'events': [dataclasses.asdict(event) for event in events],
+            'stats': stats or {}
+        }
+        write_atomic(self._path('done', f"{job_id}.json"), json.dumps(result, default=str))
+        _remove(self._path('claimed', job_id))
+        return True
+
+#------------------------------------------------------------------------------
+# WORKER
+#------------------------------------------------------------------------------
+
+def run_worker(
+    spool_dir: str,
+    engine: str = "papermill",
+    engine_options: Optional[Dict[str, Any]] = None,
+    idle_timeout: Optional[float] = None,
+    max_jobs: Optional[int] = None,
+    poll_interval: float = DEFAULT_POLL_INTERVAL
+) -> int:
+    """
+    Render jobs from a spool directory until stopped.
+
+    Args:
+        spool_dir (str): The spool directory
+        engine (str): Notebook execution engine - "papermill" or "kernel" (see generate_report)
+        engine_options (Dict[str, Any], optional): Options for the "kernel" engine
+        idle_timeout (float, optional): Exit after this many seconds without a job; run until
+                                        interrupted if None
+        max_jobs (int, optional): Exit after rendering this many jobs
+        poll_interval (float): Seconds between checks for new jobs
+
+    Returns:
+        int: Number of jobs rendered
+    """
+    if __package__:
+        from . import core
+    else:  # Imported as a plain module, e.g. by example.py
+        import core
+
+    if engine not in core.ENGINES:
+        raise ValueError(f"Unknown engine {engine!r}, expected one of {core.ENGINES}")
+    spool = Spool(spool_dir, poll_interval=poll_interval)
+    engine_template = None
+    jobs_done = 0
+    idle_since = time.monotonic()
+
+    try:
+        while max_jobs is None or jobs_done < max_jobs:
+            job_id = spool.claim()
+            if job_id is None:
+                if idle_timeout is not None and time.monotonic() - idle_since >= idle_timeout:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            try:
+                spec = spool.read_spec(job_id)
+            except FileNotFoundError:
+                # Withdrawn by its coordinator
+                spool.complete(job_id, "", None, [])
+                continue
+
+            # A warm kernel runs the setup cells of one template; restart it for another one
+            if engine == "kernel" and spec['notebook_template'] != engine_template:
+                if core._worker_engine is not None:
+                    core._worker_engine.shutdown()
+                core._init_report_worker(engine, spec['notebook_template'], engine_options or {})
+                engine_template = spec['notebook_template']
+
+            temp_dir = tempfile.mkdtemp(prefix='qreporting-')
+            try:
+                with spool.lease(job_id, spec['lease_timeout']):
+                    # Only the kernel's timeout applies: nothing would restart a worker the watchdog killed
+                    html_content, error, events, stats = core._process_report_job(
+                        spec['content_path'],
+                        spec['report_name'],
+                        temp_dir,
+                        spec['notebook_template'],
+                        spec['renderer'],
+                        spec['trace'],
+                        spec['lazy'],
+                        spec['handoff'],
+                        spec.get('timeout'),
+                        spec.get('memory_mb'),
+                        watchdog=False
+                    )
+                spool.complete(job_id, html_content, error, events, stats)
+            finally:
+                shutil.rmtree(temp_dir, ignore_errors=True)
+            jobs_done += 1
+            idle_since = time.monotonic()
+    finally:
+        if core._worker_engine is not None:
+            core._worker_engine.shutdown()
+            core._worker_engine = None
+    return jobs_done
@@ -0,0 +1,504 @@
+#!/usr/bin/env python
+"""
+Large Tables
+
+This module replaces DataFrames and Series above a row threshold with a virtual-scrolling
+table widget. The data is written next to the page as chunked, columnar JSON under
+`<output_dir>/tables/<table id>/`, one file per chunk, and the widget loads only the chunks
+in view. Sorting and filtering load the remaining chunks on demand.
+
+Chunks are wrapped in a function call and loaded with `<script src>` tags, since `fetch`
+cannot read files when a report is opened from a file:// URL.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import html
+import json
+import os
+import re
+import shutil
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from IPython.display import HTML
+
+if __package__:
+    from .assets import write_asset
+    from .lazy import LazyLeaf, is_lazy
+else:  # Imported as a plain module, e.g. by example.py
+    from assets import write_asset
+    from lazy import LazyLeaf, is_lazy
+
+# Directory, relative to the output directory, holding the table chunks
+TABLES_DIR = "tables"
+TABLE_CHUNK_ROWS = 10000
+CHUNK_FILE_DIGITS = 5
+
+# Widget script, written once per output directory as a shared asset
+TABLE_SCRIPT = r"""
+(function () {
+    if (window.qrTables) {
+        return;
+    }
+    var ROW_HEIGHT = 28;
+    var VISIBLE_ROWS = 20;
+    var OVERSCAN = 10;
+    var tables = {};
+
+    var style = document.createElement('style');
+    style.textContent = [
+        '.qr-table { font-size: 12px; margin: 0.5em 0; }',
+        '.qr-table-toolbar { display: flex; gap: 1em; align-items: center; margin-bottom: 4px; }',
+        '.qr-table-toolbar input { padding: 2px 6px; }',
+        '.qr-table-viewport { overflow: auto; border: 1px solid #ddd; }',
+        '.qr-table table { border-collapse: collapse; }',
+        '.qr-table th, .qr-table td { height: ' + ROW_HEIGHT + 'px; box-sizing: border-box; padding: 0 8px;' +
+            ' white-space: nowrap; overflow: hidden; text-overflow: ellipsis; max-width: 320px; text-align: right; }',
+        '.qr-table thead th { position: sticky; top: 0; background: #f5f5f5; cursor: pointer; user-select: none; }',
+        '.qr-table tbody tr:nth-child(even) { background: #fafafa; }',
+        '.qr-table tbody th { font-weight: bold; }',
+        '.qr-table .qr-table-spacer td { padding: 0; border: 0; }'
+    ].join('\n');
+    document.head.appendChild(style);
+
+    function escapeHtml(text) {
+        return text.replace(/[&<>"]/g, function (c) {
+            return {'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'}[c];
+        });
+    }
+
+    function formatValue(value) {
+        if (value === null || value === undefined) {
+            return '';
+        }
+        if (typeof value === 'number' && !Number.isInteger(value)) {
+            return value.toLocaleString(undefined, {maximumFractionDigits: 6});
+        }
+        return String(value);
+    }
+
+    function compareValues(a, b, numeric) {
+        if (numeric) {
+            return a - b;
+        }
+        a = String(a);
+        b = String(b);
+        return a < b ? -1 : (a > b ? 1 : 0);
+    }
+
+    function Table(element) {
+        this.element = element;
+        this.meta = JSON.parse(element.getAttribute('data-table'));
+        this.chunks = {};
+        this.requested = {};
+        this.loaded = 0;
+        this.order = null;       // Row positions after filtering and sorting, null for all rows
+        this.sortColumn = null;
+        this.sortDescending = false;
+        this.filter = '';
+        this.onAllLoaded = null;
+        this.build();
+    }
+
+    Table.prototype.build = function () {
+        var self = this, meta = this.meta;
+        var header = meta.columns.map(function (name, column) {
+            return '<th data-column="' + column + '" title="' + escapeHtml(name) + '">' + escapeHtml(name) + '</th>';
+        }).join('');
+        this.element.innerHTML =
+            '<div class="qr-table-toolbar"><input type="search" placeholder="Filter rows">' +
+            '<span class="qr-table-status"></span></div>' +
+            '<div class="qr-table-viewport"><table><thead><tr>' + header + '</tr></thead><tbody></tbody></table></div>';
+
+        this.status = this.element.querySelector('.qr-table-status');
+        this.viewport = this.element.querySelector('.qr-table-viewport');
+        this.viewport.style.height = (Math.min(meta.rows, VISIBLE_ROWS) + 1) * ROW_HEIGHT + 2 + 'px';
+        this.body = this.element.querySelector('tbody');
+        this.headers = this.element.querySelectorAll('thead th');
+
+        this.viewport.addEventListener('scroll', function () { self.scheduleRender(); });
+        Array.prototype.forEach.call(this.headers, function (th) {
+            th.addEventListener('click', function () { self.sortBy(Number(th.getAttribute('data-column'))); });
+        });
+        var timer = null;
+        this.element.querySelector('input').addEventListener('input', function (event) {
+            clearTimeout(timer);
+            timer = setTimeout(function () { self.filterBy(event.target.value); }, 200);
+        });
+
+        this.updateStatus();
+        this.render();
+    };
+
+    Table.prototype.rowCount = function () {
+        return this.order ? this.order.length : this.meta.rows;
+    };
+
+    Table.prototype.value = function (row, column) {
+        var chunk = this.chunks[Math.floor(row / this.meta.chunk_rows)];
+        return chunk ? chunk[column][row % this.meta.chunk_rows] : undefined;
+    };
+
+    Table.prototype.load = function (chunk) {
+        if (this.requested[chunk]) {
+            return;
+        }
+        var self = this;
+        this.requested[chunk] = true;
+        var script = document.createElement('script');
+        var name = String(chunk);
+        while (name.length < this.meta.digits) {
+            name = '0' + name;
+        }
+        script.src = this.meta.path + '/' + name + '.js';
+        script.onerror = function () { self.status.textContent = 'Failed to load ' + script.src; };
+        document.head.appendChild(script);
+    };
+
+    Table.prototype.receive = function (chunk, columns) {
+        if (!this.chunks[chunk]) {
+            this.chunks[chunk] = columns;
+            this.loaded += 1;
+        }
+        if (this.onAllLoaded) {
+            this.updateStatus();
+            if (this.loaded === this.meta.chunks) {
+                var callback = this.onAllLoaded;
+                this.onAllLoaded = null;
+                callback();
+            }
+        } else {
+            this.scheduleRender();
+        }
+    };
+
+    Table.prototype.whenAllLoaded = function (callback) {
+        if (this.loaded === this.meta.chunks) {
+            callback();
+            return;
+        }
+        this.onAllLoaded = callback;
+        this.updateStatus();
+        for (var chunk = 0; chunk < this.meta.chunks; chunk++) {
+            this.load(chunk);
+        }
+    };
+
+    Table.prototype.updateStatus = function () {
+        var meta = this.meta, text;
+        if (this.onAllLoaded) {
+            text = 'Loading rows... ' + this.loaded + '/' + meta.chunks;
+        } else if (this.order) {
+            text = this.order.length.toLocaleString() + ' of ' + meta.rows.toLocaleString() + ' rows';
+        } else {
+            text = meta.rows.toLocaleString() + ' rows';
+        }
+        this.status.textContent = text + ' × ' + (meta.columns.length - 1) + ' columns';
+    };
+
+    Table.prototype.sortBy = function (column) {
+        if (this.sortColumn === column) {
+            this.sortDescending = !this.sortDescending;
+        } else {
+            this.sortColumn = column;
+            this.sortDescending = false;
+        }
+        var self = this;
+        this.whenAllLoaded(function () { self.applyView(); });
+    };
+
+    Table.prototype.filterBy = function (text) {
+        this.filter = text.trim().toLowerCase();
+        var self = this;
+        this.whenAllLoaded(function () { self.applyView(); });
+    };
+
+    Table.prototype.applyView = function () {
+        var self = this, meta = this.meta, filter = this.filter, order = [];
+        var row, column;
+        for (row = 0; row < meta.rows; row++) {
+            if (!filter) {
+                order.push(row);
+                continue;
+            }
+            for (column = 0; column < meta.columns.length; column++) {
+                if (formatValue(this.value(row, column)).toLowerCase().indexOf(filter) >= 0) {
+                    order.push(row);
+                    break;
+                }
+            }
+        }
+
+        if (this.sortColumn !== null) {
+            var sortColumn = this.sortColumn, numeric = meta.numeric[sortColumn];
+            var direction = this.sortDescending ? -1 : 1;
+            order.sort(function (a, b) {
+                var x = self.value(a, sortColumn), y = self.value(b, sortColumn);
+                // Missing values last in both directions
+                if (x === null || y === null) {
+                    return (x === null) - (y === null);
+                }
+                return direction * compareValues(x, y, numeric);
+            });
+        }
+
+        this.order = (filter || this.sortColumn !== null) ? order : null;
+        Array.prototype.forEach.call(this.headers, function (th, column) {
+            var name = meta.columns[column];
+            if (column === self.sortColumn) {
+                name += self.sortDescending ? ' ▼' : ' ▲';
+            }
+            th.textContent = name;
+        });
+        this.updateStatus();
+        this.viewport.scrollTop = 0;
+        this.render();
+    };
+
+    Table.prototype.scheduleRender = function () {
+        var self = this;
+        if (!this.pending) {
+            this.pending = true;
+            window.requestAnimationFrame(function () {
+                self.pending = false;
+                self.render();
+            });
+        }
+    };
+
+    Table.prototype.render = function () {
+        var meta = this.meta, count = this.rowCount();
+        var height = this.viewport.clientHeight || VISIBLE_ROWS * ROW_HEIGHT;
+        var first = Math.max(0, Math.floor(this.viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+        var last = Math.min(count, Math.ceil((this.viewport.scrollTop + height) / ROW_HEIGHT) + OVERSCAN);
+
+        var rows = [];
+        if (first > 0) {
+            rows.push('<tr class="qr-table-spacer"><td style="height:' + first * ROW_HEIGHT + 'px"></td></tr>');
+        }
+        for (var position = first; position < last; position++) {
+            var row = this.order ? this.order[position] : position;
+            var chunk = Math.floor(row / meta.chunk_rows);
+            if (!this.chunks[chunk]) {
+                this.load(chunk);
+            }
+            var cells = [];
+            for (var column = 0; column < meta.columns.length; column++) {
+                var value = this.chunks[chunk] ? escapeHtml(formatValue(this.value(row, column))) : '…';
+                cells.push(column === 0 ? '<th>' + value + '</th>' : '<td>' + value + '</td>');
+            }
+            rows.push('<tr>' + cells.join('') + '</tr>');
+        }
+        if (last < count) {
+            rows.push('<tr class="qr-table-spacer"><td style="height:' + (count - last) * ROW_HEIGHT + 'px"></td></tr>');
+        }
+        this.body.innerHTML = rows.join('');
+    };
+
+    window.qrTables = {
+        mount: function (id) {
+            var element = document.getElementById(id);
+            if (element && !tables[id]) {
+                tables[id] = new Table(element);
+            }
+        },
+        chunk: function (id, chunk, columns) {
+            var table = tables['qr-table-' + id];
+            if (table) {
+                table.receive(chunk, columns);
+            }
+        }
+    };
+})();
+"""
+
+#------------------------------------------------------------------------------
+# HELPER FUNCTIONS
+#------------------------------------------------------------------------------
+
+def is_large_table(data: Any, max_rows: int) -> bool:
+    """
+    Check whether data is shown as a virtual-scrolling table.
+
+    Args:
+        data (Any): Any value inside the report content
+        max_rows (int): Largest number of rows rendered as a plain HTML table
+
+    Returns:
+        bool: True for DataFrames and Series with more than max_rows rows
+    """
+    import pandas as pd
+
+    return isinstance(data, (pd.DataFrame, pd.Series)) and len(data) > max_rows
+
+def _label(value: Any) -> str:
+    """Get the display label of a column or index name, joining MultiIndex tuples."""
+    if isinstance(value, tuple):
+        return ', '.join(str(part) for part in value)
+    return '' if value is None else str(value)
+
+def _values_json(values: 'pd.Series') -> str:
+    """Serialize the values of one column as a JSON array."""
+    return values.to_json(orient='values', date_format='iso', default_handler=str)
+
+def write_table_chunks(frame: 'pd.DataFrame', table_dir: str, chunk_rows: int = TABLE_CHUNK_ROWS) -> int:
+    """
+    Write a DataFrame as chunked, columnar JSON script files.
+
+    Each chunk file calls `qrTables.chunk(id, chunk, columns)`, where columns holds one array
+    per column with the index first. Only one chunk is serialized at a time.
+
+    Args:
+        frame (pd.DataFrame): The table
+        table_dir (str): Directory for the chunk files; its name is the table id
+        chunk_rows (int): Rows per chunk
+
+    Returns:
+        int: Number of chunks written
+    """
+    import pandas as pd
+
+    # Remove chunks left by an earlier build of a longer table
+    shutil.rmtree(table_dir, ignore_errors=True)
+    os.makedirs(table_dir)
+    table_id = json.dumps(os.path.basename(table_dir))
+
+    index = frame.index
+    if isinstance(index, pd.MultiIndex):
+        index = index.to_flat_index().map(_label)
+
+    chunk_count = max(1, -(-len(frame) // chunk_rows))
+    for chunk in range(chunk_count):
+        start, stop = chunk * chunk_rows, (chunk + 1) * chunk_rows
+        columns = [_values_json(pd.Series(index[start:stop]))]
+        columns.extend(_values_json(frame.iloc[start:stop, position]) for position in range(frame.shape[1]))
+        path = os.path.join(table_dir, f"{chunk:0{CHUNK_FILE_DIGITS}d}.js")
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"qrTables.chunk({table_id},{chunk},[{','.join(columns)}]);\n")
+    return chunk_count
+
+def large_table_html(
+    frame: 'pd.DataFrame',
+    output_dir: str,
+    table_id: str,
+    chunk_rows: int = TABLE_CHUNK_ROWS,
+    assets_dir: Optional[str] = None
+) -> 'HTML':
+    """
+    Write a large table's chunks and build the widget that shows it.
+
+    Args:
+        frame (pd.DataFrame): The table
+        output_dir (str): Report output directory the page is written to
+        table_id (str): Identifier of the table, unique within the output directory
+        chunk_rows (int): Rows per chunk
+        assets_dir (str, optional): Directory for the table script, output_dir/assets/ if None
+
+    Returns:
+        HTML: The widget, displayed in place of the table
+    """
+    import pandas as pd
+    from IPython.display import HTML
+
+    chunk_count = write_table_chunks(frame, os.path.join(output_dir, TABLES_DIR, table_id), chunk_rows)
+    script_path = write_asset(output_dir, TABLE_SCRIPT, 'js', assets_dir=assets_dir)
+
+    meta: Dict[str, Any] = {
+        'path': f"{TABLES_DIR}/{table_id}",
+        'rows': len(frame),
+        'chunk_rows': chunk_rows,
+        'chunks': chunk_count,
+        'digits': CHUNK_FILE_DIGITS,
+        'columns': [_label(frame.index.name)] + [_label(name) for name in frame.columns],
+        'numeric': [pd.api.types.is_numeric_dtype(frame.index)] + [
+            pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype)
+            for dtype in frame.dtypes
+        ]
+    }
+    element_id = f"qr-table-{table_id}"
+    return HTML(
+        f'<div class="qr-table" id="{html.escape(element_id)}" data-table="{html.escape(json.dumps(meta))}"></div>\n'
+        f'<script src="{html.escape(script_path)}"></script>\n'
+        f'<script>qrTables.mount({json.dumps(element_id)});</script>'
+    )
+
+#------------------------------------------------------------------------------
+# CONTENT PROCESSING FUNCTIONS
+#------------------------------------------------------------------------------
+
+def replace_large_tables(
+    data: Any,
+    output_dir: str,
+    page_name: str,
+    max_rows: int,
+    chunk_rows: int = TABLE_CHUNK_ROWS,
+    assets_dir: Optional[str] = None,
+    _tables: Optional[List[int]] = None
+) -> Any:
+    """
+    Replace the large DataFrames and Series in report content with table widgets.
+
+    Walks dicts and lists like `display_data` in the notebook template. The content passed
+    in is not modified; containers holding a large table are copied. A lazy leaf is
+    replaced by one that replaces the tables once it is resolved.
+
+    Args:
+        data (Any): The report content
+        output_dir (str): Report output directory the page is written to
+        page_name (str): File name of the page without extension, used in the table ids
+        max_rows (int): Largest number of rows rendered as a plain HTML table
+        chunk_rows (int): Rows per chunk
+        assets_dir (str, optional): Directory for the table script, output_dir/assets/ if None
+
+    Returns:
+        Any: The content, with table widgets in place of the large tables
+    """
+    if _tables is None and is_lazy(data):
+        leaf = data if isinstance(data, LazyLeaf) else LazyLeaf(data)
+        return leaf.map(replace_large_tables, output_dir, page_name, max_rows, chunk_rows, assets_dir)
+
+    tables = [0] if _tables is None else _tables
+
+    if isinstance(data, dict):
+        replaced = {
+            key: replace_large_tables(value, output_dir, page_name, max_rows, chunk_rows, assets_dir, tables)
+            for key, value in data.items()
+        }
+        changed = any(replaced[key] is not value for key, value in data.items())
+        return replaced if changed else data
+    elif isinstance(data, list):
+        replaced = [replace_large_tables(item, output_dir, page_name, max_rows, chunk_rows, assets_dir, tables) for item in data]
+        changed = any(new is not old for new, old in zip(replaced, data))
+        return replaced if changed else data
+    elif is_large_table(data, max_rows):
+        frame = data.to_frame() if data.ndim == 1 else data
+        table_id = f"{page_name}-{tables[0]}"
+        tables[0] += 1
+        return large_table_html(frame, output_dir, table_id, chunk_rows, assets_dir)
+    return data
+
+def remove_page_tables(output_dir: str, page_name: str) -> int:
+    """
+    Remove the table chunks written for a page.
+
+    Args:
+        output_dir (str): Report output directory
+        page_name (str): File name of the page without extension
+
+    Returns:
+        int: Number of tables removed
+    """
+    tables_dir = os.path.join(output_dir, TABLES_DIR)
+    if not os.path.isdir(tables_dir):
+        return 0
+    pattern = re.compile(re.escape(page_name) + r'-\d+')
+    removed = 0
+    for table_id in os.listdir(tables_dir):
+        if pattern.fullmatch(table_id):
+            shutil.rmtree(os.path.join(tables_dir, table_id), ignore_errors=True)
+            removed += 1
+    return removed
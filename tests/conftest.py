@@ -0,0 +1,8 @@
+"""
+Test configuration: the package modules are imported as plain modules, like example.py does.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
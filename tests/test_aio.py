@@ -0,0 +1,45 @@
+"""
+Tests of the asyncio API.
+"""
+
+import asyncio
+import os
+
+from aio import generate_report_async, generate_simple_report_async
+from core import generate_report
+
+REPORT = {
+    "Overview": "Summary of the **quarter**",
+    "Details": "Numbers by region"
+}
+
+def read_index(output_dir: str) -> str:
+    with open(os.path.join(output_dir, "index.html"), 'r', encoding='utf-8') as f:
+        return f.read()
+
+def test_async_index_matches_generate_report(tmp_path):
+    sync_dir = str(tmp_path / "sync")
+    async_dir = str(tmp_path / "async")
+    generate_report(REPORT, sync_dir, renderer="native")
+    asyncio.run(generate_report_async(REPORT, async_dir, renderer="native"))
+
+    sync_index = read_index(sync_dir)
+    async_index = read_index(async_dir)
+    # Both embed the Table of Contents as the initial page
+    assert "Overview" in async_index and "Details" in async_index
+    assert len(async_index) == len(sync_index)
+    assert async_index == sync_index
+
+def test_builds_sharing_a_semaphore_render_on_their_own_kernels(tmp_path):
+    async def build_both():
+        semaphore = asyncio.Semaphore(2)
+        return await asyncio.gather(
+            generate_report_async(REPORT, str(tmp_path / "first"), concurrency=semaphore),
+            generate_simple_report_async("Standalone **page**", "Notes", str(tmp_path / "second"), concurrency=semaphore)
+        )
+
+    summary, page_path = asyncio.run(build_both())
+    assert summary.failures == {}
+    assert sorted(summary.pages) == ["Details", "Overview", "Table of Contents"]
+    with open(page_path, 'r', encoding='utf-8') as f:
+        assert "<strong>page</strong>" in f.read()
@@ -0,0 +1,56 @@
+"""
+Tests of shared and image assets.
+"""
+
+import base64
+import os
+import stat
+
+from assets import ASSETS_DIR, extract_image_assets, extract_shared_assets
+
+def build_page(body: str) -> str:
+    return (
+        "<html><head><title>Page</title>\n"
+        "<style type=\"text/css\">body { margin: 0; }</style>\n"
+        "<style>.cell { padding: 4px; }</style>\n"
+        "<style media=\"print\">.cell { padding: 0; }</style>\n"
+        "<script>var theme = 'light';</script>\n"
+        "</head><body>" + body + "</body></html>"
+    )
+
+def test_head_styles_and_scripts_are_shared_between_pages(tmp_path):
+    output_dir = str(tmp_path)
+    first = extract_shared_assets(build_page("<style>td { color: red; }</style>One"), output_dir)
+    second = extract_shared_assets(build_page("Two"), output_dir)
+
+    assets = sorted(os.listdir(os.path.join(output_dir, ASSETS_DIR)), key=lambda name: name.rsplit('.', 1)[1])
+    assert [name.rsplit('.', 1)[1] for name in assets] == ["css", "js"]
+    for name in assets:
+        assert f"{ASSETS_DIR}/{name}" in first and f"{ASSETS_DIR}/{name}" in second
+        assert stat.S_IMODE(os.stat(os.path.join(output_dir, ASSETS_DIR, name)).st_mode) == 0o644
+    with open(os.path.join(output_dir, ASSETS_DIR, assets[0]), 'r', encoding='utf-8') as f:
+        assert f.read() == "body { margin: 0; }\n.cell { padding: 4px; }"
+
+    # Styles with other attributes and the body are left in place
+    assert '<style media="print">' in first
+    assert "<style>td { color: red; }</style>One" in first
+    assert "var theme" not in first
+
+def test_embedded_images_are_written_once_and_loaded_lazily(tmp_path):
+    output_dir = str(tmp_path)
+    image = base64.b64encode(b"\x89PNG\r\n\x1a\nfake image data").decode('ascii')
+    page = (
+        f'<img src="data:image/png;base64,{image}" alt="Chart">'
+        f'<img loading="eager" src="data:image/png;base64,{image[:20]}\n{image[20:]}">'
+        f'<img src="data:image/tiff;base64,{image}">'
+    )
+
+    replaced = extract_image_assets(page, output_dir)
+
+    [name] = os.listdir(os.path.join(output_dir, ASSETS_DIR))
+    assert name.startswith("img-") and name.endswith(".png")
+    assert replaced.count(f'src="{ASSETS_DIR}/{name}"') == 2
+    assert f'<img src="{ASSETS_DIR}/{name}" loading="lazy" alt="Chart">' in replaced
+    assert replaced.count('loading=') == 2
+    # Unknown image types stay embedded
+    assert "data:image/tiff" in replaced
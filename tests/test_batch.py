@@ -0,0 +1,45 @@
+"""
+Tests of batch report generation.
+"""
+
+import os
+
+from core import generate_reports_batch
+
+def client_report(client: str) -> dict:
+    return {
+        "Overview": f"Summary for **{client}**",
+        "Details": "Numbers by region"
+    }
+
+def test_batch_builds_every_report_with_shared_assets(tmp_path):
+    assets_dir = str(tmp_path / "assets")
+    clients = ["alpha", "beta", "gamma"]
+    jobs = (
+        {"data_dict": client_report(client), "output_dir": str(tmp_path / client), "report_title": client}
+        for client in clients
+    )
+    summaries = generate_reports_batch(jobs, assets_dir=assets_dir, renderer="native")
+
+    assert list(summaries) == [str(tmp_path / client) for client in clients]
+    for client in clients:
+        summary = summaries[str(tmp_path / client)]
+        assert summary.error is None
+        assert summary.failures == {}
+        assert os.path.exists(os.path.join(tmp_path, client, "index.html"))
+        # Common styles and scripts live in the shared directory, not in each report
+        assert not os.path.isdir(os.path.join(tmp_path, client, "assets"))
+    assert os.listdir(assets_dir)
+
+def test_failed_build_does_not_stop_the_batch(tmp_path, capsys):
+    jobs = [
+        ({"Overview": "Fine"}, str(tmp_path / "good")),
+        ({"Index": "Overwrites the index page"}, str(tmp_path / "bad")),
+        ({"Overview": "Also fine"}, str(tmp_path / "later"))
+    ]
+    summaries = generate_reports_batch(jobs, renderer="native")
+
+    assert summaries[str(tmp_path / "good")].error is None
+    assert summaries[str(tmp_path / "bad")].error is not None
+    assert summaries[str(tmp_path / "later")].error is None
+    assert "1 of 3 report(s) failed" in capsys.readouterr().out
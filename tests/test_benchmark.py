@@ -0,0 +1,26 @@
+"""
+Tests of the benchmark harness.
+"""
+
+from benchmark import Scenario, build_data_dict, compare_results, run_scenario
+
+def test_synthetic_data_has_the_scenario_shape():
+    scenario = Scenario("tiny", breadth=2, levels=3, leaf="mixed", rows=50)
+    data = build_data_dict(scenario)
+
+    assert list(data) == ["Section 0", "Section 1"]
+    assert list(data["Section 1"]["Item 2.0"]) == ["Item 3.0", "Item 3.1"]
+    # The same seed builds the same data
+    again = build_data_dict(scenario)
+    assert again["Section 0"]["Item 2.0"]["Item 3.0"].equals(data["Section 0"]["Item 2.0"]["Item 3.0"])
+
+def test_run_scenario_measures_the_build():
+    result = run_scenario(Scenario("tiny", breadth=2, levels=2, leaf="string"))
+
+    # Four leaves on two submenus, and the Table of Contents
+    assert result['pages'] == 5 and result['failures'] == 0
+    assert result['timings']['total'] > 0 and result['output_bytes'] > 0
+
+    baseline = {'environment': {'commit': 'abc123'}, 'results': [dict(result, scenario={'name': 'tiny'})]}
+    current = {'results': [dict(result, scenario={'name': 'tiny'})]}
+    assert compare_results(baseline, current)[1].startswith("tiny             time x1.00")
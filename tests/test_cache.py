@@ -0,0 +1,72 @@
+"""
+Tests of the render cache.
+"""
+
+import asyncio
+import os
+import time
+
+import pandas as pd
+
+from aio import generate_report_async
+from cache import RenderCache
+from core import NOTEBOOK_TEMPLATE_PATH, generate_report
+from lazy import LazyLeaf
+
+def test_key_changes_with_content_title_renderer_handoff_and_pandas(tmp_path, monkeypatch):
+    cache = RenderCache(str(tmp_path))
+    frame = pd.DataFrame({"revenue": [120, 80]})
+    key = cache.key(frame, "Sales", NOTEBOOK_TEMPLATE_PATH)
+
+    assert key == cache.key(frame.copy(), "Sales", NOTEBOOK_TEMPLATE_PATH)
+    assert key != cache.key(frame.assign(revenue=[121, 80]), "Sales", NOTEBOOK_TEMPLATE_PATH)
+    assert key != cache.key(frame, "Revenue", NOTEBOOK_TEMPLATE_PATH)
+    assert key != cache.key(frame, "Sales", NOTEBOOK_TEMPLATE_PATH, renderer="native")
+    assert key != cache.key(frame, "Sales", NOTEBOOK_TEMPLATE_PATH, handoff="arrow")
+    # Pages are rendered with pandas, so an upgrade renders them again
+    monkeypatch.setattr(pd, "__version__", "0.0.0")
+    assert key != cache.key(frame, "Sales", NOTEBOOK_TEMPLATE_PATH)
+    monkeypatch.undo()
+    # Lazy leaves are keyed by their key, and not cached without one
+    assert cache.key(LazyLeaf(list, key="v1"), "Sales", NOTEBOOK_TEMPLATE_PATH) is not None
+    assert cache.key(LazyLeaf(list), "Sales", NOTEBOOK_TEMPLATE_PATH) is None
+
+def test_evict_removes_old_then_least_recently_used_entries(tmp_path):
+    cache = RenderCache(str(tmp_path), max_size_mb=2.5 / 1024, max_age_days=1)
+    page = "x" * 1024
+    now = time.time()
+    for number, age in enumerate([3 * 86400, 300, 200, 100]):
+        key = f"{number:02d}" * 32
+        cache.put(key, page)
+        os.utime(cache._path(key), (now - age, now - age))
+    # Reading an entry makes it the most recently used
+    assert cache.get("01" * 32) == page
+
+    assert cache.evict() == 2
+    assert cache.get("00" * 32) is None and cache.get("02" * 32) is None
+    assert cache.get("01" * 32) == page and cache.get("03" * 32) == page
+    assert cache.stats()['evictions'] == 2
+
+def test_unchanged_pages_are_taken_from_the_cache(tmp_path):
+    report = {"Overview": "Summary", "Details": "Numbers by region"}
+    cache = RenderCache(str(tmp_path / "cache"))
+    generate_report(report, str(tmp_path / "first"), renderer="native", cache=cache)
+    summary = generate_report(dict(report, Details="New numbers"), str(tmp_path / "second"), renderer="native", cache=cache)
+
+    # Only Details changed; Overview and the Table of Contents are hits
+    assert summary.cache_stats == {'hits': 2, 'misses': 1, 'evictions': 0}
+
+def test_concurrent_builds_sharing_a_cache_count_their_own_stats(tmp_path):
+    cache = RenderCache(str(tmp_path / "cache"))
+    generate_report({"Overview": "Summary"}, str(tmp_path / "warm"), renderer="native", cache=cache)
+
+    async def build_both():
+        return await asyncio.gather(
+            generate_report_async({"Overview": "Summary"}, str(tmp_path / "cached"), renderer="native", cache=cache),
+            generate_report_async({"Details": "New"}, str(tmp_path / "new"), renderer="native", cache=cache)
+        )
+
+    cached, new = asyncio.run(build_both())
+    assert cached.cache_stats == {'hits': 2, 'misses': 0, 'evictions': 0}
+    assert new.cache_stats == {'hits': 0, 'misses': 2, 'evictions': 0}
+    assert cache.stats() == {'hits': 2, 'misses': 4, 'evictions': 0}
@@ -0,0 +1,35 @@
+"""
+Tests of the warm-kernel engine.
+"""
+
+import pytest
+
+from core import NOTEBOOK_TEMPLATE_PATH, process_report_content
+from engine import KernelEngine, KernelExecutionError
+
+def test_kernel_is_reused_and_recycled_after_max_reports(tmp_path):
+    errors = {}
+    with KernelEngine(NOTEBOOK_TEMPLATE_PATH, max_reports=2) as engine:
+        assert engine.setup_cells and engine.report_cells
+        pages = [
+            process_report_content(f"Sales of region {number}", f"Region {number}", str(tmp_path),
+                                   NOTEBOOK_TEMPLATE_PATH, errors, engine)
+            for number in range(3)
+        ]
+
+    assert errors == {}
+    assert all(f"Sales of region {number}" in page for number, page in enumerate(pages))
+    assert engine.reports_executed == 3
+    assert engine.kernels_started == 2
+
+def test_kernel_keeps_running_after_a_failing_cell(tmp_path):
+    errors = {}
+    with KernelEngine(NOTEBOOK_TEMPLATE_PATH) as engine:
+        engine.ensure_started()
+        with pytest.raises(KernelExecutionError, match="ZeroDivisionError"):
+            engine._run("1 / 0")
+        page = process_report_content("Still fine", "Overview", str(tmp_path), NOTEBOOK_TEMPLATE_PATH, errors, engine)
+
+    assert errors == {}
+    assert "Still fine" in page
+    assert engine.kernels_started == 1
@@ -0,0 +1,22 @@
+"""
+Tests of the in-process HTML export.
+"""
+
+import nbformat
+
+from exporter import export_notebook_html, exporter_fingerprint
+
+def build_notebook() -> 'nbformat.NotebookNode':
+    cell = nbformat.v4.new_code_cell("show_report(report_path)")
+    cell.outputs = [nbformat.v4.new_output('display_data', data={'text/markdown': "### Sales"})]
+    return nbformat.v4.new_notebook(cells=[cell])
+
+def test_export_hides_inputs_and_is_deterministic():
+    first = export_notebook_html(build_notebook(), "Quarterly sales")
+    second = export_notebook_html(build_notebook(), "Quarterly sales")
+
+    assert first == second
+    assert "<title>Quarterly sales</title>" in first
+    assert "Sales" in first
+    assert "show_report" not in first
+    assert exporter_fingerprint()['config']['exclude_input'] is True
@@ -0,0 +1,29 @@
+"""
+Tests of atomic file writes.
+"""
+
+import os
+import stat
+
+import pytest
+
+from files import SERVED_FILE_MODE, write_atomic
+
+def test_write_atomic_replaces_file_with_requested_mode(tmp_path):
+    path = str(tmp_path / "page.js")
+    write_atomic(path, "first")
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    write_atomic(path, "second ✓", SERVED_FILE_MODE)
+    write_atomic(str(tmp_path / "image.png"), b"\x89PNG")
+
+    with open(path, 'r', encoding='utf-8') as f:
+        assert f.read() == "second ✓"
+    assert stat.S_IMODE(os.stat(path).st_mode) == SERVED_FILE_MODE
+    assert sorted(os.listdir(tmp_path)) == ["image.png", "page.js"]
+
+    # A failed write leaves neither a partial file nor a temporary one
+    with pytest.raises(TypeError):
+        write_atomic(path, None)
+    with open(path, 'r', encoding='utf-8') as f:
+        assert f.read() == "second ✓"
+    assert sorted(os.listdir(tmp_path)) == ["image.png", "page.js"]
@@ -0,0 +1,46 @@
+"""
+Tests of the content handoff formats.
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from core import generate_report
+from handoff import FrameStore, dump_content, load_content
+
+def test_arrow_handoff_round_trip(tmp_path):
+    store = FrameStore(str(tmp_path / "frames"))
+    frame = pd.DataFrame({"region": ["North", "South"], "revenue": [120.5, 80.25]}, index=[10, 20])
+    series = pd.Series(np.arange(4), name="units")
+    mixed = pd.DataFrame({("a", "b"): [1]})
+    content = {"Sales": frame, "Again": frame, "Units": [series, "Notes"], "Mixed": mixed}
+
+    dump_content(content, str(tmp_path / "content.pkl"), store)
+    loaded = load_content(str(tmp_path / "content.pkl"))
+
+    pd.testing.assert_frame_equal(loaded["Sales"], frame)
+    pd.testing.assert_series_equal(loaded["Units"][0], series)
+    assert loaded["Units"][1] == "Notes"
+    pd.testing.assert_frame_equal(loaded["Mixed"], mixed)
+    # A frame referenced twice is written once and stays shared after loading
+    assert loaded["Again"] is loaded["Sales"]
+    assert len(os.listdir(store.store_dir)) == 2
+
+def test_dill_handoff_round_trip(tmp_path):
+    content = {"Sales": pd.DataFrame({"revenue": [1, 2]}), "Scale": lambda value: value * 2}
+    dump_content(content, str(tmp_path / "content.pkl"))
+    loaded = load_content(str(tmp_path / "content.pkl"))
+
+    pd.testing.assert_frame_equal(loaded["Sales"], content["Sales"])
+    assert loaded["Scale"](3) == 6
+
+def test_notebook_loads_arrow_handoff(tmp_path):
+    frame = pd.DataFrame({"region": ["North", "South"], "revenue": [120, 80]})
+    summary = generate_report({"Sales": frame}, str(tmp_path), handoff="arrow")
+
+    assert summary.failures == {}
+    with open(os.path.join(str(tmp_path), "sales.html"), 'r', encoding='utf-8') as f:
+        page = f.read()
+    assert "North" in page and "120" in page
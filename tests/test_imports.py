@@ -0,0 +1,20 @@
+"""
+Tests of lazy imports.
+"""
+
+import os
+import subprocess
+import sys
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_import_does_not_load_heavy_dependencies():
+    code = (
+        "import sys\n"
+        f"sys.path.insert(0, {PACKAGE_DIR!r})\n"
+        "import core, aio, server\n"
+        "heavy = ('dill', 'pandas', 'jinja2', 'nbformat', 'nbconvert', 'papermill')\n"
+        "print(' '.join(name for name in heavy if name in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ""
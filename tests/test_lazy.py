@@ -0,0 +1,68 @@
+"""
+Tests of lazy leaves.
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from core import generate_report
+from lazy import LazyLeaf, is_lazy, lazy_digest, leaf_file, resolve_leaf
+from source import DirectoryReportSource
+
+def test_leaves_are_resolved_only_when_rendered(tmp_path):
+    calls = []
+
+    def load_sales(region, scale=1):
+        calls.append(region)
+        return f"Sales of {region}: {100 * scale}"
+
+    def notes():
+        yield "First note"
+        yield "Second note"
+
+    report = {"Sales": LazyLeaf(load_sales, "North", scale=2), "Notes": notes, "Overview": "Summary"}
+    assert is_lazy(report["Sales"]) and is_lazy(notes) and not is_lazy(str)
+    assert resolve_leaf(notes) == ["First note", "Second note"]
+
+    summary = generate_report(report, str(tmp_path), renderer="native")
+
+    assert summary.failures == {} and calls == ["North"]
+    with open(os.path.join(str(tmp_path), "sales.html"), 'r', encoding='utf-8') as f:
+        assert "Sales of North: 200" in f.read()
+    with open(os.path.join(str(tmp_path), "notes.html"), 'r', encoding='utf-8') as f:
+        assert "Second note" in f.read()
+
+def test_from_file_is_keyed_by_the_file(tmp_path):
+    path = str(tmp_path / "sales.csv")
+    pd.DataFrame({"revenue": [1, 2]}).to_csv(path, index=False)
+    leaf = LazyLeaf.from_file(path)
+
+    assert leaf_file(leaf) == path
+    assert resolve_leaf(leaf)["revenue"].tolist() == [1, 2]
+    assert lazy_digest(leaf) == lazy_digest(LazyLeaf.from_file(path))
+    pd.DataFrame({"revenue": [1, 2, 3]}).to_csv(path, index=False)
+    assert lazy_digest(leaf) != lazy_digest(LazyLeaf.from_file(path))
+    assert lazy_digest(LazyLeaf(list)) is None
+    with pytest.raises(ValueError, match="No default loader"):
+        LazyLeaf.from_file(str(tmp_path / "sales.xlsx"))
+
+class _Note(str):
+    """Content that is callable with an argument."""
+
+    def __call__(self, region):
+        return f"{self} for {region}"
+
+def test_only_callables_without_required_arguments_are_lazy(tmp_path):
+    assert is_lazy(lambda scale=1: scale) and is_lazy(lambda *args, **kwargs: args)
+    assert not is_lazy(_Note("Notes")) and not is_lazy(lambda region: region)
+    (tmp_path / "source" / "Sales").mkdir(parents=True)
+    # A subdirectory rendered as one page is loaded through its zero-argument __call__
+    assert is_lazy(DirectoryReportSource(str(tmp_path / "source" / "Sales")))
+
+    summary = generate_report({"Notes": _Note("Regional notes")}, str(tmp_path / "report"), renderer="native")
+
+    assert summary.failures == {}
+    with open(os.path.join(str(tmp_path / "report"), "notes.html"), 'r', encoding='utf-8') as f:
+        assert "Regional notes" in f.read()
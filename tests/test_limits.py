@@ -0,0 +1,83 @@
+"""
+Tests of the time and memory limits of leaves.
+"""
+
+import os
+import subprocess
+import sys
+import textwrap
+import time
+
+import limits
+from core import generate_report
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run_python(code: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(code)],
+        cwd=REPO_DIR, capture_output=True, text=True, timeout=60
+    )
+
+def test_watchdog_writes_marker_and_kills_stuck_worker(tmp_path):
+    marker_path = str(tmp_path / limits.TIMEOUT_MARKER)
+    result = run_python(f"""
+        import time
+        import limits
+        limits.KILL_GRACE_SECONDS = 0.1
+        with limits.LeafWatchdog(0.2, {marker_path!r}):
+            time.sleep(30)
+        print("finished")
+    """)
+
+    assert result.returncode == limits.WATCHDOG_EXIT_CODE
+    assert "finished" not in result.stdout
+    with open(marker_path, 'r', encoding='utf-8') as f:
+        assert f.read() == "0.2"
+
+    # A leaf that finishes in time cancels the watchdog
+    result = run_python(f"""
+        import limits
+        with limits.LeafWatchdog(0.2, {str(tmp_path / "unused")!r}):
+            pass
+        print("finished")
+    """)
+    assert result.returncode == 0 and result.stdout.strip() == "finished"
+    assert not os.path.exists(tmp_path / "unused")
+
+def test_memory_limit_raises_memory_error_and_can_be_restored():
+    result = run_python("""
+        import limits
+        limits.set_memory_limit(512)
+        try:
+            bytearray(1024 * 1024 * 1024)
+        except MemoryError:
+            print("limited")
+        limits.set_memory_limit(None)
+        bytearray(1024 * 1024 * 1024)
+        print("restored")
+    """)
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.split() == ["limited", "restored"]
+
+def stuck_leaf():
+    time.sleep(60)
+
+def test_timeouts_breaking_the_pool_do_not_fail_healthy_leaves(tmp_path, monkeypatch):
+    # Pool workers are forked: they see the shorter grace period, and the renderer imported here
+    monkeypatch.setattr(limits, "KILL_GRACE_SECONDS", 0.1)
+    generate_report({"Warm up": "Imports"}, str(tmp_path / "warm"), renderer="native")
+    report = {"Stuck 1": stuck_leaf, "Stuck 2": stuck_leaf, "Healthy": "Rendered **fine**"}
+
+    # Every retry of the stuck leaves breaks the pool while the healthy leaf waits for a worker
+    output_dir = str(tmp_path / "report")
+    summary = generate_report(
+        report, output_dir, renderer="native", workers=2, leaf_timeout=0.5, leaf_retries=limits.MAX_LOST_RESUBMITS
+    )
+
+    assert sorted(summary.timed_out) == ["Stuck 1", "Stuck 2"]
+    assert summary.retries["Stuck 1"] == limits.MAX_LOST_RESUBMITS
+    assert "Healthy" not in summary.failures
+    with open(os.path.join(output_dir, "healthy.html"), 'r', encoding='utf-8') as f:
+        assert "<strong>fine</strong>" in f.read()
@@ -0,0 +1,59 @@
+"""
+Tests of the build manifest and update_report.
+"""
+
+import json
+import os
+
+from core import generate_report, update_report
+from manifest import REMOVE, merge_report
+
+REPORT = {
+    "Overview": "Summary of the **quarter**",
+    "Regions": {"North": "Northern sales", "South": "Southern sales"}
+}
+
+def read_manifest(output_dir: str) -> dict:
+    with open(os.path.join(output_dir, "manifest.json"), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def test_pages_are_hashed_only_with_a_cache(tmp_path):
+    plain_dir = str(tmp_path / "plain")
+    generate_report(REPORT, plain_dir, renderer="native")
+    assert all(page['hash'] is None for page in read_manifest(plain_dir)['pages'].values())
+
+    cached_dir = str(tmp_path / "cached")
+    generate_report(REPORT, cached_dir, renderer="native", cache=str(tmp_path / "cache"))
+    assert all(page['hash'] for page in read_manifest(cached_dir)['pages'].values())
+
+    # A page given again unchanged is skipped only when the first build recorded its hash
+    assert update_report(cached_dir, {"Overview": REPORT["Overview"]}).pages == []
+    assert update_report(plain_dir, {"Overview": REPORT["Overview"]}).pages == ["Overview"]
+
+def test_merge_report_replaces_merges_and_removes_entries():
+    stored = {"Overview": "old", "Regions": {"North": "n", "South": "s"}, 2024: "year"}
+    partial = {"Regions": {"South": REMOVE, "West": "w"}, "2024": "new year", "Archive": {"Old": REMOVE, "Kept": "k"}}
+
+    merged = merge_report(stored, partial)
+
+    assert merged == {"Overview": "old", "Regions": {"North": "n", "West": "w"}, 2024: "new year", "Archive": {"Kept": "k"}}
+    assert stored["Regions"] == {"North": "n", "South": "s"}
+
+def test_update_report_renders_changed_pages_and_removes_deleted_ones(tmp_path):
+    output_dir = str(tmp_path)
+    generate_report(REPORT, output_dir, renderer="native")
+    with open(os.path.join(output_dir, "overview.html"), 'r', encoding='utf-8') as f:
+        overview = f.read()
+
+    summary = update_report(output_dir, {"Regions": {"South": REMOVE, "West": "Western sales"}})
+
+    assert sorted(summary.pages) == ["Regions/West", "Table of Contents"]
+    assert summary.removed == ["Regions/South"]
+    assert not os.path.exists(os.path.join(output_dir, "regions-south.html"))
+    assert os.path.exists(os.path.join(output_dir, "regions-west.html"))
+    with open(os.path.join(output_dir, "overview.html"), 'r', encoding='utf-8') as f:
+        assert f.read() == overview
+    with open(os.path.join(output_dir, "index.html"), 'r', encoding='utf-8') as f:
+        index = f.read()
+    assert "regions-west.html" in index and "regions-south.html" not in index
+    assert list(read_manifest(output_dir)['pages']) == ["Overview", "Regions/North", "Regions/West"]
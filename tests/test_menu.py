@@ -0,0 +1,40 @@
+"""
+Tests of the lazily rendered navigation menu.
+"""
+
+import json
+import os
+
+from core import generate_report
+
+REPORT = {
+    "Overview": "Summary",
+    "Sales": {"Europe": "EU sales", "Asia": "Asian sales"}
+}
+
+def read(path: str) -> str:
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+def menu_scripts(output_dir: str) -> list:
+    return [name for name in os.listdir(os.path.join(output_dir, "assets")) if name.startswith("menu-")]
+
+def test_menu_entries_are_loaded_from_a_script(tmp_path):
+    output_dir = str(tmp_path)
+    generate_report(REPORT, output_dir, renderer="native", lazy_menu=True)
+
+    index = read(os.path.join(output_dir, "index.html"))
+    [script] = menu_scripts(output_dir)
+    assert f'src="assets/{script}"' in index
+    assert "sales-europe.html" not in index
+    menu = json.loads(read(os.path.join(output_dir, "assets", script)).split(" = ", 1)[1].rstrip(";\n"))
+    assert menu['entries'] == [
+        ["Overview", "overview.html"],
+        ["Sales", [["Europe", "sales-europe.html"], ["Asia", "sales-asia.html"]]]
+    ]
+    # The page named in the URL is only loaded if it is in the menu
+    assert "findMenuLink(location.hash.substring(1))" in index
+
+    # A rebuild with another menu replaces the script
+    generate_report(dict(REPORT, Notes="More"), output_dir, renderer="native", lazy_menu=True)
+    assert len(menu_scripts(output_dir)) == 1 and menu_scripts(output_dir) != [script]
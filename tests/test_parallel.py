@@ -0,0 +1,38 @@
+"""
+Tests of rendering pages on a process pool.
+"""
+
+import os
+import threading
+
+from core import generate_report
+
+REPORT = {
+    "Overview": "Summary of the **quarter**",
+    "Regions": {"North": "Northern sales", "South": "Southern sales", "East": "Eastern sales"}
+}
+
+def read_pages(output_dir: str) -> dict:
+    pages = {}
+    for name in sorted(os.listdir(output_dir)):
+        if name.endswith('.html'):
+            with open(os.path.join(output_dir, name), 'r', encoding='utf-8') as f:
+                pages[name] = f.read()
+    return pages
+
+def test_pool_writes_the_same_pages_as_a_serial_build(tmp_path):
+    serial_dir = str(tmp_path / "serial")
+    pool_dir = str(tmp_path / "pool")
+    serial = generate_report(REPORT, serial_dir, renderer="native")
+    pooled = generate_report(REPORT, pool_dir, renderer="native", workers=2)
+
+    assert pooled.failures == {}
+    assert sorted(pooled.pages) == sorted(serial.pages)
+    assert read_pages(pool_dir) == read_pages(serial_dir)
+
+def test_page_that_cannot_be_sent_to_a_worker_is_recorded_as_a_failure(tmp_path):
+    report = {"Overview": "Fine", "Broken": threading.Lock()}
+    summary = generate_report(report, str(tmp_path), renderer="native", workers=2)
+
+    assert list(summary.failures) == ["Broken"]
+    assert "Overview" in summary.pages and "Broken" in summary.pages
@@ -0,0 +1,45 @@
+"""
+Tests of the report plan.
+"""
+
+import pytest
+
+from core import flatten_dict_to_menu, generate_table_of_contents
+from plan import ReportPlan
+
+REPORT = {
+    "Overview": "Summary",
+    "Sales": {"North America": {"Q1": "Jan-Mar", "Q2": "Apr-Jun"}, "Europe": "EU sales"},
+    "Empty": {}
+}
+
+def test_pages_menu_and_depth():
+    plan = ReportPlan.build(REPORT)
+
+    assert [node.path for node in plan.pages] == ["Overview", "Sales/North America", "Sales/Europe"]
+    assert plan.menu() == {
+        "Overview": "overview.html",
+        "Sales": {"North America": "sales-north_america.html", "Europe": "sales-europe.html"}
+    }
+    # Deeper levels are pages of their own with a larger depth for their top-level key
+    deep = ReportPlan.build(REPORT, {"Sales": 3, "default": 1})
+    assert [node.path for node in deep.pages] == [
+        "Overview", "Sales/North America/Q1", "Sales/North America/Q2", "Sales/Europe", "Empty"
+    ]
+    assert deep.by_slug["sales-north_america-q2"].parent.key == "North America"
+
+def test_reports_written_to_the_same_file_are_rejected():
+    with pytest.raises(ValueError, match="'Sales/Europe' and 'sales-europe'"):
+        ReportPlan.build({"Sales": {"Europe": "EU sales"}, "sales-europe": "Other"})
+    for name in ("Index", "Table of Contents"):
+        with pytest.raises(ValueError, match="would overwrite the generated page"):
+            ReportPlan.build({name: "Content"})
+
+def test_menu_helpers_of_core_follow_the_plan():
+    plan = ReportPlan.build(REPORT)
+    menu = flatten_dict_to_menu(REPORT)
+
+    assert menu == plan.menu()
+    assert generate_table_of_contents(menu) == plan.table_of_contents()
+    # Menu structures with empty placeholders for pages link to the same files
+    assert generate_table_of_contents({"Overview": {}, "Sales": {"North America": {}, "Europe": {}}}) == plan.table_of_contents()
@@ -0,0 +1,61 @@
+"""
+Tests of atomic publishing.
+"""
+
+import os
+
+import pytest
+
+from core import generate_report, update_report
+from publish import PUBLISH_MANIFEST, prune_releases, publish_release, releases_dir
+
+def write_stage(stage_dir, files: dict) -> str:
+    os.makedirs(stage_dir)
+    for name, text in files.items():
+        with open(os.path.join(stage_dir, name), 'w', encoding='utf-8') as f:
+            f.write(text)
+    return str(stage_dir)
+
+def test_publish_links_unchanged_files_and_prunes_old_releases(tmp_path):
+    output_dir = str(tmp_path / "report")
+    first = publish_release(write_stage(tmp_path / "s1", {"index.html": "v1", "a.html": "A"}), output_dir)
+    assert os.path.islink(output_dir)
+    assert first['previous'] is None and sorted(first['added']) == ["a.html", "index.html"]
+
+    second = publish_release(write_stage(tmp_path / "s2", {"index.html": "v2", "a.html": "A", "b.html": "B"}), output_dir)
+    assert second['previous'] == first['release']
+    assert (second['added'], second['changed'], second['removed'], second['unchanged']) == (["b.html"], ["index.html"], [], 1)
+    releases = releases_dir(output_dir)
+    # The unchanged file is a hard link to the previous release, not a copy
+    assert os.path.samefile(
+        os.path.join(releases, first['release'], "a.html"),
+        os.path.join(releases, second['release'], "a.html")
+    )
+    assert os.path.exists(os.path.join(output_dir, PUBLISH_MANIFEST))
+
+    # Publishing the same files again keeps the live release
+    same = publish_release(write_stage(tmp_path / "s3", {"index.html": "v2", "a.html": "A", "b.html": "B"}), output_dir)
+    assert same['release'] == second['release'] and same['unchanged'] == 3
+
+    publish_release(write_stage(tmp_path / "s4", {"index.html": "v3"}), output_dir)
+    prune_releases(output_dir, keep_releases=1)
+    live = os.path.basename(os.path.realpath(output_dir))
+    assert [name for name in os.listdir(releases) if not name.startswith('.')] == [live]
+    with open(os.path.join(output_dir, "index.html"), 'r', encoding='utf-8') as f:
+        assert f.read() == "v3"
+
+def test_generate_and_update_report_publish_releases(tmp_path):
+    output_dir = str(tmp_path / "report")
+    generate_report({"Overview": "First"}, output_dir, renderer="native")
+    summary = generate_report({"Overview": "Second"}, output_dir, renderer="native", publish=True)
+    # The unpublished build becomes the previous release
+    assert summary.published['previous'].endswith("-unpublished")
+    assert "overview.html" in summary.published['changed']
+    assert os.path.islink(output_dir)
+    with pytest.raises(ValueError, match="holds a published report"):
+        generate_report({"Overview": "Third"}, output_dir, renderer="native")
+
+    summary = update_report(output_dir, {"Details": "Added"})
+    assert summary.published['previous'] != summary.published['release']
+    assert "details.html" in summary.published['added']
+    assert os.path.exists(os.path.join(output_dir, "details.html"))
@@ -0,0 +1,41 @@
+"""
+Tests of the native renderer.
+"""
+
+import re
+
+import pandas as pd
+from IPython.display import HTML
+
+from core import NOTEBOOK_TEMPLATE_PATH, process_report_content
+from renderer import is_native_supported
+
+class Chart:
+    def show(self):
+        pass
+
+CONTENT = {
+    "Summary": "Revenue grew by **12%**",
+    "Figures": [pd.DataFrame({"region": ["North", "South"], "revenue": [120, 80]}), HTML("<em>Unaudited</em>")]
+}
+
+def body_text(page: str) -> str:
+    """Get the visible text of a page's output cells."""
+    body = page[page.index('<body'):]
+    body = re.sub(r'<script.*?</script>|<style.*?</style>', '', body, flags=re.S)
+    return ' '.join(re.sub(r'<[^>]+>', ' ', body).split())
+
+def test_supported_types():
+    assert is_native_supported(CONTENT)
+    assert is_native_supported(pd.Series([1, 2]).to_frame().style)
+    assert not is_native_supported({"Chart": Chart()})
+    assert not is_native_supported(42)
+
+def test_native_page_matches_the_notebook_page(tmp_path):
+    errors = {}
+    native = process_report_content(CONTENT, "Sales", str(tmp_path), NOTEBOOK_TEMPLATE_PATH, errors, renderer="native")
+    notebook = process_report_content(CONTENT, "Sales", str(tmp_path), NOTEBOOK_TEMPLATE_PATH, errors, renderer="notebook")
+
+    assert errors == {}
+    assert body_text(native) == body_text(notebook)
+    assert "Unaudited" in body_text(native)
@@ -0,0 +1,39 @@
+"""
+Tests of the search index.
+"""
+
+import json
+import os
+
+from core import generate_report, update_report
+from manifest import REMOVE
+from search import MAX_TERM_LENGTH, PAGES_SCRIPT, SEARCH_DIR, SearchIndex, extract_terms, shard_name, tokenize
+
+def test_long_terms_are_truncated_like_the_search_box():
+    slug = "quarterly-revenue-by-region-and-product-line-2024"
+    long_term = slug.replace('-', '') * 2
+
+    # The shell's search box truncates query terms to MAX_TERM_LENGTH characters
+    assert tokenize(f"see {long_term}") == ["see", long_term[:MAX_TERM_LENGTH]]
+    terms = extract_terms("Sales", f"<h2>{long_term}</h2>")
+    assert long_term[:MAX_TERM_LENGTH] in terms
+
+def test_index_is_written_in_shards_and_updated_with_the_report(tmp_path):
+    output_dir = str(tmp_path)
+    report = {"Overview": "## Quarterly revenue", "Regions": {"Europe": "## Revenue in Europe", "Asia": "## Asian markets"}}
+    generate_report(report, output_dir, renderer="native", search_index=True)
+
+    pages, shards = SearchIndex.load(output_dir).shards()
+    assert [url for _, url in pages] == ["overview.html", "regions-europe.html", "regions-asia.html"]
+    revenue = shards[shard_name("revenue")]["revenue"]
+    assert sorted(revenue[0::2]) == [0, 1]
+    with open(os.path.join(output_dir, SEARCH_DIR, PAGES_SCRIPT), 'r', encoding='utf-8') as f:
+        version = json.loads(f.read().split('(', 1)[1].split(',', 1)[0]).split('/')[1]
+    assert os.listdir(os.path.join(output_dir, SEARCH_DIR, version))
+
+    # update_report indexes the pages it renders and drops removed ones
+    update_report(output_dir, {"Regions": {"Asia": REMOVE, "Africa": "## Revenue in Africa"}})
+    pages, shards = SearchIndex.load(output_dir).shards()
+    assert [url for _, url in pages] == ["overview.html", "regions-europe.html", "regions-africa.html"]
+    assert "asian" not in shards.get(shard_name("asian"), {})
+    assert not os.path.exists(os.path.join(output_dir, SEARCH_DIR, version))
@@ -0,0 +1,69 @@
+"""
+Tests of the on-demand report server.
+"""
+
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from server import ReportServer, create_http_server
+
+def test_slow_page_is_answered_with_gateway_timeout(tmp_path):
+    release = threading.Event()
+    report = ReportServer(
+        {"Quick": "Ready right away", "Slow": lambda: release.wait(30) and "Finally ready"},
+        str(tmp_path), renderer="native", prefetch=0, request_timeout=3
+    )
+    httpd = create_http_server(report, port=0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    try:
+        report.start()
+        thread.start()
+        url = f"http://127.0.0.1:{httpd.server_address[1]}/"
+
+        with urllib.request.urlopen(url + "quick.html", timeout=10) as response:
+            assert b"Ready right away" in response.read()
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(url + "slow.html", timeout=10)
+        assert error.value.code == 504
+        # The content of pages being rendered is not in the served directory
+        assert not os.path.abspath(report.temp_dir).startswith(os.path.abspath(str(tmp_path)))
+        assert not [name for name in os.listdir(tmp_path) if name.startswith('temp')]
+
+        # The page keeps rendering and is served once it is done
+        release.set()
+        with urllib.request.urlopen(url + "slow.html", timeout=10) as response:
+            assert b"Finally ready" in response.read()
+    finally:
+        release.set()
+        httpd.shutdown()
+        httpd.server_close()
+        report.close()
+
+def test_pages_are_rendered_on_request_and_siblings_prefetched(tmp_path):
+    report = ReportServer(
+        {"Overview": "Summary", "Regions": {"North": "Northern sales", "South": "Southern sales", "East": "Eastern sales"}},
+        str(tmp_path), renderer="native", prefetch=1, memory_pages=1
+    )
+    try:
+        report.start()
+        assert report.get_page("missing.html") is None
+        assert not (tmp_path / "regions-north.html").exists()
+
+        assert b"Northern sales" in report.get_page("regions-north.html", timeout=30)
+        # The nearest sibling is rendered in the background, the farther one is not
+        deadline = time.monotonic() + 30
+        while not (tmp_path / "regions-south.html").exists() and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert "Southern sales" in (tmp_path / "regions-south.html").read_text(encoding='utf-8')
+        assert not (tmp_path / "regions-east.html").exists()
+
+        # Pages that left the memory cache are read back from their files
+        assert b"Northern sales" in report.get_page("regions-north.html", timeout=30)
+        assert list(report._memory) == ["regions-north.html"]
+    finally:
+        report.close()
@@ -0,0 +1,57 @@
+"""
+Tests of the directory report source.
+"""
+
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from core import generate_report
+from handoff import dump_file_reference, load_content
+from lazy import LazyLeaf
+from source import DirectoryReportSource
+
+def make_tree(root) -> pd.DataFrame:
+    frame = pd.DataFrame({"region": ["North", "South"], "revenue": [120.5, 80.25]})
+    os.makedirs(root / "Sales" / "Europe")
+    frame.to_csv(root / "Overview.csv", index=False)
+    frame.to_feather(root / "Sales" / "Americas.feather")
+    frame.to_csv(root / "Sales" / "Europe" / "Q1.csv", index=False)
+    (root / "Notes.txt").write_text("No loader for text")
+    (root / "_SUCCESS").write_text("")
+    (root / ".hidden.csv").write_text("a\n1\n")
+    return frame
+
+def test_directory_tree_is_listed_without_loading_files(tmp_path):
+    frame = make_tree(tmp_path)
+    source = DirectoryReportSource(str(tmp_path))
+
+    assert list(source) == ["Overview", "Sales"]
+    assert list(source["Sales"]) == ["Americas", "Europe"]
+    assert isinstance(source["Overview"], LazyLeaf)
+    pd.testing.assert_frame_equal(source["Overview"].resolve(), frame)
+    # A directory rendered as one page is loaded as a whole
+    whole = source["Sales"]["Europe"]()
+    pd.testing.assert_frame_equal(whole["Q1"], frame)
+
+    # Custom loaders take precedence, and a name used twice is an error
+    (tmp_path / "Config.json").write_text(json.dumps({"currency": "EUR"}))
+    source = DirectoryReportSource(str(tmp_path), loaders={".json": lambda path: json.load(open(path))})
+    assert source["Config"].resolve() == {"currency": "EUR"}
+    (tmp_path / "Overview.json").write_text("{}")
+    with pytest.raises(ValueError, match="would both be the report 'Overview'"):
+        list(DirectoryReportSource(str(tmp_path), loaders={".json": json.load}))
+
+def test_arrow_file_reference_loads_as_frame_and_renders(tmp_path):
+    frame = make_tree(tmp_path / "data")
+    dump_file_reference(str(tmp_path / "data" / "Sales" / "Americas.feather"), str(tmp_path / "content.pkl"))
+    pd.testing.assert_frame_equal(load_content(str(tmp_path / "content.pkl")), frame)
+
+    output_dir = str(tmp_path / "out")
+    summary = generate_report(DirectoryReportSource(str(tmp_path / "data")), output_dir, renderer="native")
+    assert summary.failures == {}
+    assert sorted(summary.pages) == ["Overview", "Sales/Americas", "Sales/Europe", "Table of Contents"]
+    with open(os.path.join(output_dir, "sales-americas.html"), 'r', encoding='utf-8') as f:
+        assert "North" in f.read()
@@ -0,0 +1,55 @@
+"""
+Tests of spool rendering.
+"""
+
+import os
+import threading
+import time
+
+from core import generate_report
+from spool import Spool, run_worker
+
+def expire(spool: Spool, job_id: str) -> None:
+    """Age the lease of a claimed job past its timeout."""
+    old = time.time() - 2 * spool.lease_timeout
+    os.utime(os.path.join(spool.spool_dir, 'claimed', job_id), (old, old))
+    spool._last_lease_check = 0.0
+
+def test_expired_lease_is_queued_again_then_failed(tmp_path):
+    spool = Spool(str(tmp_path), lease_timeout=10, max_attempts=2)
+    spool.job_dir("build-0001")
+    spool.submit("build-0001", {'report_name': "Sales"})
+
+    assert spool.claim() == "build-0001" and spool.claim() is None
+    expire(spool, "build-0001")
+    assert spool.poll(["build-0001"]) == []
+    assert spool.claim() == "build-0001"
+
+    # The worker keeps its lease while it renders
+    with spool.lease("build-0001", 0.2):
+        expire(spool, "build-0001")
+        time.sleep(0.3)
+        assert spool.poll(["build-0001"]) == []
+
+    expire(spool, "build-0001")
+    [(job_id, html_content, error, events, stats)] = spool.poll(["build-0001"])
+    assert (job_id, html_content, stats) == ("build-0001", None, {'retries': 1})
+    assert "abandoned by its worker 2 time(s)" in error
+    assert not os.listdir(os.path.join(str(tmp_path), 'jobs'))
+
+def test_worker_renders_the_pages_of_a_build(tmp_path):
+    spool_dir = str(tmp_path / "spool")
+    Spool(spool_dir)
+    worker = threading.Thread(target=run_worker, args=(spool_dir,), kwargs={'idle_timeout': 2, 'poll_interval': 0.05})
+    worker.start()
+    try:
+        summary = generate_report(
+            {"Overview": "Summary", "Details": "Numbers"}, str(tmp_path / "report"), renderer="native", spool=spool_dir
+        )
+    finally:
+        worker.join()
+
+    assert summary.failures == {}
+    assert sorted(summary.pages) == ["Details", "Overview", "Table of Contents"]
+    with open(os.path.join(str(tmp_path / "report"), "details.html"), 'r', encoding='utf-8') as f:
+        assert "Numbers" in f.read()
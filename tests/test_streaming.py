@@ -0,0 +1,24 @@
+"""
+Tests of the streaming build pipeline.
+"""
+
+import os
+
+from core import NOTEBOOK_TEMPLATE_PATH, iter_rendered_reports
+
+def test_pages_are_yielded_before_later_jobs_are_taken(tmp_path):
+    taken = []
+
+    def jobs():
+        for number in range(3):
+            taken.append(number)
+            yield f"Page {number}", f"Content of page {number}"
+
+    pages = iter_rendered_reports(jobs(), str(tmp_path), NOTEBOOK_TEMPLATE_PATH, renderer="native")
+    report_name, html_content = next(pages)
+
+    assert report_name == "Page 0" and "Content of page 0" in html_content
+    assert taken == [0]
+    assert [report_name for report_name, _ in pages] == ["Page 1", "Page 2"]
+    # The directory of each page is removed once it is done
+    assert os.listdir(str(tmp_path)) == []
@@ -0,0 +1,39 @@
+"""
+Tests of virtual-scrolling tables.
+"""
+
+import os
+
+import pandas as pd
+
+from tables import TABLES_DIR, replace_large_tables
+
+def test_large_tables_are_replaced_and_small_ones_kept(tmp_path):
+    output_dir = str(tmp_path / "report")
+    small = pd.DataFrame({"value": range(5)})
+    large = pd.DataFrame({"value": range(50)})
+    content = {"Small": small, "Large": [large, "Notes"]}
+
+    replaced = replace_large_tables(content, output_dir, "sales", max_rows=10, chunk_rows=20)
+
+    assert replaced is not content and replaced["Small"] is small
+    widget = replaced["Large"][0].data
+    assert 'id="qr-table-sales-0"' in widget
+    assert 'qrTables.mount("qr-table-sales-0")' in widget
+    assert replaced["Large"][1] == "Notes"
+    assert sorted(os.listdir(os.path.join(output_dir, TABLES_DIR, "sales-0"))) == ["00000.js", "00001.js", "00002.js"]
+    # Content without large tables is returned unchanged
+    unchanged = {"Small": small}
+    assert replace_large_tables(unchanged, output_dir, "other", max_rows=10) is unchanged
+
+def test_table_script_is_written_to_the_shared_assets_dir(tmp_path):
+    output_dir = str(tmp_path / "report")
+    assets_dir = str(tmp_path / "shared")
+    large = pd.Series(range(50), name="value")
+
+    widget = replace_large_tables(large, output_dir, "sales", max_rows=10, assets_dir=assets_dir).data
+
+    scripts = os.listdir(assets_dir)
+    assert len(scripts) == 1 and scripts[0].endswith(".js")
+    assert f'src="../shared/{scripts[0]}"' in widget
+    assert not os.path.exists(os.path.join(output_dir, "assets"))
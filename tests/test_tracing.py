@@ -0,0 +1,39 @@
+"""
+Tests of build tracing.
+"""
+
+import json
+import os
+
+import pytest
+
+from core import generate_report
+from tracing import Tracer
+
+def test_span_is_recorded_even_if_the_stage_raises():
+    events = []
+    tracer = Tracer([events.append], memory=False)
+    with tracer.span('serialize', 'Sales') as details:
+        details['bytes'] = 42
+    with pytest.raises(RuntimeError):
+        with tracer.span('execute', 'Sales'):
+            raise RuntimeError("Kernel died")
+
+    assert [(event.name, event.report) for event in events] == [('serialize', 'Sales'), ('execute', 'Sales')]
+    assert events[0].args == {'bytes': 42}
+    assert list(tracer.report_totals()) == ['Sales']
+    assert tracer.stage_totals()['execute']['count'] == 1
+
+def test_profile_is_written_as_a_chrome_trace(tmp_path):
+    stages = []
+    summary = generate_report(
+        {"Overview": "Summary", "Details": "Numbers"}, str(tmp_path), renderer="native",
+        trace_hooks=[lambda event: stages.append(event.name)], profile=True
+    )
+
+    assert summary.failures == {}
+    assert {'plan', 'native_render', 'write', 'shell'} <= set(stages)
+    with open(os.path.join(str(tmp_path), 'profile.json'), 'r', encoding='utf-8') as f:
+        profile = json.load(f)
+    assert all(event['ph'] == 'X' for event in profile['traceEvents'])
+    assert set(profile['otherData']['slowest_reports']) == {"Overview", "Details", "Table of Contents"}
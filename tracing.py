@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+"""
+Build Tracing
+
+This module records where the time of a build goes. A Tracer collects one event per stage
+of each report (cache lookup, serialization, kernel start, execution, export, writing the
+page, ...) with its start time, duration, size in bytes and the memory of the process, plus
+the execution time of every notebook cell. Events are passed to hook functions as they are
+recorded and can be saved as a Chrome trace (`profile.json`), which chrome://tracing and
+Perfetto display as a timeline per process.
+"""
+
+#------------------------------------------------------------------------------
+# IMPORTS AND CONSTANTS
+#------------------------------------------------------------------------------
+
+import contextlib
+import datetime
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+if __package__:
+    from .engine import get_process_memory_mb
+else:  # Imported as a plain module, e.g. by example.py
+    from engine import get_process_memory_mb
+
+# Event categories
+STAGE_CATEGORY = "stage"
+CELL_CATEGORY = "cell"
+
+# Number of reports and stages listed in the profile summary
+PROFILE_TOP_N = 20
+
+#------------------------------------------------------------------------------
+# TRACE EVENTS
+#------------------------------------------------------------------------------
+
+@dataclass
+class TraceEvent:
+    """
+    One timed stage of a build.
+
+    Attributes:
+        name (str): Stage name, e.g. "serialize", "execute" or "export"
+        report (str, optional): Report the stage belongs to, None for build-wide stages
+        start (float): Start time in seconds since the epoch
+        duration (float): Duration in seconds
+        pid (int): Process that ran the stage
+        category (str): "stage", or "cell" for notebook cells executed within a stage
+        args (Dict[str, Any]): Further details, e.g. bytes, rss_mb or the cell index
+    """
+    name: str
+    report: Optional[str]
+    start: float
+    duration: float
+    pid: int = field(default_factory=os.getpid)
+    category: str = STAGE_CATEGORY
+    args: Dict[str, Any] = field(default_factory=dict)
+
+def _parse_timestamp(value: str) -> float:
+    """Convert an ISO timestamp written by papermill or nbclient (UTC) to epoch seconds."""
+    parsed = datetime.datetime.fromisoformat(value.rstrip('Z'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+    return parsed.timestamp()
+
+#------------------------------------------------------------------------------
+# TRACER
+#------------------------------------------------------------------------------
+
+class Tracer:
+    """
+    Collects the trace events of a build.
+
+    Hooks are called with every event as it is recorded. Events of reports rendered in
+    worker processes reach the hooks when the report is done.
+
+    Args:
+        hooks (Iterable[Callable[[TraceEvent], None]], optional): Functions called with each event
+        memory (bool): Record the resident memory of the process at the end of each stage
+    """
+
+    def __init__(
+        self,
+        hooks: Optional[Iterable[Callable[[TraceEvent], None]]] = None,
+        memory: bool = True
+    ):
+        self.hooks = list(hooks or [])
+        self.memory = memory
+        self.events: List[TraceEvent] = []
+
+    def add(self, event: TraceEvent) -> None:
+        """
+        Record an event and pass it to the hooks.
+
+        Args:
+            event (TraceEvent): The event
+        """
+        self.events.append(event)
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception as e:
+                print(f"Warning: Trace hook {hook!r} failed: {e}")
+
+    def extend(self, events: Iterable[TraceEvent]) -> None:
+        """
+        Record events collected by another tracer, e.g. in a worker process.
+
+        Args:
+            events (Iterable[TraceEvent]): The events
+        """
+        for event in events:
+            self.add(event)
+
+    @contextlib.contextmanager
+    def span(self, name: str, report: Optional[str] = None, **args: Any) -> Iterator[Dict[str, Any]]:
+        """
+        Time a stage.
+
+        The stage is recorded even if it raises. Details known only at the end, such as the
+        number of bytes written, can be added to the yielded dict.
+
+        Args:
+            name (str): Stage name
+            report (str, optional): Report the stage belongs to
+            **args: Details of the stage
+
+        Yields:
+            Dict[str, Any]: The details of the event
+        """
+        start = time.time()
+        started = time.perf_counter()
+        try:
+            yield args
+        finally:
+            duration = time.perf_counter() - started
+            if self.memory:
+                args['rss_mb'] = get_process_memory_mb(os.getpid())
+            self.add(TraceEvent(name, report, start, duration, args=args))
+
+    def add_cell_events(self, notebook: Any, report: Optional[str] = None) -> None:
+        """
+        Record the execution time of each cell of an executed notebook.
+
+        Reads the timings papermill (`metadata.papermill`) or nbclient and the kernel
+        engine (`metadata.execution`) store in the cells.
+
+        Args:
+            notebook (nbformat.NotebookNode): The executed notebook
+            report (str, optional): Report the notebook belongs to
+        """
+        for index, cell in enumerate(notebook.cells):
+            papermill = cell.metadata.get('papermill', {})
+            execution = cell.metadata.get('execution', {})
+            try:
+                if papermill.get('start_time') and papermill.get('duration') is not None:
+                    start = _parse_timestamp(papermill['start_time'])
+                    duration = papermill['duration']
+                elif execution.get('iopub.execute_input') and execution.get('shell.execute_reply'):
+                    start = _parse_timestamp(execution['iopub.execute_input'])
+                    duration = _parse_timestamp(execution['shell.execute_reply']) - start
+                else:
+                    continue
+            except (TypeError, ValueError):
+                continue
+            self.add(TraceEvent(
+                f"cell {index}",
+                report,
+                start,
+                duration,
+                category=CELL_CATEGORY,
+                args={'cell': index, 'tags': list(cell.metadata.get('tags', []))}
+            ))
+
+    #--------------------------------------------------------------------------
+    # Analysis
+    #--------------------------------------------------------------------------
+
+    def report_totals(self) -> Dict[str, float]:
+        """
+        Get the time spent on each report, slowest first.
+
+        Returns:
+            Dict[str, float]: Seconds per report, summed over its stages
+        """
+        totals: Dict[str, float] = {}
+        for event in self.events:
+            if event.report is not None and event.category == STAGE_CATEGORY:
+                totals[event.report] = totals.get(event.report, 0.0) + event.duration
+        return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+    def stage_totals(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get the time spent in each stage across all reports, slowest first.
+
+        Returns:
+            Dict[str, Dict[str, float]]: Per stage, the number of events and the total and
+                                         maximum seconds
+        """
+        totals: Dict[str, Dict[str, float]] = {}
+        for event in self.events:
+            if event.category != STAGE_CATEGORY:
+                continue
+            stage = totals.setdefault(event.name, {'count': 0, 'total': 0.0, 'max': 0.0})
+            stage['count'] += 1
+            stage['total'] += event.duration
+            stage['max'] = max(stage['max'], event.duration)
+        return dict(sorted(totals.items(), key=lambda item: item[1]['total'], reverse=True))
+
+    def to_chrome_trace(self, top_n: int = PROFILE_TOP_N) -> Dict[str, Any]:
+        """
+        Convert the events to the Chrome trace event format.
+
+        Args:
+            top_n (int): Number of slowest reports listed in the summary
+
+        Returns:
+            Dict[str, Any]: Trace with complete ("X") events in microseconds since the first
+                            event, and a summary of the slowest reports and stages
+        """
+        origin = min((event.start for event in self.events), default=0.0)
+        trace_events = [
+            {
+                'name': event.name,
+                'cat': event.category,
+                'ph': 'X',
+                'ts': round((event.start - origin) * 1e6),
+                'dur': round(event.duration * 1e6),
+                'pid': event.pid,
+                'tid': event.pid,
+                'args': {'report': event.report, **event.args}
+            }
+            for event in self.events
+        ]
+        report_totals = self.report_totals()
+        return {
+            'traceEvents': trace_events,
+            'displayTimeUnit': 'ms',
+            'otherData': {
+                'start_time': origin,
+                'slowest_reports': dict(list(report_totals.items())[:top_n]),
+                'stages': self.stage_totals()
+            }
+        }
+
+    def write_chrome_trace(self, path: str) -> None:
+        """
+        Save the events as a Chrome trace file.
+
+        Args:
+            path (str): Path of the JSON file, e.g. "<output_dir>/profile.json"
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_chrome_trace(), f, default=str)
+
+#------------------------------------------------------------------------------
+# HELPER FUNCTIONS
+#------------------------------------------------------------------------------
+
+def trace_span(tracer: Optional[Tracer], name: str, report: Optional[str] = None, **args: Any) -> Any:
+    """
+    Time a stage if tracing is enabled.
+
+    Args:
+        tracer (Tracer, optional): The tracer, or None when the build is not traced
+        name (str): Stage name
+        report (str, optional): Report the stage belongs to
+        **args: Details of the stage
+
+    Returns:
+        ContextManager[Dict[str, Any]]: Context manager yielding the details of the event
+    """
+    if tracer is None:
+        return contextlib.nullcontext(args)
+    return tracer.span(name, report, **args)